@@ -0,0 +1,180 @@
+"""
+Writing generated mask stacks to disk in the supported output formats.
+
+Every format is published atomically: it is written under a hidden temporary
+name next to its final path and renamed into place, so other tools (and a
+resumed batch run) never see a half-written animation.
+
+    frames  <output>/<name>_animation/<name>_<frame>.png  (the GUI's layout)
+    zip     <output>/<name>_animation.zip with the same frame PNGs
+    sheet   <output>/<name>_sheet.png sprite sheet
+    reveal  <output>/<name>_reveal.png reveal texture
+    npy     <output>/<name>_masks.npy mask cube and its <name>_masks.json sidecar
+    composited  <output>/<name>_composited/<name>_<frame>.png composed skins
+
+The composited format writes the skins themselves (base skin with the input
+skin revealed through each mask, from skin_compositor.compose_skin_frames)
+rather than the masks.
+
+ignore_interrupts() is the process pool initializer shared by the tools that
+generate and write animations in worker processes.
+"""
+
+import io
+import json
+import os
+import shutil
+import signal
+import threading
+import zipfile
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from mask_generator import (iter_upscaled_frames, mask_cube_metadata_path, mask_frame_pixels, mask_reveal_texture,
+                            mask_sprite_sheet, mask_upscale_factor, save_mask_cube, save_mask_frames)
+
+OUTPUT_FORMATS = ["frames", "zip", "sheet", "reveal", "npy", "composited"]
+
+def ignore_interrupts():
+    """Pool initializer: leave Ctrl+C to the parent process so it can shut down cleanly"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def output_path(output_root, base_name, output_format):
+    """Final path of an animation written in the given format"""
+    output_root = Path(output_root)
+    if output_format == "frames":
+        return output_root / f"{base_name}_animation"
+    if output_format == "zip":
+        return output_root / f"{base_name}_animation.zip"
+    if output_format in ("sheet", "reveal"):
+        return output_root / f"{base_name}_{output_format}.png"
+    if output_format == "npy":
+        return output_root / f"{base_name}_masks.npy"
+    if output_format == "composited":
+        return output_root / f"{base_name}_composited"
+    raise ValueError(f"Unknown output format: {output_format}")
+
+def staging_path(final_path):
+    """Hidden temporary path, unique to this process and thread, to write final_path through"""
+    final_path = Path(final_path)
+    return final_path.with_name(f".{final_path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+
+def remove_stale_staging(final_path):
+    """Delete temporary output left next to final_path by a run that died mid-write"""
+    final_path = Path(final_path)
+    for stale in final_path.parent.glob(f".{final_path.name}.tmp-*"):
+        if stale.is_dir():
+            shutil.rmtree(stale, ignore_errors=True)
+        else:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+def publish_directory(staging_dir, final_dir):
+    """Move a finished staging directory into place, replacing any previous version"""
+    staging_dir = Path(staging_dir)
+    final_dir = Path(final_dir)
+    retired_dir = None
+    if final_dir.exists():
+        retired_dir = final_dir.with_name(f".{final_dir.name}.old-{os.getpid()}-{threading.get_ident()}")
+        os.replace(final_dir, retired_dir)
+    os.replace(staging_dir, final_dir)
+    if retired_dir is not None:
+        shutil.rmtree(retired_dir, ignore_errors=True)
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+def encode_mask_zip(mask_stack, base_name, scale=1):
+    """Zip of <base_name>_<frame>.png mask frames, upscaled by scale, as bytes"""
+    buffer = io.BytesIO()
+    # PNGs are already compressed, so store them as they are
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for i, mask_alpha in enumerate(iter_upscaled_frames(mask_stack, scale)):
+            archive.writestr(f"{base_name}_{i}.png", png_bytes(Image.fromarray(mask_frame_pixels(mask_alpha), 'RGBA')))
+    return buffer.getvalue()
+
+def save_skin_frames(skin_frames, output_dir, base_name, progress_callback=None, scale=1):
+    """
+    Save composed RGBA skins as <output_dir>/<base_name>_<frame>.png images.
+
+    Args:
+        skin_frames (np.ndarray): (frames, H, W, 4) uint8 RGBA skins
+        scale (int): Integer factor to upscale the saved skins by
+
+    Returns:
+        list: The written frame paths, in frame order
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    frame_paths = []
+    for i, skin_pixels in enumerate(skin_frames):
+        if scale != 1:
+            skin_pixels = np.repeat(np.repeat(skin_pixels, scale, axis=0), scale, axis=1)
+        frame_path = output_dir / f"{base_name}_{i}.png"
+        Image.fromarray(np.ascontiguousarray(skin_pixels), 'RGBA').save(frame_path, "PNG")
+        frame_paths.append(str(frame_path))
+        if progress_callback:
+            progress_callback(i + 1, len(skin_frames))
+    return frame_paths
+
+def write_animation_output(mask_stack, output_root, base_name, output_format="frames", metadata=None,
+                           output_size=None):
+    """
+    Save a mask stack under output_root in one of OUTPUT_FORMATS.
+
+    For the composited format, mask_stack is the (frames, H, W, 4) stack of
+    composed skins instead.
+
+    metadata (dict) adds fields to the npy format's sidecar, e.g. the animation type.
+    output_size (int) upscales the masks with nearest neighbor to that width,
+    which must be a multiple of the mask width. Frames are upscaled a chunk
+    at a time as they are written.
+
+    Returns:
+        str: The published file or directory
+    """
+    scale = mask_upscale_factor(mask_stack.shape[:3], output_size)
+    final_path = output_path(output_root, base_name, output_format)
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = staging_path(final_path)
+
+    try:
+        if output_format in ("frames", "composited"):
+            if staging.exists():
+                shutil.rmtree(staging)
+            if output_format == "frames":
+                save_mask_frames(mask_stack, staging, base_name, scale=scale)
+            else:
+                save_skin_frames(mask_stack, staging, base_name, scale=scale)
+            publish_directory(staging, final_path)
+        elif output_format == "npy":
+            # The sidecar goes in first, so a published cube always has its metadata
+            with open(staging, "wb") as f:
+                cube_metadata = save_mask_cube(mask_stack, f, metadata, scale)
+            metadata_path = mask_cube_metadata_path(final_path)
+            metadata_staging = staging_path(metadata_path)
+            with open(metadata_staging, "w") as f:
+                json.dump(cube_metadata, f, indent=2)
+            os.replace(metadata_staging, metadata_path)
+            os.replace(staging, final_path)
+        else:
+            if output_format == "zip":
+                data = encode_mask_zip(mask_stack, base_name, scale)
+            elif output_format == "sheet":
+                data = png_bytes(mask_sprite_sheet(mask_stack, scale=scale))
+            else:
+                data = png_bytes(mask_reveal_texture(mask_stack, scale))
+            with open(staging, "wb") as f:
+                f.write(data)
+            os.replace(staging, final_path)
+    finally:
+        if staging.is_dir():
+            shutil.rmtree(staging, ignore_errors=True)
+        elif staging.exists():
+            staging.unlink()
+    return str(final_path)
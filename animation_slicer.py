@@ -1,13 +1,21 @@
+import math
 import os
 import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import customtkinter as ctk
+import numpy as np
 from PIL import Image, ImageTk
 import threading
+from collections import OrderedDict
 from pathlib import Path
+from animation_output import write_animation_output
+from mask_generator import ANIMATION_TYPES, generate_mask_stack, mask_frame_pixels, mask_upscale_factor, save_mask_frames
 from minecraft_skin_viewer import MinecraftSkinViewer
-from skin_mapping_config import SKIN_UV_MAPPING
+from offscreen_renderer import export_reveal_animation
+from playback_scheduler import PlaybackScheduler
+from skin_compositor import compose_skin_frames
+from skin_texture import load_skin_texture
 
 # Set the appearance mode and color theme
 ctk.set_appearance_mode("dark")
@@ -121,22 +129,34 @@ class MinecraftSkinAnimator:
         
         self.animation_type = ctk.CTkOptionMenu(
             controls_frame,
-            values=["Head to Toe", "Toe to Head", "Core to Limbs", "Limbs to Core", "Left to Right Body", "Right to Left Body"],
+            values=list(ANIMATION_TYPES),
             width=150
         )
         self.animation_type.grid(row=5, column=1, sticky="e", padx=(10, 20), pady=(0, 10))
         self.animation_type.set("Head to Toe")
         
+        # Output size (masks are upscaled with nearest neighbor while saving)
+        output_size_label = ctk.CTkLabel(controls_frame, text="Output size:")
+        output_size_label.grid(row=6, column=0, sticky="w", padx=(20, 10), pady=(0, 10))
+        
+        self.output_size = ctk.CTkOptionMenu(
+            controls_frame,
+            values=["Skin size", "128", "256", "512", "1024"],
+            width=150
+        )
+        self.output_size.grid(row=6, column=1, sticky="e", padx=(10, 20), pady=(0, 10))
+        self.output_size.set("Skin size")
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ctk.CTkProgressBar(controls_frame, variable=self.progress_var)
-        self.progress_bar.grid(row=6, column=0, columnspan=2, pady=20, padx=20, sticky="ew")
+        self.progress_bar.grid(row=7, column=0, columnspan=2, pady=20, padx=20, sticky="ew")
         self.progress_bar.set(0)
         
         # Status label
         self.status_var = tk.StringVar(value="Ready to generate animations")
         status_label = ctk.CTkLabel(controls_frame, textvariable=self.status_var, text_color="gray70")
-        status_label.grid(row=7, column=0, columnspan=2, pady=(0, 10))
+        status_label.grid(row=8, column=0, columnspan=2, pady=(0, 10))
         
         # Generate button
         self.generate_btn = ctk.CTkButton(
@@ -223,12 +243,38 @@ class MinecraftSkinAnimator:
         )
         self.play_btn.grid(row=0, column=2, padx=(5, 10), pady=10)
         
+        # Target FPS and measured playback timing
+        fps_label = ctk.CTkLabel(self.animation_controls, text="Target FPS:")
+        fps_label.grid(row=1, column=0, padx=(10, 5), pady=(0, 10))
+        
+        self.playback_stats_var = tk.StringVar(value="Measured: --")
+        playback_stats_label = ctk.CTkLabel(self.animation_controls, textvariable=self.playback_stats_var, text_color="gray70")
+        playback_stats_label.grid(row=1, column=1, sticky="w", padx=10, pady=(0, 10))
+        
+        self.playback_fps_var = tk.StringVar(value="10")
+        playback_fps_entry = ctk.CTkEntry(self.animation_controls, textvariable=self.playback_fps_var, width=40)
+        playback_fps_entry.grid(row=1, column=2, padx=(5, 10), pady=(0, 10))
+        playback_fps_entry.bind("<Return>", lambda event: self.apply_playback_fps())
+        
         # Initialize animation variables
         self.animation_frames = []
-        self.animation_images = []
+        self.animation_mask_stack = None  # In-memory masks of freshly generated frames
+        # Decoded RGBA frames and display images exist only for the current frame and
+        # a short look-ahead window; frames outside it are decoded again when shown
+        self.animation_source_frames = OrderedDict()
+        self.animation_display_scale = 0
+        self.animation_images = OrderedDict()
+        self.animation_image_window = 8
         self.current_frame = 0
         self.is_playing = False
-        self.play_timer = None
+        self.animation_player = PlaybackScheduler(
+            self.root,
+            self.display_animation_frame,
+            self.animation_frame_count,
+            on_stats=lambda fps, render_ms, skipped: self.playback_stats_var.set(
+                self.format_playback_stats(fps, render_ms, skipped)),
+            target_fps=10
+        )
     
     def setup_skin_preview_tab(self):
         """Setup the 3D skin preview tab"""
@@ -241,7 +287,7 @@ class MinecraftSkinAnimator:
         preview_controls_frame = ctk.CTkFrame(self.skin_preview_tab)
         preview_controls_frame.grid(row=0, column=0, sticky="nsew", padx=(20, 10), pady=20)
         preview_controls_frame.grid_columnconfigure(0, weight=1)
-        preview_controls_frame.grid_rowconfigure(17, weight=1)
+        preview_controls_frame.grid_rowconfigure(18, weight=1)
         
         # Title for 3D preview controls
         preview_title = ctk.CTkLabel(
@@ -328,16 +374,29 @@ class MinecraftSkinAnimator:
         )
         input_skin_browse_btn.grid(row=12, column=0, pady=(0, 10), padx=20, sticky="ew")
         
-        # Load from Animation tab button
+        # Load from Animation tab or from a saved mask cube
+        load_animation_frame = ctk.CTkFrame(preview_controls_frame, fg_color="transparent")
+        load_animation_frame.grid(row=13, column=0, pady=(0, 15), padx=20, sticky="ew")
+        load_animation_frame.grid_columnconfigure(0, weight=1)
+        load_animation_frame.grid_columnconfigure(1, weight=1)
+        
         load_from_animation_btn = ctk.CTkButton(
-            preview_controls_frame, 
+            load_animation_frame, 
             text="🔄 Use Animation Tab Data", 
             command=self.load_from_animation_tab,
             height=30,
             fg_color="#28a745",
             hover_color="#218838"
         )
-        load_from_animation_btn.grid(row=13, column=0, pady=(0, 15), padx=20, sticky="ew")
+        load_from_animation_btn.grid(row=0, column=0, padx=(0, 5), sticky="ew")
+        
+        load_mask_cube_btn = ctk.CTkButton(
+            load_animation_frame, 
+            text="📂 Load Mask Cube", 
+            command=self.browse_mask_cube,
+            height=30
+        )
+        load_mask_cube_btn.grid(row=0, column=1, padx=(5, 0), sticky="ew")
         
         # Animation controls
         self.animation_3d_frame_var = tk.StringVar(value="Frame: 0/0")
@@ -386,10 +445,57 @@ class MinecraftSkinAnimator:
         )
         self.base_only_btn.grid(row=0, column=2, padx=(5, 0), pady=5)
         
+        # Target FPS and measured playback timing for the 3D preview
+        fps_3d_label = ctk.CTkLabel(animation_controls_3d, text="Target FPS:", font=ctk.CTkFont(size=12))
+        fps_3d_label.grid(row=1, column=0, columnspan=2, sticky="w", pady=(0, 5))
+        
+        self.playback_3d_fps_var = tk.StringVar(value="6.7")
+        playback_3d_fps_entry = ctk.CTkEntry(animation_controls_3d, textvariable=self.playback_3d_fps_var, width=50)
+        playback_3d_fps_entry.grid(row=1, column=2, padx=(5, 0), pady=(0, 5))
+        playback_3d_fps_entry.bind("<Return>", lambda event: self.apply_3d_playback_fps())
+        
+        self.playback_3d_stats_var = tk.StringVar(value="Measured: --")
+        playback_3d_stats_label = ctk.CTkLabel(animation_controls_3d, textvariable=self.playback_3d_stats_var, font=ctk.CTkFont(size=12), text_color="gray70")
+        playback_3d_stats_label.grid(row=2, column=0, columnspan=3, sticky="w", pady=(0, 5))
+        
+        # Export the reveal animation as rendered 3D frames
+        export_3d_frame = ctk.CTkFrame(preview_controls_frame)
+        export_3d_frame.grid(row=17, column=0, sticky="ew", padx=20, pady=(0, 10))
+        export_3d_frame.grid_columnconfigure(0, weight=1)
+        
+        self.export_3d_btn = ctk.CTkButton(
+            export_3d_frame,
+            text="🎞️ Export 3D Animation",
+            command=self.start_3d_animation_export
+        )
+        self.export_3d_btn.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+        
+        self.export_3d_orbit_var = tk.BooleanVar(value=False)
+        export_3d_orbit_check = ctk.CTkCheckBox(
+            export_3d_frame,
+            text="Orbit camera (360°)",
+            variable=self.export_3d_orbit_var
+        )
+        export_3d_orbit_check.grid(row=1, column=0, sticky="w", padx=5, pady=(0, 5))
+        
+        self.export_composited_btn = ctk.CTkButton(
+            export_3d_frame,
+            text="💾 Save Composited Skins",
+            command=self.start_composited_export
+        )
+        self.export_composited_btn.grid(row=2, column=0, sticky="ew", padx=5, pady=(0, 5))
+        
         # Initialize 3D animation variables
         self.is_3d_playing = False
-        self.play_3d_timer = None
         self.current_3d_frame = 0
+        self.animation_3d_player = PlaybackScheduler(
+            self.root,
+            self.display_3d_animation_frame,
+            lambda: self.skin_viewer.frame_count() if self.skin_viewer is not None else 0,
+            on_stats=lambda fps, render_ms, skipped: self.playback_3d_stats_var.set(
+                self.format_playback_stats(fps, render_ms, skipped)),
+            target_fps=6.7
+        )
         
         # Right panel - 3D Viewer
         viewer_frame = ctk.CTkFrame(self.skin_preview_tab)
@@ -580,7 +686,7 @@ class MinecraftSkinAnimator:
             messagebox.showwarning("Warning", "No input skin selected in Animation tab. Please select a skin file first.")
             return
         
-        if not self.animation_frames or len(self.animation_frames) == 0:
+        if not self.animation_frame_count():
             messagebox.showwarning("Warning", "No animation frames generated. Please generate animation frames first in the Animation tab.")
             return
         
@@ -598,27 +704,55 @@ class MinecraftSkinAnimator:
             
             # Load animation frames
             if success1 and success2:
-                self.skin_viewer.load_animation_frames(self.animation_frames)
-                
-                # Update 3D animation controls
-                max_frame = max(0, len(self.animation_frames) - 1)
-                self.animation_3d_slider.configure(
-                    from_=0,
-                    to=max_frame,
-                    number_of_steps=max(1, max_frame)
-                )
+                if self.animation_mask_stack is not None:
+                    self.skin_viewer.load_animation_masks(self.animation_mask_stack, self.animation_frames)
+                else:
+                    self.skin_viewer.load_animation_frames(self.animation_frames)
                 
-                self.current_3d_frame = 0
-                self.animation_3d_frame_var.set(f"Frame: 0/{max_frame}")
-                self.animation_3d_slider.set(0)
+                self.reset_3d_animation_controls()
                 
-                messagebox.showinfo("Success", f"Loaded animation data!\nBase: {os.path.basename(base_skin_path)}\nInput: {os.path.basename(self.current_image_path)}\nFrames: {len(self.animation_frames)}")
+                messagebox.showinfo("Success", f"Loaded animation data!\nBase: {os.path.basename(base_skin_path)}\nInput: {os.path.basename(self.current_image_path)}\nFrames: {self.skin_viewer.frame_count()}")
             else:
                 messagebox.showerror("Error", "Failed to load skin files for animation preview.")
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load animation data: {str(e)}")
     
+    def browse_mask_cube(self):
+        """Preview a .npy mask cube over the loaded base and input skins"""
+        if not hasattr(self, 'skin_viewer') or self.skin_viewer is None:
+            messagebox.showwarning("Warning", "3D Skin Viewer is not available.")
+            return
+        
+        if not self.skin_viewer.base_skin_texture or not self.skin_viewer.input_skin_texture:
+            messagebox.showwarning("Warning", "Load a base skin and an input skin first.")
+            return
+        
+        filename = filedialog.askopenfilename(
+            title="Select Mask Cube",
+            filetypes=[("Mask cubes", "*.npy"), ("All files", "*.*")],
+            initialdir=os.getcwd()
+        )
+        
+        if filename:
+            if self.skin_viewer.load_mask_cube(filename):
+                self.reset_3d_animation_controls()
+            else:
+                messagebox.showerror("Error", "Failed to load mask cube. Please make sure it's a (frames, height, width) uint8 .npy file.")
+    
+    def reset_3d_animation_controls(self):
+        """Fit the 3D animation slider to the viewer's frames and go back to frame 0"""
+        max_frame = max(0, self.skin_viewer.frame_count() - 1)
+        self.animation_3d_slider.configure(
+            from_=0,
+            to=max_frame,
+            number_of_steps=max(1, max_frame)
+        )
+        
+        self.current_3d_frame = 0
+        self.animation_3d_frame_var.set(f"Frame: 0/{max_frame}")
+        self.animation_3d_slider.set(0)
+    
     def scrub_3d_animation(self, value):
         """Handle 3D animation scrubbing via slider"""
         if not hasattr(self, 'skin_viewer') or self.skin_viewer is None:
@@ -630,7 +764,8 @@ class MinecraftSkinAnimator:
         frame_index = int(float(value))
         if self.skin_viewer.show_animation_frame(frame_index):
             self.current_3d_frame = frame_index
-            max_frame = max(0, len(self.skin_viewer.animation_frames) - 1)
+            self.animation_3d_player.seek(frame_index)
+            max_frame = max(0, self.skin_viewer.frame_count() - 1)
             self.animation_3d_frame_var.set(f"Frame: {frame_index}/{max_frame}")
     
     def toggle_3d_animation_playback(self):
@@ -654,32 +789,136 @@ class MinecraftSkinAnimator:
             
         self.is_3d_playing = True
         self.play_3d_btn.configure(text="⏸️")
-        self.play_3d_animation_frame()
+        self.animation_3d_player.set_target_fps(self.parse_playback_fps(self.playback_3d_fps_var, 6.7))
+        self.animation_3d_player.start(self.current_3d_frame)
     
     def stop_3d_animation(self):
         """Stop automatic 3D animation playback"""
         self.is_3d_playing = False
         self.play_3d_btn.configure(text="▶️")
-        if self.play_3d_timer:
-            self.root.after_cancel(self.play_3d_timer)
-            self.play_3d_timer = None
+        self.animation_3d_player.stop()
     
-    def play_3d_animation_frame(self):
-        """Play next 3D animation frame"""
+    def display_3d_animation_frame(self, frame_index):
+        """Show a 3D animation frame chosen by the playback scheduler"""
         if not self.is_3d_playing or not self.skin_viewer.has_animation_data():
+            self.stop_3d_animation()
+            return
+        
+        if self.skin_viewer.show_animation_frame(frame_index):
+            self.current_3d_frame = frame_index
+            self.animation_3d_slider.set(frame_index)
+            max_frame = max(0, self.skin_viewer.frame_count() - 1)
+            self.animation_3d_frame_var.set(f"Frame: {frame_index}/{max_frame}")
+    
+    def apply_3d_playback_fps(self):
+        """Apply the 3D preview target FPS entered by the user"""
+        self.animation_3d_player.set_target_fps(self.parse_playback_fps(self.playback_3d_fps_var, 6.7))
+    
+    def parse_playback_fps(self, fps_var, default):
+        """Read a target FPS from an entry variable, resetting it if invalid"""
+        try:
+            fps = float(fps_var.get())
+            if fps <= 0:
+                raise ValueError("FPS must be positive")
+        except ValueError:
+            fps = default
+        fps = PlaybackScheduler.clamp_fps(fps)
+        fps_var.set(f"{fps:g}")
+        return fps
+    
+    def format_playback_stats(self, fps, render_ms, skipped):
+        """Format measured playback timing for display"""
+        return f"Measured: {fps:.1f} FPS | {render_ms:.0f} ms/frame | {skipped} skipped"
+    
+    def start_3d_animation_export(self):
+        """Ask where to save and export the 3D reveal animation in the background"""
+        if not hasattr(self, 'skin_viewer') or self.skin_viewer is None:
+            messagebox.showwarning("Warning", "3D Skin Viewer is not available.")
             return
-            
-        # Move to next frame
-        self.current_3d_frame = (self.current_3d_frame + 1) % len(self.skin_viewer.animation_frames)
         
-        # Update display
-        if self.skin_viewer.show_animation_frame(self.current_3d_frame):
-            self.animation_3d_slider.set(self.current_3d_frame)
-            max_frame = max(0, len(self.skin_viewer.animation_frames) - 1)
-            self.animation_3d_frame_var.set(f"Frame: {self.current_3d_frame}/{max_frame}")
+        viewer = self.skin_viewer
+        if not viewer.has_animation_data() or viewer.mask_stack is None:
+            messagebox.showwarning("Warning", "No animation data loaded. Please load base skin, input skin, and animation frames first.")
+            return
+        
+        output_path = filedialog.asksaveasfilename(
+            title="Export 3D Animation",
+            defaultextension=".gif",
+            filetypes=[("Animated GIF", "*.gif"), ("Animated WebP", "*.webp"), ("PNG sequence folder", "*")]
+        )
+        if not output_path:
+            return
+        
+        self.stop_3d_animation()
+        self.export_3d_btn.configure(state="disabled")
+        
+        # Snapshot the viewer state so the export doesn't race with the UI
+        export_args = (
+            viewer.base_skin_pixels,
+            viewer.input_skin_pixels,
+            viewer.mask_stack,
+            output_path,
+        )
+        export_kwargs = {
+            "orbit_degrees": 360.0 if self.export_3d_orbit_var.get() else 0.0,
+            "rotation_x": viewer.rotation_x,
+            "rotation_y": viewer.rotation_y,
+            "fps": self.animation_3d_player.target_fps,
+        }
+        
+        thread = threading.Thread(target=self.export_3d_animation, args=(export_args, export_kwargs))
+        thread.daemon = True
+        thread.start()
+    
+    def export_3d_animation(self, export_args, export_kwargs):
+        """Render and save the 3D reveal animation (runs on a worker thread)"""
+        def report_progress(done, total):
+            self.animation_3d_frame_var.set(f"Exporting frame {done}/{total}")
         
-        # Schedule next frame (150ms = ~6.7 FPS, good for 3D preview)
-        self.play_3d_timer = self.root.after(150, self.play_3d_animation_frame)
+        try:
+            output_path = export_reveal_animation(*export_args, progress_callback=report_progress, **export_kwargs)
+            self.animation_3d_frame_var.set("✅ Export complete")
+            messagebox.showinfo("Success", f"3D animation exported!\nOutput: {output_path}")
+        except Exception as e:
+            self.animation_3d_frame_var.set("❌ Export failed")
+            messagebox.showerror("Error", f"Failed to export 3D animation: {str(e)}")
+        finally:
+            self.export_3d_btn.configure(state="normal")
+    
+    def start_composited_export(self):
+        """Save the composed skin of every animation frame to output/<input>_composited/ in the background"""
+        if not hasattr(self, 'skin_viewer') or self.skin_viewer is None:
+            messagebox.showwarning("Warning", "3D Skin Viewer is not available.")
+            return
+        
+        viewer = self.skin_viewer
+        if not viewer.has_animation_data() or viewer.mask_stack is None:
+            messagebox.showwarning("Warning", "No animation data loaded. Please load base skin, input skin, and animation frames first.")
+            return
+        
+        base_name = Path(self.input_skin_path_var.get() or self.current_image_path or "skin").stem
+        self.export_composited_btn.configure(state="disabled")
+        
+        # Snapshot the viewer state so the export doesn't race with the UI
+        export_args = (viewer.base_skin_pixels, viewer.input_skin_pixels, viewer.mask_stack, base_name)
+        thread = threading.Thread(target=self.export_composited_frames, args=export_args)
+        thread.daemon = True
+        thread.start()
+    
+    def export_composited_frames(self, base_pixels, input_pixels, mask_stack, base_name):
+        """Compose every frame in one pass and save the skins (runs on a worker thread)"""
+        try:
+            self.animation_3d_frame_var.set("Composing skins...")
+            skin_frames = compose_skin_frames(base_pixels, input_pixels, mask_stack)
+            self.animation_3d_frame_var.set("Saving skins...")
+            output_dir = write_animation_output(skin_frames, "output", base_name, "composited")
+            self.animation_3d_frame_var.set("✅ Composited skins saved")
+            messagebox.showinfo("Success", f"Saved {len(skin_frames)} composited skins!\nOutput: {output_dir}")
+        except Exception as e:
+            self.animation_3d_frame_var.set("❌ Save failed")
+            messagebox.showerror("Error", f"Failed to save composited skins: {str(e)}")
+        finally:
+            self.export_composited_btn.configure(state="normal")
     
     def reset_3d_animation(self):
         """Reset 3D animation to first frame"""
@@ -693,7 +932,7 @@ class MinecraftSkinAnimator:
         self.current_3d_frame = 0
         if self.skin_viewer.show_animation_frame(0):
             self.animation_3d_slider.set(0)
-            max_frame = max(0, len(self.skin_viewer.animation_frames) - 1)
+            max_frame = max(0, self.skin_viewer.frame_count() - 1)
             self.animation_3d_frame_var.set(f"Frame: 0/{max_frame}")
     
     def show_base_skin_only(self):
@@ -710,7 +949,7 @@ class MinecraftSkinAnimator:
         try:
             if self.current_image_path and os.path.exists(self.current_image_path):
                 # Load and resize image for preview
-                img = Image.open(self.current_image_path)
+                img = load_skin_texture(self.current_image_path).image
                 
                 # Get available space for preview (dynamic sizing)
                 self.root.update_idletasks()  # Ensure window is updated
@@ -774,44 +1013,39 @@ class MinecraftSkinAnimator:
     def generate_animation_frames(self):
         try:
             self.status_var.set("Loading image...")
-            self.progress_var.set(0.1)
+            self.progress_var.set(0.05)
             
-            # Load the original image
-            original_img = Image.open(self.current_image_path)
-            
-            # Ensure it has an alpha channel
-            if original_img.mode != 'RGBA':
-                original_img = original_img.convert('RGBA')
+            # Load the original image (decoded as RGBA, shared with the preview)
+            texture = load_skin_texture(self.current_image_path)
             
             # Create output directory
             base_name = Path(self.current_image_path).stem
             output_dir = Path("output") / f"{base_name}_animation"
-            output_dir.mkdir(parents=True, exist_ok=True)
             
             frames = int(self.frames_var.get())
             animation_type = self.animation_type.get()
+            output_size = self.output_size.get()
+            scale = mask_upscale_factor(texture.pixels.shape[:2], None if output_size == "Skin size" else int(output_size))
             
             self.status_var.set("Generating frames...")
             
-            # Generate frames based on animation type
-            if animation_type == "Head to Toe":
-                self.generate_head_to_toe_frames(original_img, output_dir, frames)
-            elif animation_type == "Toe to Head":
-                self.generate_toe_to_head_frames(original_img, output_dir, frames)
-            elif animation_type == "Core to Limbs":
-                self.generate_core_to_limbs_frames(original_img, output_dir, frames)
-            elif animation_type == "Limbs to Core":
-                self.generate_limbs_to_core_frames(original_img, output_dir, frames)
-            elif animation_type == "Left to Right Body":
-                self.generate_left_to_right_body_frames(original_img, output_dir, frames)
-            elif animation_type == "Right to Left Body":
-                self.generate_right_to_left_body_frames(original_img, output_dir, frames)
+            def report_generated(done, total):
+                self.progress_var.set(0.1 + 0.4 * done / total)
+                self.status_var.set(f"Generated frame {done}/{total} - Growth: {int(done / total * 100)}%")
+            
+            def report_saved(done, total):
+                self.progress_var.set(0.5 + 0.45 * done / total)
+                self.status_var.set(f"Saved frame {done - 1}/{total - 1}")
+            
+            # Masks stay in memory for the viewers; the PNG files are only the saved copy
+            mask_stack = generate_mask_stack(texture.pixels, frames, animation_type, report_generated)
+            frame_paths = save_mask_frames(mask_stack, output_dir, base_name, report_saved, scale)
             
             self.progress_var.set(1.0)
             self.status_var.set(f"✅ Generated {frames+1} frames in {output_dir}")
             
-            # Load the animation frames for viewing
-            self.load_animation_frames(output_dir)
+            # Show the animation frames without reading them back from disk
+            self.load_animation_mask_stack(mask_stack, frame_paths)
             
             messagebox.showinfo("Success", f"Animation frames generated successfully!\nOutput: {output_dir}")
             
@@ -820,539 +1054,23 @@ class MinecraftSkinAnimator:
             self.status_var.set("❌ Generation failed")
         finally:
             self.generate_btn.configure(state="normal")
-            
-    def create_pixel_growth_mask(self, original_img, progress, animation_type):
-        """Create alpha mask with pixel-by-pixel growth effect"""
-        mask = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        original_pixels = original_img.load()
-        mask_pixels = mask.load()
-        
-        if animation_type == "Head to Toe":
-            self.apply_head_to_toe_growth(original_pixels, mask_pixels, original_img, progress)
-        elif animation_type == "Toe to Head":
-            self.apply_toe_to_head_growth(original_pixels, mask_pixels, original_img, progress)
-        elif animation_type == "Core to Limbs":
-            self.apply_core_to_limbs_growth(original_pixels, mask_pixels, original_img, progress)
-        elif animation_type == "Limbs to Core":
-            self.apply_limbs_to_core_growth(original_pixels, mask_pixels, original_img, progress)
-        elif animation_type == "Left to Right Body":
-            self.apply_left_to_right_growth(original_pixels, mask_pixels, original_img, progress)
-        elif animation_type == "Right to Left Body":
-            self.apply_right_to_left_growth(original_pixels, mask_pixels, original_img, progress)
-        
-        return mask
-    
-    def apply_head_to_toe_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply head-to-toe pixel growth effect based on anatomical 3D positions"""
-        # Define anatomical order from head to toe with their UV regions
-        anatomical_order = [
-            # 1. Head top (very top of character)
-            ['head_top', 'head_outer_top'],
-            
-            # 2. Head middle (face level)
-            ['head_front', 'head_back', 'head_left', 'head_right', 
-             'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right'],
-            
-            # 3. Head bottom / neck area
-            ['head_bottom', 'head_outer_bottom'],
-            
-            # 4. Shoulders / body top
-            ['body_top', 'body_outer_top'],
-            
-            # 5. Upper torso
-            ['body_front', 'body_back', 'body_left', 'body_right'],
-            
-            # 6. Upper arms (shoulder level)
-            ['right_arm_top', 'left_arm_top'],
-            
-            # 7. Mid torso + upper arms
-            ['body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right',
-             'right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right',
-             'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right'],
-            
-            # 8. Lower torso / waist
-            ['body_bottom', 'body_outer_bottom'],
-            
-            # 9. Upper legs / hips
-            ['left_leg_top', 'right_leg_top'],
-            
-            # 10. Lower arms + upper legs
-            ['right_arm_bottom', 'left_arm_bottom',
-             'left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right',
-             'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right'],
-            
-            # 11. Feet
-            ['left_leg_bottom', 'right_leg_bottom']
-        ]
-        
-        # Calculate which anatomical level we should grow to
-        num_levels = len(anatomical_order)
-        current_level = int(progress * num_levels)
-        level_progress = (progress * num_levels) - current_level
-        
-        # Copy pixels for all completed levels
-        for level in range(min(current_level + 1, num_levels)):
-            parts_at_level = anatomical_order[level]
-            
-            # If this is the current level being grown, apply partial growth
-            if level == current_level:
-                # For the current level, grow pixel by pixel within that level
-                self.apply_partial_level_growth(original_pixels, mask_pixels, original_img, 
-                                              parts_at_level, level_progress)
-            else:
-                # For completed levels, show all pixels
-                self.apply_full_level_growth(original_pixels, mask_pixels, original_img, parts_at_level)
-    
-    def apply_partial_level_growth(self, original_pixels, mask_pixels, original_img, parts, progress):
-        """Apply partial growth within a specific anatomical level"""
-        if not parts:
-            return
-            
-        # Collect all pixels from this level
-        level_pixels = []
-        for part_name in parts:
-            if part_name in SKIN_UV_MAPPING:
-                x1, y1, x2, y2 = SKIN_UV_MAPPING[part_name]
-                for y in range(y1, min(y2, original_img.height)):
-                    for x in range(x1, min(x2, original_img.width)):
-                        if 0 <= x < original_img.width and 0 <= y < original_img.height:
-                            r, g, b, a = original_pixels[x, y]
-                            if a > 0:  # Only include non-transparent pixels
-                                level_pixels.append((x, y, r, g, b, a))
-        
-        # Sort pixels by Y coordinate (top to bottom growth within level)
-        level_pixels.sort(key=lambda pixel: (pixel[1], pixel[0]))  # Sort by Y ascending, then X
-        
-        # Apply pixels based on progress through this level
-        num_pixels_to_show = int(len(level_pixels) * progress)
-        for i in range(num_pixels_to_show):
-            x, y, r, g, b, a = level_pixels[i]
-            mask_pixels[x, y] = (0, 0, 0, a)
-    
-    def apply_full_level_growth(self, original_pixels, mask_pixels, original_img, parts):
-        """Apply full growth for a completed anatomical level"""
-        for part_name in parts:
-            if part_name in SKIN_UV_MAPPING:
-                x1, y1, x2, y2 = SKIN_UV_MAPPING[part_name]
-                for y in range(y1, min(y2, original_img.height)):
-                    for x in range(x1, min(x2, original_img.width)):
-                        if 0 <= x < original_img.width and 0 <= y < original_img.height:
-                            r, g, b, a = original_pixels[x, y]
-                            if a > 0:
-                                mask_pixels[x, y] = (0, 0, 0, a)
-    
-    def apply_toe_to_head_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply toe-to-head pixel growth effect based on anatomical 3D positions"""
-        # Define anatomical order from toe to head (reverse of head-to-toe)
-        anatomical_order = [
-            # 1. Feet
-            ['left_leg_bottom', 'right_leg_bottom'],
-            
-            # 2. Lower legs + lower arms
-            ['left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right',
-             'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right',
-             'right_arm_bottom', 'left_arm_bottom'],
-            
-            # 3. Upper legs / hips
-            ['left_leg_top', 'right_leg_top'],
-            
-            # 4. Lower torso / waist
-            ['body_bottom', 'body_outer_bottom'],
-            
-            # 5. Mid torso + arms
-            ['body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right',
-             'right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right',
-             'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right'],
-            
-            # 6. Upper arms (shoulder level)
-            ['right_arm_top', 'left_arm_top'],
-            
-            # 7. Upper torso
-            ['body_front', 'body_back', 'body_left', 'body_right'],
-            
-            # 8. Shoulders / body top
-            ['body_top', 'body_outer_top'],
-            
-            # 9. Head bottom / neck area
-            ['head_bottom', 'head_outer_bottom'],
-            
-            # 10. Head middle (face level)
-            ['head_front', 'head_back', 'head_left', 'head_right', 
-             'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right'],
-            
-            # 11. Head top (very top of character)
-            ['head_top', 'head_outer_top']
-        ]
-        
-        # Calculate which anatomical level we should grow to
-        num_levels = len(anatomical_order)
-        current_level = int(progress * num_levels)
-        level_progress = (progress * num_levels) - current_level
-        
-        # Copy pixels for all completed levels
-        for level in range(min(current_level + 1, num_levels)):
-            parts_at_level = anatomical_order[level]
-            
-            # If this is the current level being grown, apply partial growth
-            if level == current_level:
-                # For toe-to-head, grow from bottom up within each level
-                self.apply_partial_level_growth_reverse(original_pixels, mask_pixels, original_img, 
-                                                      parts_at_level, level_progress)
-            else:
-                # For completed levels, show all pixels
-                self.apply_full_level_growth(original_pixels, mask_pixels, original_img, parts_at_level)
-    
-    def apply_partial_level_growth_reverse(self, original_pixels, mask_pixels, original_img, parts, progress):
-        """Apply partial growth within a level, but from bottom up"""
-        if not parts:
-            return
-            
-        # Collect all pixels from this level
-        level_pixels = []
-        for part_name in parts:
-            if part_name in SKIN_UV_MAPPING:
-                x1, y1, x2, y2 = SKIN_UV_MAPPING[part_name]
-                for y in range(y1, min(y2, original_img.height)):
-                    for x in range(x1, min(x2, original_img.width)):
-                        if 0 <= x < original_img.width and 0 <= y < original_img.height:
-                            r, g, b, a = original_pixels[x, y]
-                            if a > 0:
-                                level_pixels.append((x, y, r, g, b, a))
-        
-        # Sort pixels by Y coordinate (bottom to top growth within level)
-        level_pixels.sort(key=lambda pixel: (-pixel[1], pixel[0]))  # Sort by Y descending, then X
-        
-        # Apply pixels based on progress through this level
-        num_pixels_to_show = int(len(level_pixels) * progress)
-        for i in range(num_pixels_to_show):
-            x, y, r, g, b, a = level_pixels[i]
-            mask_pixels[x, y] = (0, 0, 0, a)
-    
-    def apply_core_to_limbs_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply core-to-limbs growth based on anatomical distance from torso center"""
-        # Define core parts (torso and head)
-        core_parts = ['head_front', 'head_back', 'head_left', 'head_right', 'head_top', 'head_bottom',
-                     'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right', 
-                     'head_outer_top', 'head_outer_bottom',
-                     'body_front', 'body_back', 'body_left', 'body_right', 'body_top', 'body_bottom',
-                     'body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right', 
-                     'body_outer_top', 'body_outer_bottom']
-        
-        # Define limb parts (arms and legs)
-        limb_parts = ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
-                     'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom',
-                     'left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
-                     'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom']
-        
-        # At 50% progress, core should be complete, limbs start
-        if progress <= 0.5:
-            # First half: grow core parts
-            core_progress = progress * 2.0  # Scale to 0-1
-            self.apply_partial_level_growth(original_pixels, mask_pixels, original_img, core_parts, core_progress)
-        else:
-            # Second half: core complete, grow limbs
-            self.apply_full_level_growth(original_pixels, mask_pixels, original_img, core_parts)
-            limb_progress = (progress - 0.5) * 2.0  # Scale to 0-1
-            self.apply_partial_level_growth(original_pixels, mask_pixels, original_img, limb_parts, limb_progress)
-    
-    def apply_limbs_to_core_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply limbs-to-core growth (reverse of core-to-limbs)"""
-        # Define core parts and limb parts
-        core_parts = ['head_front', 'head_back', 'head_left', 'head_right', 'head_top', 'head_bottom',
-                     'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right', 
-                     'head_outer_top', 'head_outer_bottom',
-                     'body_front', 'body_back', 'body_left', 'body_right', 'body_top', 'body_bottom',
-                     'body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right', 
-                     'body_outer_top', 'body_outer_bottom']
-        
-        limb_parts = ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
-                     'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom',
-                     'left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
-                     'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom']
-        
-        # At 50% progress, limbs should be complete, core starts
-        if progress <= 0.5:
-            # First half: grow limbs
-            limb_progress = progress * 2.0
-            self.apply_partial_level_growth(original_pixels, mask_pixels, original_img, limb_parts, limb_progress)
-        else:
-            # Second half: limbs complete, grow core
-            self.apply_full_level_growth(original_pixels, mask_pixels, original_img, limb_parts)
-            core_progress = (progress - 0.5) * 2.0
-            self.apply_partial_level_growth(original_pixels, mask_pixels, original_img, core_parts, core_progress)
-    
-    def apply_left_to_right_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply left-to-right growth based on anatomical left-to-right body positioning"""
-        # Define anatomical order from left to right side of body
-        anatomical_order = [
-            # 1. Left side parts
-            ['left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
-             'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom'],
-            
-            # 2. Center parts (head and body)
-            ['head_front', 'head_back', 'head_top', 'head_bottom',
-             'head_outer_front', 'head_outer_back', 'head_outer_top', 'head_outer_bottom',
-             'body_front', 'body_back', 'body_top', 'body_bottom',
-             'body_outer_front', 'body_outer_back', 'body_outer_top', 'body_outer_bottom'],
-            
-            # 3. Left side faces of center parts
-            ['head_left', 'head_outer_left', 'body_left', 'body_outer_left'],
-            
-            # 4. Right side faces of center parts
-            ['head_right', 'head_outer_right', 'body_right', 'body_outer_right'],
-            
-            # 5. Right side parts
-            ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
-             'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom']
-        ]
-        
-        # Calculate which anatomical level we should grow to
-        num_levels = len(anatomical_order)
-        current_level = int(progress * num_levels)
-        level_progress = (progress * num_levels) - current_level
-        
-        # Copy pixels for all completed levels
-        for level in range(min(current_level + 1, num_levels)):
-            parts_at_level = anatomical_order[level]
-            
-            # If this is the current level being grown, apply partial growth
-            if level == current_level:
-                self.apply_partial_level_growth_horizontal(original_pixels, mask_pixels, original_img, 
-                                                         parts_at_level, level_progress, left_to_right=True)
-            else:
-                # For completed levels, show all pixels
-                self.apply_full_level_growth(original_pixels, mask_pixels, original_img, parts_at_level)
-    
-    def apply_right_to_left_growth(self, original_pixels, mask_pixels, original_img, progress):
-        """Apply right-to-left growth based on anatomical right-to-left body positioning"""
-        # Define anatomical order from right to left side of body (reverse of left-to-right)
-        anatomical_order = [
-            # 1. Right side parts
-            ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
-             'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom'],
-            
-            # 2. Right side faces of center parts
-            ['head_right', 'head_outer_right', 'body_right', 'body_outer_right'],
-            
-            # 3. Left side faces of center parts
-            ['head_left', 'head_outer_left', 'body_left', 'body_outer_left'],
-            
-            # 4. Center parts (head and body)
-            ['head_front', 'head_back', 'head_top', 'head_bottom',
-             'head_outer_front', 'head_outer_back', 'head_outer_top', 'head_outer_bottom',
-             'body_front', 'body_back', 'body_top', 'body_bottom',
-             'body_outer_front', 'body_outer_back', 'body_outer_top', 'body_outer_bottom'],
-            
-            # 5. Left side parts
-            ['left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
-             'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom']
-        ]
-        
-        # Calculate which anatomical level we should grow to
-        num_levels = len(anatomical_order)
-        current_level = int(progress * num_levels)
-        level_progress = (progress * num_levels) - current_level
-        
-        # Copy pixels for all completed levels
-        for level in range(min(current_level + 1, num_levels)):
-            parts_at_level = anatomical_order[level]
-            
-            # If this is the current level being grown, apply partial growth
-            if level == current_level:
-                self.apply_partial_level_growth_horizontal(original_pixels, mask_pixels, original_img, 
-                                                         parts_at_level, level_progress, left_to_right=False)
-            else:
-                # For completed levels, show all pixels
-                self.apply_full_level_growth(original_pixels, mask_pixels, original_img, parts_at_level)
-    
-    def apply_partial_level_growth_horizontal(self, original_pixels, mask_pixels, original_img, parts, progress, left_to_right=True):
-        """Apply partial growth within a level, growing horizontally"""
-        if not parts:
-            return
-            
-        # Collect all pixels from this level
-        level_pixels = []
-        for part_name in parts:
-            if part_name in SKIN_UV_MAPPING:
-                x1, y1, x2, y2 = SKIN_UV_MAPPING[part_name]
-                for y in range(y1, min(y2, original_img.height)):
-                    for x in range(x1, min(x2, original_img.width)):
-                        if 0 <= x < original_img.width and 0 <= y < original_img.height:
-                            r, g, b, a = original_pixels[x, y]
-                            if a > 0:  # Only include non-transparent pixels
-                                level_pixels.append((x, y, r, g, b, a))
-        
-        # Sort pixels by X coordinate (left to right or right to left growth within level)
-        if left_to_right:
-            level_pixels.sort(key=lambda pixel: (pixel[0], pixel[1]))  # Sort by X ascending, then Y
-        else:
-            level_pixels.sort(key=lambda pixel: (-pixel[0], pixel[1]))  # Sort by X descending, then Y
-        
-        # Apply pixels based on progress through this level
-        num_pixels_to_show = int(len(level_pixels) * progress)
-        for i in range(num_pixels_to_show):
-            x, y, r, g, b, a = level_pixels[i]
-            mask_pixels[x, y] = (0, 0, 0, a)
-    
-    def generate_head_to_toe_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from head to toe pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Head to Toe")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
-            
-    def generate_toe_to_head_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from toe to head pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Toe to Head")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
-            
-    def generate_core_to_limbs_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from core to limbs pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Core to Limbs")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
-            
-    def generate_limbs_to_core_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from limbs to core pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Limbs to Core")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
-            
-    def generate_left_to_right_body_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from left to right pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Left to Right Body")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
-            
-    def generate_right_to_left_body_frames(self, original_img, output_dir, frames):
-        """Generate frames that grow from right to left pixel by pixel"""
-        base_name = Path(self.current_image_path).stem
-        
-        # Generate frame 0 (blank image)
-        self.progress_var.set(0.05)
-        blank_frame = Image.new('RGBA', (original_img.width, original_img.height), (0, 0, 0, 0))
-        frame_path = output_dir / f"{base_name}_0.png"
-        blank_frame.save(frame_path, "PNG")
-        self.status_var.set(f"Generated frame 0/{frames}")
-        
-        for i in range(frames):
-            progress = (i + 1) / frames
-            self.progress_var.set(0.1 + 0.8 * progress)
-            
-            # Create pixel growth mask
-            frame = self.create_pixel_growth_mask(original_img, progress, "Right to Left Body")
-            
-            # Save frame
-            frame_path = output_dir / f"{base_name}_{i+1}.png"
-            frame.save(frame_path, "PNG")
-            
-            self.status_var.set(f"Generated frame {i+1}/{frames} - Growth: {int(progress*100)}%")
     
     def scrub_animation(self, value):
         """Handle animation scrubbing via slider"""
-        if not self.animation_images:
+        if not self.animation_frame_count():
             return
             
         frame_index = int(float(value))
-        if 0 <= frame_index < len(self.animation_images):
+        if 0 <= frame_index < self.animation_frame_count():
             self.current_frame = frame_index
-            self.animation_label.configure(image=self.animation_images[frame_index], text="")
-            max_frame_display = max(0, len(self.animation_images) - 1)
+            self.animation_player.seek(frame_index)
+            self.animation_label.configure(image=self.get_animation_image(frame_index), text="")
+            max_frame_display = max(0, self.animation_frame_count() - 1)
             self.frame_counter_var.set(f"Frame: {frame_index}/{max_frame_display}")
     
     def toggle_animation_playback(self):
         """Toggle animation playback"""
-        if not self.animation_images:
+        if not self.animation_frame_count():
             return
             
         if self.is_playing:
@@ -1362,113 +1080,141 @@ class MinecraftSkinAnimator:
     
     def start_animation(self):
         """Start automatic animation playback"""
-        if not self.animation_images:
+        if not self.animation_frame_count():
             return
             
         self.is_playing = True
         self.play_btn.configure(text="⏸️")
-        self.play_animation_frame()
+        self.animation_player.set_target_fps(self.parse_playback_fps(self.playback_fps_var, 10))
+        self.animation_player.start(self.current_frame)
     
     def stop_animation(self):
         """Stop automatic animation playback"""
         self.is_playing = False
         self.play_btn.configure(text="▶️")
-        if self.play_timer:
-            self.root.after_cancel(self.play_timer)
-            self.play_timer = None
+        self.animation_player.stop()
     
-    def play_animation_frame(self):
-        """Play next animation frame"""
-        if not self.is_playing or not self.animation_images:
+    def display_animation_frame(self, frame_index):
+        """Show an animation frame chosen by the playback scheduler"""
+        if not self.is_playing or not self.animation_frame_count():
+            self.stop_animation()
             return
-            
-        # Move to next frame
-        self.current_frame = (self.current_frame + 1) % len(self.animation_images)
-        
-        # Update display
-        self.animation_label.configure(image=self.animation_images[self.current_frame], text="")
-        self.animation_slider.set(self.current_frame)
-        max_frame_display = max(0, len(self.animation_images) - 1)
-        self.frame_counter_var.set(f"Frame: {self.current_frame}/{max_frame_display}")
         
-        # Schedule next frame (100ms = 10 FPS)
-        self.play_timer = self.root.after(100, self.play_animation_frame)
+        self.current_frame = frame_index
+        self.animation_label.configure(image=self.get_animation_image(frame_index), text="")
+        self.animation_slider.set(frame_index)
+        max_frame_display = max(0, self.animation_frame_count() - 1)
+        self.frame_counter_var.set(f"Frame: {frame_index}/{max_frame_display}")
     
-    def load_animation_frames(self, output_dir):
-        """Load generated animation frames for viewing"""
-        self.animation_frames = []
-        self.animation_images = []
+    def apply_playback_fps(self):
+        """Apply the animation viewer target FPS entered by the user"""
+        self.animation_player.set_target_fps(self.parse_playback_fps(self.playback_fps_var, 10))
+    
+    def load_animation_mask_stack(self, mask_stack, frame_paths):
+        """Show an in-memory mask stack (with the files it was saved to) in the animation viewer"""
+        self.animation_frames = list(frame_paths)
+        self.animation_mask_stack = mask_stack
+        self.animation_images.clear()
+        self.animation_source_frames.clear()
         
         try:
-            # Get all PNG files in the output directory and sort them by number
-            frame_files = list(output_dir.glob("*.png"))
-            # Sort by the number at the end of filename (e.g., name_0.png, name_1.png, etc.)
-            try:
-                frame_files.sort(key=lambda x: int(x.stem.split('_')[-1]))
-            except (ValueError, IndexError):
-                # Fallback to alphabetical sort if number parsing fails
-                frame_files.sort()
-            
-            if not frame_files:
-                return
-            
-            # Get available space for animation viewer (dynamic sizing)
-            self.root.update_idletasks()
-            available_width = max(150, self.animation_frame.winfo_width() - 40)
-            available_height = max(100, self.animation_frame.winfo_height() - 40)
-            max_size = min(available_width, available_height, 300)  # Cap at 300px
-            
-            # Load each frame
-            for frame_file in frame_files:
-                img = Image.open(frame_file)
-                
-                # Scale image for display (responsive sizing)
-                # Avoid division by zero
-                if img.height == 0 or img.width == 0:
-                    display_width = display_height = max_size
-                else:
-                    img_ratio = img.width / img.height
-                    
-                    if img_ratio > 1:
-                        display_width = min(max_size, img.width * 3)
-                        display_height = int(display_width / img_ratio)
-                    else:
-                        display_height = min(max_size, img.height * 3)
-                        display_width = int(display_height * img_ratio)
-                
-                # Ensure minimum size for visibility
-                display_width = max(48, display_width)
-                display_height = max(48, display_height)
-                
-                # Resize with nearest neighbor to maintain pixel art quality
-                display_img = img.resize((display_width, display_height), Image.NEAREST)
-                photo_img = ImageTk.PhotoImage(display_img)
-                
-                self.animation_frames.append(str(frame_file))
-                self.animation_images.append(photo_img)
-            
-            # Update slider range
-            if self.animation_images and len(self.animation_images) > 0:
-                max_frame = max(0, len(self.animation_images) - 1)
-                self.animation_slider.configure(
-                    from_=0,
-                    to=max_frame,
-                    number_of_steps=max(1, max_frame)
-                )
-                
-                # Show first frame
-                self.current_frame = 0
-                self.animation_label.configure(image=self.animation_images[0], text="")
-                self.animation_slider.set(0)
-                max_frame_display = max(0, len(self.animation_images) - 1)
-                self.frame_counter_var.set(f"Frame: 0/{max_frame_display}")
-                
-                self.status_var.set(f"✅ Loaded {len(self.animation_images)} animation frames")
-            
+            self.show_loaded_animation()
         except Exception as e:
             print(f"Error loading animation frames: {e}")
             self.status_var.set("❌ Failed to load animation frames")
     
+    def show_loaded_animation(self):
+        """Reset the animation viewer to the first of the newly loaded frames"""
+        self.current_frame = 0
+        self.animation_display_scale = 0
+        self.rescale_animation_frames()
+        
+        # Update slider range
+        if self.animation_frame_count() > 0:
+            max_frame = max(0, self.animation_frame_count() - 1)
+            self.animation_slider.configure(
+                from_=0,
+                to=max_frame,
+                number_of_steps=max(1, max_frame)
+            )
+            
+            # Show first frame
+            self.current_frame = 0
+            self.animation_label.configure(image=self.get_animation_image(0), text="")
+            self.animation_slider.set(0)
+            max_frame_display = max(0, self.animation_frame_count() - 1)
+            self.frame_counter_var.set(f"Frame: 0/{max_frame_display}")
+            
+            self.status_var.set(f"✅ Loaded {self.animation_frame_count()} animation frames")
+    
+    def animation_display_scale_for(self, width, height):
+        """Integer upscale factor that fits a frame of this size in the animation viewer"""
+        # Get available space for animation viewer (dynamic sizing)
+        self.root.update_idletasks()
+        available_width = max(150, self.animation_frame.winfo_width() - 40)
+        available_height = max(100, self.animation_frame.winfo_height() - 40)
+        max_size = min(available_width, available_height, 300)  # Cap at 300px
+        
+        # Up to 3x, but at least 48px on the short side for visibility
+        scale = min(3, max_size // max(1, width, height))
+        return max(1, scale, math.ceil(48 / max(1, min(width, height))))
+    
+    def animation_frame_count(self):
+        """Number of frames loaded into the animation viewer"""
+        return len(self.animation_frames)
+    
+    def get_animation_source_frame(self, frame_index):
+        """RGBA pixels of a frame from the mask stack, kept while it is in the display window"""
+        frame = self.animation_source_frames.get(frame_index)
+        if frame is not None:
+            self.animation_source_frames.move_to_end(frame_index)
+            return frame
+        
+        frame = mask_frame_pixels(self.animation_mask_stack[frame_index])
+        self.animation_source_frames[frame_index] = frame
+        while len(self.animation_source_frames) > self.animation_image_window + 1:
+            self.animation_source_frames.popitem(last=False)
+        return frame
+    
+    def get_animation_image(self, frame_index):
+        """
+        Display image for a frame. Images are built for the frame and the next
+        animation_image_window frames; older ones are evicted so the number of
+        Tk images stays constant however long the animation is.
+        """
+        frame_count = self.animation_frame_count()
+        for step in range(min(self.animation_image_window, frame_count - 1), -1, -1):
+            index = (frame_index + step) % frame_count
+            if index not in self.animation_images:
+                self.animation_images[index] = self.create_animation_image(self.get_animation_source_frame(index))
+            self.animation_images.move_to_end(index)
+        
+        while len(self.animation_images) > self.animation_image_window + 1:
+            self.animation_images.popitem(last=False)
+        return self.animation_images[frame_index]
+    
+    def create_animation_image(self, frame):
+        """Upscale a frame by the display scale into a Tk image"""
+        # Nearest-neighbor integer upscale keeps the pixel art crisp and is a plain array repeat
+        scale = self.animation_display_scale
+        return ImageTk.PhotoImage(Image.fromarray(np.repeat(np.repeat(frame, scale, axis=0), scale, axis=1), 'RGBA'))
+    
+    def rescale_animation_frames(self):
+        """Recompute the display scale, dropping display images built at an old scale"""
+        if not self.animation_frames:
+            return
+        
+        height, width = self.get_animation_source_frame(0).shape[:2]
+        scale = self.animation_display_scale_for(width, height)
+        if scale == self.animation_display_scale:
+            return
+        
+        self.animation_display_scale = scale
+        self.animation_images.clear()
+        
+        if 0 <= self.current_frame < self.animation_frame_count():
+            self.animation_label.configure(image=self.get_animation_image(self.current_frame), text="")
+    
     def on_window_resize(self, event):
         """Handle window resize events to refresh preview images"""
         # Only handle resize events for the main window, not child widgets
@@ -1485,12 +1231,8 @@ class MinecraftSkinAnimator:
             if self.current_image_path and os.path.exists(self.current_image_path):
                 self.load_preview()
             
-            # Refresh animation frames if they exist
-            if self.animation_frames and len(self.animation_frames) > 0:
-                # Get the output directory from the first frame path
-                first_frame_path = Path(self.animation_frames[0])
-                output_dir = first_frame_path.parent
-                self.load_animation_frames(output_dir)
+            # Rescale the already decoded animation frames to the new size
+            self.rescale_animation_frames()
         except Exception as e:
             # Silently handle any errors during refresh
             pass
@@ -0,0 +1,179 @@
+"""
+Batch job manifests and the completion journal that makes batch runs resumable.
+
+A manifest lists the skins to generate with per-job settings, as JSON:
+
+    {"defaults": {"type": "Head to Toe", "frames": 36, "format": "frames"},
+     "jobs": [{"skin": "skins/steve.png"},
+              {"skin": "skins/alex.png", "type": "Toe to Head", "frames": 120, "format": "sheet"}]}
+
+(a plain list of jobs also works) or as CSV with a header row:
+
+    skin,type,frames,format,name,size,base
+    skins/steve.png,,,,,,
+    skins/alex.png,Toe to Head,120,sheet,alex_slow,512,
+    skins/alex.png,,,composited,alex_over_steve,,skins/steve.png
+
+Empty fields fall back to the defaults. Relative skin paths are resolved
+against the manifest's folder, "name" overrides the output file prefix,
+"size" upscales the output to that width and "base" is the base skin that
+composited jobs reveal the skin over.
+
+The journal is an append-only JSON lines file. Each finished job's line is
+flushed and fsynced as soon as its output has been published. A rerun skips
+the jobs recorded as done whose output still exists, so a crash loses at most
+the jobs that were in flight.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+from animation_output import OUTPUT_FORMATS, output_path
+from mask_generator import ANIMATION_TYPES
+
+# One skin to generate and how; name is the output file prefix, size the
+# output width to upscale to (None keeps the skin's size) and base the base
+# skin of composited jobs
+BatchJob = namedtuple("BatchJob", ["skin_path", "animation_type", "frames", "output_format", "name", "size", "base"],
+                      defaults=(None, None))
+
+DEFAULT_JOB_SETTINGS = {"type": "Head to Toe", "frames": 36, "format": "frames", "size": None, "base": None}
+
+def make_job(skin_path, animation_type="Head to Toe", frames=36, output_format="frames", name=None, size=None,
+             base=None):
+    """Build a validated BatchJob"""
+    if animation_type not in ANIMATION_TYPES:
+        raise ValueError(f"Unknown animation type: {animation_type}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    frames = int(frames)
+    if frames <= 0:
+        raise ValueError(f"frames must be positive, got {frames}")
+    if size is not None:
+        size = int(size)
+        if size <= 0:
+            raise ValueError(f"size must be positive, got {size}")
+    if output_format == "composited" and not base:
+        raise ValueError("composited output needs a base skin")
+    return BatchJob(str(skin_path), animation_type, frames, output_format, name or Path(skin_path).stem, size,
+                    str(base) if base else None)
+
+def resolve_manifest_path(manifest_path, path):
+    """Resolve a path from a manifest relative to the manifest's folder"""
+    path = Path(path)
+    return path if path.is_absolute() else Path(manifest_path).parent / path
+
+def load_manifest(manifest_path, defaults=None):
+    """
+    Read the jobs listed in a JSON or CSV manifest.
+
+    Args:
+        manifest_path (str): .json or .csv manifest
+        defaults (dict): "type", "frames", "format", "size" and "base" for fields the manifest leaves out
+
+    Returns:
+        list: BatchJob per entry, in manifest order
+    """
+    manifest_path = Path(manifest_path)
+    settings = dict(DEFAULT_JOB_SETTINGS, **(defaults or {}))
+
+    if manifest_path.suffix.lower() == ".csv":
+        with open(manifest_path, newline="") as f:
+            entries = list(csv.DictReader(f))
+    else:
+        with open(manifest_path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            settings.update(data.get("defaults", {}))
+            entries = data.get("jobs", [])
+        else:
+            entries = data
+
+    jobs = []
+    for line, entry in enumerate(entries, 1):
+        # Drop empty CSV cells so they fall back to the defaults
+        entry = {key: value for key, value in entry.items() if key and value not in (None, "")}
+        if "skin" not in entry:
+            raise ValueError(f"{manifest_path}: job {line} has no skin")
+        skin_path = resolve_manifest_path(manifest_path, entry["skin"])
+        base = entry.get("base", settings["base"])
+        if base:
+            base = resolve_manifest_path(manifest_path, base)
+        try:
+            jobs.append(make_job(skin_path, entry.get("type", settings["type"]), entry.get("frames", settings["frames"]),
+                                 entry.get("format", settings["format"]), entry.get("name"),
+                                 entry.get("size", settings["size"]), base))
+        except ValueError as e:
+            raise ValueError(f"{manifest_path}: job {line}: {e}")
+    return jobs
+
+def file_version(path):
+    """[mtime_ns, size] of a file, or None if it can't be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+class JobJournal:
+    """Append-only record of started and finished batch jobs"""
+
+    def __init__(self, journal_path, output_root):
+        self.journal_path = Path(journal_path)
+        self.output_root = Path(output_root)
+        self.done_keys = set()
+        self.started_keys = set()
+
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-append
+                        continue
+                    if record.get("status") == "done":
+                        self.done_keys.add(record["key"])
+                    elif record.get("status") == "started":
+                        self.started_keys.add(record["key"])
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.journal_path, "a")
+
+    def job_key(self, job):
+        """Identity of a job: its settings, output location and the skin file's version"""
+        skin_path = os.path.abspath(job.skin_path)
+        identity = [skin_path, file_version(skin_path), job.animation_type, job.frames, job.output_format, job.name,
+                    os.path.abspath(self.output_root)]
+        if job.size is not None:
+            identity.append(job.size)
+        if job.base is not None:
+            base_path = os.path.abspath(job.base)
+            identity.extend([base_path, file_version(base_path)])
+        return hashlib.sha1(json.dumps(identity).encode()).hexdigest()
+
+    def is_done(self, job):
+        """True if the job finished in an earlier run and its output is still there"""
+        return (self.job_key(job) in self.done_keys
+                and output_path(self.output_root, job.name, job.output_format).exists())
+
+    def was_interrupted(self, job):
+        """True if an earlier run started the job but never finished it"""
+        key = self.job_key(job)
+        return key in self.started_keys and key not in self.done_keys
+
+    def record(self, job, status, **details):
+        """Append a status line; "done" lines are fsynced before returning"""
+        record = dict(key=self.job_key(job), status=status, skin=job.skin_path, time=time.time(), **details)
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if status == "done":
+            os.fsync(self._file.fileno())
+            self.done_keys.add(record["key"])
+
+    def close(self):
+        self._file.close()
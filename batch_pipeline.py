@@ -0,0 +1,417 @@
+"""
+Batch generation that overlaps skin reads, mask computation and frame writes.
+
+A batch run is three asyncio stages joined by bounded queues:
+
+    read (thread pool)  ->  generate (process pool)  ->  write (thread pool)
+
+While one skin's masks are being computed, the next skins are already being
+read and earlier results written, so the worker processes aren't left idle
+waiting on slow disks or network shares. The bounded queues keep at most a
+few skins per stage in memory. Where multiprocessing.shared_memory is
+available, workers write each mask stack straight into a shared block that the
+writers then read, instead of pickling it back to the main process. Output
+uses the same layout as the GUI and the watch daemon:
+<output>/<name>_animation/<name>_<frame>.png, or one of the other
+animation_output formats.
+
+Jobs can also come from a manifest (see batch_manifest), whose journal lets a
+run that died halfway be restarted without redoing the finished jobs.
+
+    python batch_pipeline.py skins/ --output output --frames 36 --type "Head to Toe"
+    python batch_pipeline.py --manifest overnight.csv --output output
+
+compose_base_library() covers the opposite case: one input skin revealed over
+a whole library of base skins. Its mask stack is computed once and every
+base is composed against it, a memory-budgeted chunk of bases at a time.
+
+    python batch_pipeline.py outfit.png --bases bases/ --output output
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from animation_output import (OUTPUT_FORMATS, ignore_interrupts, output_path, remove_stale_staging,
+                              write_animation_output)
+from batch_manifest import JobJournal, load_manifest, make_job
+from mask_generator import ANIMATION_TYPES, generate_mask_stack, load_mask_cube
+from shared_arrays import SHARED_MEMORY_AVAILABLE, SharedArray
+from skin_compositor import compose_skin_frames
+from skin_texture import SkinTexture, load_skin_texture
+
+def read_skin(skin_path):
+    """Read a skin's PNG bytes and its (width, height) from the header, without decoding the pixels"""
+    with open(skin_path, "rb") as f:
+        skin_png = f.read()
+    with Image.open(io.BytesIO(skin_png)) as image:
+        return skin_png, image.size
+
+def decode_skin(skin_png):
+    with Image.open(io.BytesIO(skin_png)) as image:
+        return SkinTexture.from_image(image)
+
+def job_result_shape(job, width, height):
+    """Shape of the array compute_animation produces for a job on a (width, height) skin"""
+    if job.output_format == "composited":
+        return (job.frames + 1, height, width, 4)
+    return (job.frames + 1, height, width)
+
+def compute_animation(skin_png, job, out=None):
+    """
+    Decode a skin from PNG bytes and generate a job's mask stack (runs in a worker process).
+
+    Composited jobs get the composed skins for every frame instead, with the
+    job's base skin resized to match the input skin if needed.
+    """
+    input_pixels = decode_skin(skin_png).pixels
+    if job.output_format != "composited":
+        return generate_mask_stack(input_pixels, job.frames, job.animation_type, out=out)
+
+    height, width = input_pixels.shape[:2]
+    base_pixels = load_skin_texture(job.base, (width, height)).pixels
+    mask_stack = generate_mask_stack(input_pixels, job.frames, job.animation_type)
+    return compose_skin_frames(base_pixels, input_pixels, mask_stack, out=out)
+
+def compute_animation_shared(skin_png, job, out_descriptor):
+    """Like compute_animation, but fill the caller's shared block instead of returning the result"""
+    with SharedArray.attach(out_descriptor) as out:
+        compute_animation(skin_png, job, out.array)
+
+def collect_skin_paths(inputs):
+    """Expand files and directories into the list of PNG skins to process"""
+    skin_paths = []
+    for item in inputs:
+        item = Path(item)
+        if item.is_dir():
+            skin_paths.extend(sorted(p for p in item.iterdir() if p.is_file() and p.suffix.lower() == ".png"))
+        else:
+            skin_paths.append(item)
+    return [str(p) for p in skin_paths]
+
+async def run_pipeline(jobs, output_root="output", workers=None, readers=4, writers=4, queue_size=None,
+                       progress_callback=None, use_shared_memory=None, journal=None):
+    """
+    Run batch jobs with reads, generation and writes overlapped.
+
+    Args:
+        jobs (list): batch_manifest.BatchJob per skin to generate
+        output_root (str): Root of the output tree
+        workers (int): Generation processes (default: CPU count)
+        readers (int): Concurrent skin reads
+        writers (int): Concurrent animation writes
+        queue_size (int): Items allowed to wait between stages (default: 2 per worker)
+        progress_callback (callable): Called with (jobs_finished, total_jobs)
+        use_shared_memory (bool): Return mask stacks through shared memory
+            (default: when available)
+        journal (JobJournal): Journal to record started and finished jobs in
+
+    Returns:
+        dict: job -> published output path, or the Exception that stopped it
+    """
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or 2 * workers
+    if use_shared_memory is None:
+        use_shared_memory = SHARED_MEMORY_AVAILABLE
+
+    # Shared blocks not yet written out; anything left here is freed on the way out
+    live_blocks = set()
+
+    loop = asyncio.get_event_loop()
+    results = {}
+    job_queue = asyncio.Queue()
+    read_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+    for job in jobs:
+        job_queue.put_nowait(job)
+
+    def finish(job, result):
+        results[job] = result
+        if isinstance(result, Exception):
+            print(f"Error processing {job.skin_path}: {result}")
+            if journal:
+                journal.record(job, "failed", error=str(result))
+        elif journal:
+            journal.record(job, "done", output=result)
+        if progress_callback:
+            progress_callback(len(results), len(jobs))
+
+    def release(shared):
+        live_blocks.discard(shared)
+        shared.close()
+
+    async def read_stage(io_pool):
+        while not job_queue.empty():
+            job = job_queue.get_nowait()
+            if journal:
+                journal.record(job, "started")
+            try:
+                skin_png, skin_size = await loop.run_in_executor(io_pool, read_skin, job.skin_path)
+            except Exception as e:
+                finish(job, e)
+                continue
+            await read_queue.put((job, skin_png, skin_size))
+
+    async def generate_stage(cpu_pool):
+        while True:
+            item = await read_queue.get()
+            if item is None:
+                break
+            job, skin_png, (width, height) = item
+            shared = None
+            try:
+                if use_shared_memory:
+                    # The worker fills a block this process owns, so nothing big is pickled back
+                    shared = SharedArray.create(job_result_shape(job, width, height))
+                    live_blocks.add(shared)
+                    await loop.run_in_executor(cpu_pool, compute_animation_shared, skin_png, job, shared.descriptor)
+                    result = shared
+                else:
+                    result = await loop.run_in_executor(cpu_pool, compute_animation, skin_png, job)
+            except Exception as e:
+                if shared is not None:
+                    release(shared)
+                finish(job, e)
+                continue
+            await write_queue.put((job, result))
+
+    async def write_stage(io_pool):
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                break
+            job, result = item
+            mask_stack = result.array if use_shared_memory else result
+            try:
+                metadata = {"animation_type": job.animation_type, "skin": job.skin_path}
+                published = await loop.run_in_executor(io_pool, write_animation_output, mask_stack,
+                                                       str(output_root), job.name, job.output_format, metadata,
+                                                       job.size)
+            except Exception as e:
+                finish(job, e)
+                continue
+            finally:
+                del mask_stack
+                if use_shared_memory:
+                    release(result)
+            finish(job, published)
+
+    Path(output_root).mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=readers + writers) as io_pool, \
+            ProcessPoolExecutor(max_workers=workers, initializer=ignore_interrupts) as cpu_pool:
+        read_tasks = [asyncio.ensure_future(read_stage(io_pool)) for _ in range(readers)]
+        generate_tasks = [asyncio.ensure_future(generate_stage(cpu_pool)) for _ in range(workers)]
+        write_tasks = [asyncio.ensure_future(write_stage(io_pool)) for _ in range(writers)]
+
+        # Each stage is told to stop once the one before it has drained
+        try:
+            await asyncio.gather(*read_tasks)
+            for _ in generate_tasks:
+                await read_queue.put(None)
+            await asyncio.gather(*generate_tasks)
+            for _ in write_tasks:
+                await write_queue.put(None)
+            await asyncio.gather(*write_tasks)
+        finally:
+            for task in read_tasks + generate_tasks + write_tasks:
+                task.cancel()
+            for shared in list(live_blocks):
+                release(shared)
+
+    return results
+
+def run_batch(jobs, output_root="output", journal_path=None, **pipeline_options):
+    """
+    Run jobs, skipping those a journal records as done and cleaning up after interrupted ones.
+
+    Args:
+        jobs (list): BatchJob per skin
+        output_root (str): Root of the output tree
+        journal_path (str): Journal to resume from and append to, or None for no journal
+        **pipeline_options: Passed on to run_pipeline
+
+    Returns:
+        tuple: (results dict from run_pipeline, number of jobs skipped as already done)
+    """
+    journal = JobJournal(journal_path, output_root) if journal_path else None
+    try:
+        pending = []
+        for job in jobs:
+            if journal and journal.is_done(job):
+                continue
+            if journal and journal.was_interrupted(job):
+                remove_stale_staging(output_path(output_root, job.name, job.output_format))
+            pending.append(job)
+        results = asyncio.run(run_pipeline(pending, output_root, journal=journal, **pipeline_options))
+    finally:
+        if journal:
+            journal.close()
+    return results, len(jobs) - len(pending)
+
+def compose_base_library(input_path, base_paths, output_root="output", frames=36, animation_type="Head to Toe",
+                         mask_stack=None, output_size=None, memory_budget=256 * 1024 * 1024, writers=4,
+                         progress_callback=None):
+    """
+    Reveal one input skin over many base skins, writing composited frames per base.
+
+    The mask stack is generated once (or passed in, e.g. a memory-mapped mask
+    cube) and each chunk of bases is composed against it in one broadcast
+    (bases x frames) operation. Chunks are sized so the chunk being composed
+    and the chunk being written together fit in memory_budget.
+
+    Args:
+        input_path (str): The input skin revealed over every base
+        base_paths (list): Base skin files; bases are resized to the input's size
+        output_root (str): Root of the output tree; base B gets
+            <output_root>/<input>_over_<B>_composited/
+        frames (int): Frames per animation when generating the masks
+        animation_type (str): One of mask_generator.ANIMATION_TYPES
+        mask_stack (np.ndarray): (frames, H, W) masks to use instead of generating them
+        output_size (int): Upscale the saved skins to this width
+        memory_budget (int): Bytes of composed frames to hold at once
+        writers (int): Concurrent base writes
+        progress_callback (callable): Called with (bases_finished, total_bases)
+
+    Returns:
+        dict: base path -> published output directory, or the Exception that stopped it
+    """
+    input_pixels = load_skin_texture(input_path).pixels
+    height, width = input_pixels.shape[:2]
+    if mask_stack is None:
+        mask_stack = generate_mask_stack(input_pixels, frames, animation_type)
+    elif mask_stack.shape[1:] != (height, width):
+        raise ValueError(f"Masks are {mask_stack.shape[2]}x{mask_stack.shape[1]} but the input skin is {width}x{height}")
+
+    base_bytes = len(mask_stack) * height * width * 4
+    bases_per_chunk = max(1, memory_budget // (2 * base_bytes))
+    input_name = Path(input_path).stem
+    results = {}
+
+    def finish(base_path, result):
+        results[base_path] = result
+        if isinstance(result, Exception):
+            print(f"Error processing {base_path}: {result}")
+        if progress_callback:
+            progress_callback(len(results), len(base_paths))
+
+    def collect(writes):
+        for base_path, future in writes:
+            try:
+                finish(base_path, future.result())
+            except Exception as e:
+                finish(base_path, e)
+
+    writes = []
+    with ThreadPoolExecutor(max_workers=writers) as io_pool:
+        for start in range(0, len(base_paths), bases_per_chunk):
+            loaded_paths = []
+            loaded_pixels = []
+            for base_path in base_paths[start:start + bases_per_chunk]:
+                try:
+                    loaded_pixels.append(load_skin_texture(base_path, (width, height)).pixels)
+                    loaded_paths.append(base_path)
+                except Exception as e:
+                    finish(base_path, e)
+            if not loaded_paths:
+                continue
+
+            composed = compose_skin_frames(np.stack(loaded_pixels), input_pixels, mask_stack)
+
+            # The previous chunk finishes writing before this one starts, so at most two chunks are alive
+            collect(writes)
+            writes = [(base_path, io_pool.submit(write_animation_output, composed[i], str(output_root),
+                                                 f"{input_name}_over_{Path(base_path).stem}", "composited",
+                                                 None, output_size))
+                      for i, base_path in enumerate(loaded_paths)]
+            del composed
+        collect(writes)
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate mask animations for many skins")
+    parser.add_argument("inputs", nargs="*", help="Skin PNGs and/or folders of skins")
+    parser.add_argument("--manifest", default=None, help="JSON or CSV manifest of jobs (see batch_manifest)")
+    parser.add_argument("--journal", default=None,
+                        help="Completion journal (default: <manifest>.journal.jsonl with --manifest)")
+    parser.add_argument("--output", default="output", help="Output root directory (default: output)")
+    parser.add_argument("--frames", type=int, default=36, help="Frames per animation (default: 36)")
+    parser.add_argument("--type", dest="animation_type", default="Head to Toe", choices=list(ANIMATION_TYPES),
+                        help="Animation type (default: Head to Toe)")
+    parser.add_argument("--format", dest="output_format", default="frames", choices=OUTPUT_FORMATS,
+                        help="Output format (default: frames)")
+    parser.add_argument("--base", default=None, help="Base skin for --format composited")
+    parser.add_argument("--bases", nargs="+", default=None,
+                        help="Base skins and/or folders to reveal the single input skin over (writes composited skins)")
+    parser.add_argument("--masks", default=None, help="Mask cube (.npy) to use with --bases instead of generating masks")
+    parser.add_argument("--memory-mb", type=int, default=256,
+                        help="Memory for composed frames with --bases (default: 256)")
+    parser.add_argument("--size", type=int, default=None,
+                        help="Upscale masks to this width, a multiple of the skin width (default: skin size)")
+    parser.add_argument("--workers", type=int, default=None, help="Generation processes (default: CPU count)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent skin reads (default: 4)")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent animation writes (default: 4)")
+
+    args = parser.parse_args(argv)
+    if args.frames <= 0 or args.readers <= 0 or args.writers <= 0:
+        parser.error("--frames, --readers and --writers must be positive")
+    if not args.inputs and not args.manifest:
+        parser.error("give skins to process or a --manifest")
+
+    if args.bases:
+        input_paths = collect_skin_paths(args.inputs)
+        if len(input_paths) != 1 or args.manifest:
+            parser.error("--bases takes exactly one input skin")
+        base_paths = collect_skin_paths(args.bases)
+        if not base_paths:
+            print("No base skins found")
+            return 1
+
+        start = time.perf_counter()
+        try:
+            mask_stack = load_mask_cube(args.masks) if args.masks else None
+            results = compose_base_library(input_paths[0], base_paths, args.output, args.frames, args.animation_type,
+                                           mask_stack, args.size, args.memory_mb * 1024 * 1024, args.writers)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+        failed = sum(1 for result in results.values() if isinstance(result, Exception))
+        print(f"Composited {len(results) - failed} of {len(base_paths)} bases in {time.perf_counter() - start:.2f}s")
+        return 1 if failed else 0
+
+    try:
+        jobs = [make_job(skin_path, args.animation_type, args.frames, args.output_format, size=args.size, base=args.base)
+                for skin_path in collect_skin_paths(args.inputs)]
+    except ValueError as e:
+        parser.error(str(e))
+    journal_path = args.journal
+    if args.manifest:
+        try:
+            jobs.extend(load_manifest(args.manifest, {"type": args.animation_type, "frames": args.frames,
+                                                      "format": args.output_format, "size": args.size,
+                                                      "base": args.base}))
+        except (OSError, ValueError) as e:
+            print(f"Error reading manifest: {e}")
+            return 1
+        journal_path = journal_path or f"{args.manifest}.journal.jsonl"
+    if not jobs:
+        print("No skins found")
+        return 1
+
+    start = time.perf_counter()
+    results, skipped = run_batch(jobs, args.output, journal_path, workers=args.workers,
+                                 readers=args.readers, writers=args.writers)
+    failed = sum(1 for result in results.values() if isinstance(result, Exception))
+    if skipped:
+        print(f"Skipped {skipped} job(s) already done")
+    print(f"Generated {len(results) - failed} of {len(results)} jobs in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Local HTTP service that generates reveal masks on demand.
+
+POST a skin PNG as the request body to /generate and get the animation back:
+
+    curl --data-binary @skin.png -o masks.zip \
+        "http://127.0.0.1:8765/generate?type=Head%20to%20Toe&frames=36&format=zip"
+
+Formats are "zip" (the numbered mask PNGs), "sheet" (one sprite sheet PNG) and
+"reveal" (a single reveal texture PNG, see mask_generator.mask_reveal_texture).
+Generation runs on a bounded process pool. When every worker is busy and the
+wait queue is full, requests are turned away with 429 instead of piling up.
+Recent results are kept in memory, so repeating a request is answered without
+generating again. Uploads that are not readable images get 400, and skins
+larger than MAX_SKIN_SIZE, or whose masks would exceed MAX_MASK_STACK_BYTES,
+get 413 before any work is queued. The server only listens on 127.0.0.1.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from PIL import Image
+from animation_output import encode_mask_zip, ignore_interrupts, png_bytes
+from mask_generator import ANIMATION_TYPES, generate_mask_stack, mask_reveal_texture, mask_sprite_sheet
+from skin_texture import SkinTexture
+
+OUTPUT_FORMATS = {
+    "zip": "application/zip",
+    "sheet": "image/png",
+    "reveal": "image/png",
+}
+
+MAX_FRAMES = 3600
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024
+# A small PNG can declare a huge image, so the decoded size is limited too
+MAX_SKIN_SIZE = 256
+MAX_MASK_STACK_BYTES = 256 * 1024 * 1024
+
+def read_skin_size(skin_png):
+    """
+    Size of an uploaded skin, checking that it is a readable image.
+
+    Images larger than MAX_SKIN_SIZE are only measured, not decoded.
+
+    Returns:
+        tuple: (width, height)
+
+    Raises:
+        ValueError: If the upload is not a readable image
+    """
+    try:
+        with Image.open(io.BytesIO(skin_png)) as image:
+            width, height = image.size
+            if width <= MAX_SKIN_SIZE and height <= MAX_SKIN_SIZE:
+                image.load()
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValueError("The upload is not a readable image")
+    return width, height
+
+def render_generation_result(skin_png, frames, animation_type, output_format, base_name="skin"):
+    """
+    Generate one animation from PNG bytes and encode it in the requested format.
+
+    Runs in a worker process, so it only takes and returns plain bytes.
+
+    Returns:
+        bytes: The encoded zip or PNG
+    """
+    with Image.open(io.BytesIO(skin_png)) as image:
+        texture = SkinTexture.from_image(image)
+    mask_stack = generate_mask_stack(texture.pixels, frames, animation_type)
+
+    if output_format == "sheet":
+        return png_bytes(mask_sprite_sheet(mask_stack))
+    if output_format == "reveal":
+        return png_bytes(mask_reveal_texture(mask_stack))
+
+    return encode_mask_zip(mask_stack, base_name)
+
+class ResultCache:
+    """LRU cache of encoded results, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+class Saturated(Exception):
+    """Every worker is busy and the wait queue is full"""
+
+class GenerationService:
+    """Bounded process pool with request admission, result caching and sharing of identical in-flight requests"""
+
+    def __init__(self, workers=2, queue_limit=8, cache_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            workers (int): Worker processes
+            queue_limit (int): Requests allowed to wait for a worker before 429s are returned
+            cache_bytes (int): Memory budget for cached results
+        """
+        self.workers = workers
+        self.pool = self.create_pool()
+        self.cache = ResultCache(cache_bytes)
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {"generated": 0, "cache_hits": 0, "shared": 0, "rejected": 0, "pool_restarts": 0}
+
+    def create_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts)
+
+    def submit_job(self, *args):
+        """Submit render_generation_result(*args), replacing the pool first if a worker died; call with self._lock held"""
+        pool = self.pool
+        try:
+            return pool, pool.submit(render_generation_result, *args)
+        except BrokenProcessPool:
+            self.replace_broken_pool(pool)
+            return self.pool, self.pool.submit(render_generation_result, *args)
+
+    def replace_broken_pool(self, broken_pool):
+        """Swap in a new pool after a worker died; call with self._lock held"""
+        if self.pool is broken_pool:
+            broken_pool.shutdown(wait=False)
+            self.pool = self.create_pool()
+            self.stats["pool_restarts"] += 1
+
+    def generate(self, skin_png, frames, animation_type, output_format, base_name="skin"):
+        """
+        Return the encoded result, from the cache when possible.
+
+        Raises:
+            Saturated: When the pool and its wait queue are full
+        """
+        key = (hashlib.sha1(skin_png).hexdigest(), frames, animation_type, output_format, base_name)
+        data = self.cache.get(key)
+        if data is not None:
+            self.count("cache_hits")
+            return data
+
+        # Identical requests that are already running wait on the same job
+        submitted = False
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+            else:
+                if not self._slots.acquire(blocking=False):
+                    self.stats["rejected"] += 1
+                    raise Saturated()
+                try:
+                    pool, future = self.submit_job(skin_png, frames, animation_type, output_format, base_name)
+                except Exception:
+                    self._slots.release()
+                    raise
+                self._in_flight[key] = future
+                submitted = True
+
+        # Outside the lock: the callback runs immediately if the job already finished
+        if submitted:
+            future.add_done_callback(lambda done, key=key, pool=pool: self._job_done(key, done, pool))
+        return future.result()
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _job_done(self, key, future, pool):
+        # Cache before leaving _in_flight so a repeat request always finds one or the other
+        error = None if future.cancelled() else future.exception()
+        if not future.cancelled() and error is None:
+            self.count("generated")
+            self.cache.put(key, future.result())
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if isinstance(error, BrokenProcessPool):
+                self.replace_broken_pool(pool)
+        self._slots.release()
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._in_flight), cached=len(self.cache),
+                        cache_bytes=self.cache.total_bytes)
+
+    def shutdown(self):
+        if sys.version_info >= (3, 9):
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            self.pool.shutdown(wait=False)
+
+class GenerationRequestHandler(BaseHTTPRequestHandler):
+    """Handles /generate and /status for the GenerationService attached to the server"""
+
+    server_version = "AnimationSlicer/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self.send_json(200, self.server.service.status())
+        elif url.path == "/types":
+            self.send_json(200, {"types": list(ANIMATION_TYPES), "formats": list(OUTPUT_FORMATS)})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/generate":
+            self.send_error(404)
+            return
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        animation_type = params.get("type", "Head to Toe")
+        output_format = params.get("format", "zip")
+        base_name = "".join(c for c in params.get("name", "skin") if c.isalnum() or c in "-_") or "skin"
+        try:
+            frames = int(params.get("frames", 36))
+        except ValueError:
+            frames = 0
+
+        if animation_type not in ANIMATION_TYPES:
+            self.send_json(400, {"error": f"Unknown animation type: {animation_type}"})
+            return
+        if output_format not in OUTPUT_FORMATS:
+            self.send_json(400, {"error": f"Unknown format: {output_format}"})
+            return
+        if not 1 <= frames <= MAX_FRAMES:
+            self.send_json(400, {"error": f"frames must be between 1 and {MAX_FRAMES}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            self.send_json(413 if length > 0 else 400, {"error": f"Send the skin PNG as the body (up to {MAX_UPLOAD_BYTES} bytes)"})
+            return
+        skin_png = self.rfile.read(length)
+
+        try:
+            width, height = read_skin_size(skin_png)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        if width > MAX_SKIN_SIZE or height > MAX_SKIN_SIZE:
+            self.send_json(413, {"error": f"Skins can be at most {MAX_SKIN_SIZE}x{MAX_SKIN_SIZE}, got {width}x{height}"})
+            return
+        if (frames + 1) * width * height > MAX_MASK_STACK_BYTES:
+            self.send_json(413, {"error": f"{frames} frames of a {width}x{height} skin is too large; use fewer frames"})
+            return
+
+        try:
+            data = self.server.service.generate(skin_png, frames, animation_type, output_format, base_name)
+        except Saturated:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        except Exception as e:
+            # The input was checked above, so anything failing here is a server problem
+            print(f"Error generating masks: {e!r}")
+            self.send_json(500, {"error": "Mask generation failed"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", OUTPUT_FORMATS[output_format])
+        self.send_header("Content-Length", str(len(data)))
+        if output_format == "zip":
+            self.send_header("Content-Disposition", f'attachment; filename="{base_name}_animation.zip"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def create_server(port=8765, workers=2, queue_limit=8, cache_mb=64):
+    """Create a generation server bound to 127.0.0.1 (port 0 picks a free port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), GenerationRequestHandler)
+    server.daemon_threads = True
+    server.service = GenerationService(workers, queue_limit, cache_mb * 1024 * 1024)
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve mask generation over HTTP on localhost")
+    parser.add_argument("--port", type=int, default=8765, help="Port on 127.0.0.1 (default: 8765)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+    parser.add_argument("--queue", type=int, default=8, help="Requests that may wait for a worker (default: 8)")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Result cache size in MB (default: 64)")
+
+    args = parser.parse_args(argv)
+    if args.workers <= 0 or args.queue < 0:
+        parser.error("--workers must be positive and --queue non-negative")
+
+    server = create_server(args.port, args.workers, args.queue, args.cache_mb)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}/generate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        server.server_close()
+        server.service.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""
+Reveal mask generation, independent of the GUI.
+
+generate_mask_stack() turns a skin into a stack of alpha masks, one per
+animation frame: frame 0 is blank and each following frame reveals more of the
+skin's non-transparent pixels in the order given by the animation type. The
+stack is kept in memory so the viewers can use it directly;
+save_mask_frames() writes it out as the numbered PNG frames and
+save_mask_cube() as a single memory-mappable .npy "mask cube". The writers
+can also upscale the masks by an integer factor as they write, a chunk of
+frames at a time, so large outputs never need the whole upscaled stack in
+memory.
+"""
+
+import json
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from skin_mapping_config import SKIN_UV_MAPPING
+
+# Core parts (torso and head)
+CORE_PARTS = ['head_front', 'head_back', 'head_left', 'head_right', 'head_top', 'head_bottom',
+              'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right',
+              'head_outer_top', 'head_outer_bottom',
+              'body_front', 'body_back', 'body_left', 'body_right', 'body_top', 'body_bottom',
+              'body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right',
+              'body_outer_top', 'body_outer_bottom']
+
+# Limb parts (arms and legs)
+LIMB_PARTS = ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
+              'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom',
+              'left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
+              'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom']
+
+# Anatomical order from head to toe
+HEAD_TO_TOE_LEVELS = [
+    # 1. Head top (very top of character)
+    ['head_top', 'head_outer_top'],
+
+    # 2. Head middle (face level)
+    ['head_front', 'head_back', 'head_left', 'head_right',
+     'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right'],
+
+    # 3. Head bottom / neck area
+    ['head_bottom', 'head_outer_bottom'],
+
+    # 4. Shoulders / body top
+    ['body_top', 'body_outer_top'],
+
+    # 5. Upper torso
+    ['body_front', 'body_back', 'body_left', 'body_right'],
+
+    # 6. Upper arms (shoulder level)
+    ['right_arm_top', 'left_arm_top'],
+
+    # 7. Mid torso + upper arms
+    ['body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right',
+     'right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right',
+     'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right'],
+
+    # 8. Lower torso / waist
+    ['body_bottom', 'body_outer_bottom'],
+
+    # 9. Upper legs / hips
+    ['left_leg_top', 'right_leg_top'],
+
+    # 10. Lower arms + upper legs
+    ['right_arm_bottom', 'left_arm_bottom',
+     'left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right',
+     'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right'],
+
+    # 11. Feet
+    ['left_leg_bottom', 'right_leg_bottom']
+]
+
+# Anatomical order from toe to head (reverse of head-to-toe)
+TOE_TO_HEAD_LEVELS = [
+    # 1. Feet
+    ['left_leg_bottom', 'right_leg_bottom'],
+
+    # 2. Lower legs + lower arms
+    ['left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right',
+     'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right',
+     'right_arm_bottom', 'left_arm_bottom'],
+
+    # 3. Upper legs / hips
+    ['left_leg_top', 'right_leg_top'],
+
+    # 4. Lower torso / waist
+    ['body_bottom', 'body_outer_bottom'],
+
+    # 5. Mid torso + arms
+    ['body_outer_front', 'body_outer_back', 'body_outer_left', 'body_outer_right',
+     'right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right',
+     'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right'],
+
+    # 6. Upper arms (shoulder level)
+    ['right_arm_top', 'left_arm_top'],
+
+    # 7. Upper torso
+    ['body_front', 'body_back', 'body_left', 'body_right'],
+
+    # 8. Shoulders / body top
+    ['body_top', 'body_outer_top'],
+
+    # 9. Head bottom / neck area
+    ['head_bottom', 'head_outer_bottom'],
+
+    # 10. Head middle (face level)
+    ['head_front', 'head_back', 'head_left', 'head_right',
+     'head_outer_front', 'head_outer_back', 'head_outer_left', 'head_outer_right'],
+
+    # 11. Head top (very top of character)
+    ['head_top', 'head_outer_top']
+]
+
+# Anatomical order from left to right side of body
+LEFT_TO_RIGHT_LEVELS = [
+    # 1. Left side parts
+    ['left_leg_front', 'left_leg_back', 'left_leg_left', 'left_leg_right', 'left_leg_top', 'left_leg_bottom',
+     'left_arm_front', 'left_arm_back', 'left_arm_left', 'left_arm_right', 'left_arm_top', 'left_arm_bottom'],
+
+    # 2. Center parts (head and body)
+    ['head_front', 'head_back', 'head_top', 'head_bottom',
+     'head_outer_front', 'head_outer_back', 'head_outer_top', 'head_outer_bottom',
+     'body_front', 'body_back', 'body_top', 'body_bottom',
+     'body_outer_front', 'body_outer_back', 'body_outer_top', 'body_outer_bottom'],
+
+    # 3. Left side faces of center parts
+    ['head_left', 'head_outer_left', 'body_left', 'body_outer_left'],
+
+    # 4. Right side faces of center parts
+    ['head_right', 'head_outer_right', 'body_right', 'body_outer_right'],
+
+    # 5. Right side parts
+    ['right_arm_front', 'right_arm_back', 'right_arm_left', 'right_arm_right', 'right_arm_top', 'right_arm_bottom',
+     'right_leg_front', 'right_leg_back', 'right_leg_left', 'right_leg_right', 'right_leg_top', 'right_leg_bottom']
+]
+
+# Anatomical order from right to left side of body (reverse of left-to-right)
+RIGHT_TO_LEFT_LEVELS = LEFT_TO_RIGHT_LEVELS[::-1]
+
+# Animation type -> how it reveals the skin:
+#   levels: groups of UV parts revealed one after another
+#   order: pixel order within the level being grown ("top_down", "bottom_up",
+#          "left_to_right" or "right_to_left")
+#   schedule: "levels" gives every level an equal share of the animation;
+#             "halves" grows the first level over the first half and the
+#             second level over the second half
+ANIMATION_TYPES = {
+    "Head to Toe": {"levels": HEAD_TO_TOE_LEVELS, "order": "top_down", "schedule": "levels"},
+    "Toe to Head": {"levels": TOE_TO_HEAD_LEVELS, "order": "bottom_up", "schedule": "levels"},
+    "Core to Limbs": {"levels": [CORE_PARTS, LIMB_PARTS], "order": "top_down", "schedule": "halves"},
+    "Limbs to Core": {"levels": [LIMB_PARTS, CORE_PARTS], "order": "top_down", "schedule": "halves"},
+    "Left to Right Body": {"levels": LEFT_TO_RIGHT_LEVELS, "order": "left_to_right", "schedule": "levels"},
+    "Right to Left Body": {"levels": RIGHT_TO_LEFT_LEVELS, "order": "right_to_left", "schedule": "levels"},
+}
+
+def level_pixel_order(alpha, parts, order):
+    """
+    Collect the non-transparent pixels of a level's UV parts in reveal order.
+
+    Returns:
+        tuple: (ys, xs) index arrays, first revealed first
+    """
+    height, width = alpha.shape
+    ys_parts = []
+    xs_parts = []
+    for part_name in parts:
+        if part_name in SKIN_UV_MAPPING:
+            x1, y1, x2, y2 = SKIN_UV_MAPPING[part_name]
+            region = alpha[y1:min(y2, height), x1:min(x2, width)]
+            ys, xs = np.nonzero(region > 0)
+            ys_parts.append(ys + y1)
+            xs_parts.append(xs + x1)
+
+    if not ys_parts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    ys = np.concatenate(ys_parts)
+    xs = np.concatenate(xs_parts)
+
+    # np.lexsort sorts by its last key first
+    if order == "top_down":
+        sort_keys = (xs, ys)
+    elif order == "bottom_up":
+        sort_keys = (xs, -ys)
+    elif order == "left_to_right":
+        sort_keys = (ys, xs)
+    elif order == "right_to_left":
+        sort_keys = (ys, -xs)
+    else:
+        raise ValueError(f"Unknown pixel order: {order}")
+    sorted_indices = np.lexsort(sort_keys)
+    return ys[sorted_indices], xs[sorted_indices]
+
+def level_progress(progress, num_levels, schedule):
+    """Split overall progress into (level being grown, progress through that level)"""
+    if schedule == "halves":
+        if progress <= 0.5:
+            return 0, progress * 2.0
+        return 1, (progress - 0.5) * 2.0
+
+    current_level = int(progress * num_levels)
+    return current_level, (progress * num_levels) - current_level
+
+def generate_mask_stack(skin_pixels, frames, animation_type, progress_callback=None, out=None):
+    """
+    Generate the reveal masks for every frame of an animation.
+
+    Mask frame i (1..frames) reveals the skin up to progress i / frames; frame 0
+    is blank. A revealed pixel's mask alpha is the skin's alpha at that pixel.
+
+    Args:
+        skin_pixels (np.ndarray): (H, W, 4) RGBA skin
+        frames (int): Number of frames after the blank frame 0
+        animation_type (str): One of ANIMATION_TYPES
+        progress_callback (callable): Called with (frames_done, total_frames)
+        out (np.ndarray): (frames + 1, H, W) uint8 array to fill instead of
+            allocating one, e.g. a shared memory block
+
+    Returns:
+        np.ndarray: (frames + 1, H, W) uint8 mask alpha planes
+    """
+    if animation_type not in ANIMATION_TYPES:
+        raise ValueError(f"Unknown animation type: {animation_type}")
+    settings = ANIMATION_TYPES[animation_type]
+    levels = settings["levels"]
+
+    alpha = np.asarray(skin_pixels)[:, :, 3]
+    num_levels = len(levels)
+
+    # Sort each level's pixels once, and build the masks with the first N levels fully revealed
+    level_orders = [level_pixel_order(alpha, parts, settings["order"]) for parts in levels]
+    completed_masks = [np.zeros_like(alpha)]
+    for ys, xs in level_orders:
+        mask = completed_masks[-1].copy()
+        mask[ys, xs] = alpha[ys, xs]
+        completed_masks.append(mask)
+
+    stack_shape = (frames + 1,) + alpha.shape
+    if out is None:
+        mask_stack = np.zeros(stack_shape, dtype=np.uint8)
+    else:
+        if out.shape != stack_shape or out.dtype != np.uint8:
+            raise ValueError(f"out must be a {stack_shape} uint8 array")
+        mask_stack = out
+        mask_stack[0] = 0
+    for i in range(frames):
+        progress = (i + 1) / frames
+        current_level, current_progress = level_progress(progress, num_levels, settings["schedule"])
+
+        frame_mask = mask_stack[i + 1]
+        frame_mask[:] = completed_masks[min(current_level, num_levels)]
+        if current_level < num_levels:
+            ys, xs = level_orders[current_level]
+            shown = int(len(ys) * current_progress)
+            frame_mask[ys[:shown], xs[:shown]] = alpha[ys[:shown], xs[:shown]]
+
+        if progress_callback:
+            progress_callback(i + 1, frames)
+
+    return mask_stack
+
+# Upscaled frames are produced in chunks of at most this many bytes
+UPSCALE_CHUNK_BYTES = 32 * 1024 * 1024
+
+def mask_upscale_factor(mask_shape, output_size):
+    """
+    Integer factor that scales masks of mask_shape (..., H, W) to output_size pixels wide.
+
+    Args:
+        output_size (int): Target width, a multiple of the mask width, or None to keep it
+    """
+    width = mask_shape[-1]
+    if output_size is None or output_size == width:
+        return 1
+    if output_size < width or output_size % width:
+        raise ValueError(f"Output size {output_size} must be a multiple of the mask width {width}")
+    return output_size // width
+
+def upscale_masks(masks, scale):
+    """Nearest-neighbor upscale the last two axes of a mask array by an integer factor"""
+    if scale == 1:
+        return masks
+    return np.repeat(np.repeat(masks, scale, axis=-2), scale, axis=-1)
+
+def iter_upscaled_chunks(mask_stack, scale, chunk_bytes=UPSCALE_CHUNK_BYTES):
+    """Yield the upscaled mask stack as consecutive (n, H * scale, W * scale) chunks"""
+    frame_bytes = mask_stack.shape[1] * mask_stack.shape[2] * scale * scale
+    chunk_frames = max(1, chunk_bytes // frame_bytes)
+    for start in range(0, len(mask_stack), chunk_frames):
+        yield upscale_masks(np.asarray(mask_stack[start:start + chunk_frames]), scale)
+
+def iter_upscaled_frames(mask_stack, scale=1):
+    """Yield the mask alpha planes of a stack one by one, upscaled by scale"""
+    if scale == 1:
+        yield from mask_stack
+        return
+    for chunk in iter_upscaled_chunks(mask_stack, scale):
+        yield from chunk
+
+def mask_frame_pixels(mask_alpha):
+    """Expand a mask alpha plane into the black RGBA pixels of a saved mask frame"""
+    mask_alpha = np.asarray(mask_alpha)
+    pixels = np.zeros(mask_alpha.shape + (4,), dtype=np.uint8)
+    pixels[:, :, 3] = mask_alpha
+    return pixels
+
+def save_mask_frames(mask_stack, output_dir, base_name, progress_callback=None, scale=1):
+    """
+    Save a mask stack as <output_dir>/<base_name>_<frame>.png images.
+
+    Args:
+        mask_stack (np.ndarray): (frames, H, W) mask alpha planes
+        output_dir (str): Directory to write to (created if missing)
+        base_name (str): Filename prefix
+        progress_callback (callable): Called with (frames_saved, total_frames)
+        scale (int): Integer factor to upscale the saved frames by
+
+    Returns:
+        list: The written frame paths, in frame order
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    frame_paths = []
+    for i, mask_alpha in enumerate(iter_upscaled_frames(mask_stack, scale)):
+        frame_path = output_dir / f"{base_name}_{i}.png"
+        Image.fromarray(mask_frame_pixels(mask_alpha), 'RGBA').save(frame_path, "PNG")
+        frame_paths.append(str(frame_path))
+        if progress_callback:
+            progress_callback(i + 1, len(mask_stack))
+    return frame_paths
+
+def mask_cube_metadata_path(cube_path):
+    """Sidecar JSON of a mask cube: <name>_masks.npy -> <name>_masks.json"""
+    return Path(cube_path).with_suffix(".json")
+
+def save_mask_cube(mask_stack, cube_file, metadata=None, scale=1):
+    """
+    Save a mask stack as one (frames, H, W) uint8 .npy array of mask alphas.
+
+    Args:
+        mask_stack (np.ndarray): (frames, H, W) mask alpha planes, frame 0 blank
+        cube_file: Path or open binary file to write the array to
+        metadata (dict): Extra fields for the sidecar (e.g. animation_type)
+        scale (int): Integer factor to upscale the masks by; upscaled cubes
+            are streamed to the file a chunk of frames at a time
+
+    Returns:
+        dict: Sidecar metadata describing the cube; write it next to the
+        cube with json.dump (see mask_cube_metadata_path)
+    """
+    mask_stack = np.asarray(mask_stack, dtype=np.uint8)
+    if mask_stack.ndim != 3:
+        raise ValueError(f"Mask stack must be (frames, H, W), got shape {mask_stack.shape}")
+    frame_count, height, width = mask_stack.shape
+    height, width = height * scale, width * scale
+
+    if scale == 1:
+        np.save(cube_file, np.ascontiguousarray(mask_stack), allow_pickle=False)
+    elif isinstance(cube_file, (str, Path)):
+        with open(cube_file, "wb") as f:
+            save_mask_cube(mask_stack, f, scale=scale)
+    else:
+        header = {"descr": np.dtype(np.uint8).str, "fortran_order": False, "shape": (frame_count, height, width)}
+        np.lib.format.write_array_header_1_0(cube_file, header)
+        for chunk in iter_upscaled_chunks(mask_stack, scale):
+            cube_file.write(np.ascontiguousarray(chunk).data)
+
+    return dict({"format": "mask_cube", "version": 1, "frames": frame_count, "height": height, "width": width,
+                 "dtype": "uint8", "blank_first_frame": True, "scale": scale}, **(metadata or {}))
+
+def load_mask_cube(cube_path):
+    """
+    Memory-map a mask cube written by save_mask_cube.
+
+    Only the frames that are actually indexed get read from disk, so opening a
+    cube costs almost nothing however many frames it has.
+
+    Returns:
+        np.ndarray: Read-only (frames, H, W) uint8 memmap
+    """
+    mask_stack = np.load(cube_path, mmap_mode='r', allow_pickle=False)
+    if mask_stack.ndim != 3 or mask_stack.dtype != np.uint8:
+        raise ValueError(f"{cube_path} is not a mask cube: {mask_stack.dtype} array of shape {mask_stack.shape}")
+    return mask_stack
+
+def load_mask_cube_metadata(cube_path):
+    """The cube's sidecar metadata, or {} if it has none"""
+    metadata_path = mask_cube_metadata_path(cube_path)
+    if not metadata_path.exists():
+        return {}
+    with open(metadata_path) as f:
+        return json.load(f)
+
+def mask_sprite_sheet(mask_stack, columns=None, scale=1):
+    """
+    Lay a mask stack out as one sprite sheet image, row by row.
+
+    Args:
+        mask_stack (np.ndarray): (frames, H, W) mask alpha planes
+        columns (int): Frames per row (default: a roughly square grid)
+        scale (int): Integer factor to upscale the frames by
+
+    Returns:
+        Image.Image: RGBA sheet of black mask frames
+    """
+    mask_stack = np.asarray(mask_stack)
+    count, height, width = mask_stack.shape
+    if columns is None:
+        columns = int(np.ceil(np.sqrt(count)))
+    columns = max(1, min(columns, count))
+    rows = (count + columns - 1) // columns
+
+    # Pad to a full grid, then swap the frame axes into place in one reshape
+    grid = np.zeros((rows * columns, height, width), dtype=np.uint8)
+    grid[:count] = mask_stack
+    sheet_alpha = grid.reshape(rows, columns, height, width).transpose(0, 2, 1, 3).reshape(rows * height, columns * width)
+    # Upscaling the tiled sheet gives the same pixels as tiling upscaled frames
+    return Image.fromarray(mask_frame_pixels(upscale_masks(sheet_alpha, scale)), 'RGBA')
+
+def mask_reveal_texture(mask_stack, scale=1):
+    """
+    Collapse a mask stack into a single texture for shader-driven reveals.
+
+    The luminance of each pixel is the point in the animation (0-255) at which
+    it first appears and the alpha is its final mask alpha, so a shader can
+    show a pixel once progress * 255 reaches its luminance.
+
+    Returns:
+        Image.Image: "LA" image the size of one frame times scale
+    """
+    mask_stack = np.asarray(mask_stack)
+    frames = max(len(mask_stack) - 1, 1)
+    revealed = mask_stack > 0
+    first_frame = np.where(revealed.any(axis=0), revealed.argmax(axis=0), frames)
+    luminance = np.round(first_frame * (255.0 / frames)).astype(np.uint8)
+    return Image.fromarray(np.dstack([upscale_masks(luminance, scale), upscale_masks(mask_stack[-1], scale)]), 'LA')
@@ -1,16 +1,51 @@
+import hashlib
 import math
+import os
+import queue
+import tempfile
+import threading
 import tkinter as tk
+from collections import OrderedDict
+from pathlib import Path
 from tkinter import Canvas
 from PIL import Image, ImageTk
 import numpy as np
 import customtkinter as ctk
-from skin_mapping_config import SKIN_UV_MAPPING
+from animation_output import staging_path
+from mask_generator import load_mask_cube
+from skin_compositor import compose_skin_stack
+from skin_renderer import SkinRenderer
+from skin_texture import load_skin_texture
 
-class MinecraftSkinViewer:
-    def __init__(self, parent, width=400, height=400):
+class ResizedMaskStack:
+    """Mask stack whose frames are resized to the viewer's 64x64 only when indexed"""
+    
+    def __init__(self, mask_stack, size=(64, 64)):
+        """
+        Args:
+            mask_stack (np.ndarray): (frames, H, W) uint8 mask alpha planes, e.g. a memory-mapped cube
+            size (tuple): (width, height) to resize each frame to with nearest neighbor
+        """
+        self.mask_stack = mask_stack
+        self.size = tuple(size)
+    
+    def __len__(self):
+        return len(self.mask_stack)
+    
+    def __getitem__(self, frame_index):
+        mask_alpha = np.ascontiguousarray(self.mask_stack[frame_index])
+        return np.array(Image.fromarray(mask_alpha, 'L').resize(self.size, Image.NEAREST))
+
+class MinecraftSkinViewer(SkinRenderer):
+    # Frame count from which mask stacks are memory-mapped from a cached .npy file
+    MASK_MMAP_THRESHOLD = 512
+    MASK_CACHE_DIR = Path(tempfile.gettempdir()) / "animation_slicer_masks"
+    # Least recently used cache files are deleted once the directory grows past this
+    MASK_CACHE_BYTES = 512 * 1024 * 1024
+    
+    def __init__(self, parent, width=400, height=400, interactive_polygon_budget=600, polygon_budget=None):
+        SkinRenderer.__init__(self, width, height, interactive_polygon_budget, polygon_budget)
         self.parent = parent
-        self.width = width
-        self.height = height
         
         # Create control frame for toggle switch (using CustomTkinter)
         self.control_frame = ctk.CTkFrame(parent)
@@ -26,6 +61,16 @@ class MinecraftSkinViewer:
         )
         self.outer_layers_checkbox.pack(side="left", padx=10, pady=10)
         
+        # Render statistics overlay for diagnosing slow previews
+        self.show_render_stats = tk.BooleanVar(value=False)
+        self.render_stats_checkbox = ctk.CTkCheckBox(
+            self.control_frame,
+            text="Show Render Stats",
+            variable=self.show_render_stats,
+            command=self.draw_render_stats_overlay
+        )
+        self.render_stats_checkbox.pack(side="left", padx=10, pady=10)
+        
         # Create canvas for 3D rendering (directly in parent, no extra frame)
         self.canvas = Canvas(parent, width=width, height=height, bg='#2b2b2b', highlightthickness=0)
         self.canvas.pack(fill="both", expand=True, padx=10, pady=(0, 10))
@@ -33,13 +78,6 @@ class MinecraftSkinViewer:
         # Bind to canvas resize events to keep centered
         self.canvas.bind("<Configure>", self.on_canvas_resize)
         
-        # 3D transformation parameters
-        self.rotation_x = 0
-        self.rotation_y = 0
-        self.scale = 8  # Start with smaller scale to see full model
-        self.offset_x = width // 2
-        self.offset_y = height // 2  # Will be updated after control panel is created
-        
         # Mouse interaction
         self.last_mouse_x = 0
         self.last_mouse_y = 0
@@ -58,20 +96,41 @@ class MinecraftSkinViewer:
         # Make canvas focusable for events
         self.canvas.focus_set()
         
-        # Default skin texture (will be set later)
-        self.skin_texture = None
-        self.skin_pixels = None
-        
         # Animation preview support
         self.base_skin_texture = None
         self.base_skin_pixels = None
+        self.base_face_visibility = {}
         self.input_skin_texture = None
         self.input_skin_pixels = None
         self.animation_frames = []
+        self.mask_stack = None  # uint8 alpha masks, shape (frames, 64, 64), or a ResizedMaskStack
         self.current_animation_frame = 0
         
-        # Define Minecraft player model vertices (simplified cube-based model)
-        self.setup_model()
+        # LRU cache of composed animation frames, filled on demand and by a
+        # background worker that prefetches the next frames in playback order
+        self.frame_cache_size = 64
+        self.prefetch_count = 4
+        self._frame_cache = OrderedDict()
+        self._frame_cache_lock = threading.Lock()
+        self._prefetch_queue = queue.Queue()
+        self._prefetch_pending = set()
+        self._prefetch_thread = None
+        
+        # Pending idle render; input handlers only update state and request one
+        self._render_pending = None
+        
+        # What the canvas currently shows, so animation steps can redraw only
+        # the faces whose texels changed. Canvas items are tagged "face-<face key>".
+        self._face_tag = ()
+        self._drawn_pixels = None
+        self._drawn_visibility = None
+        self._drawn_view = None
+        self._drawn_frame_key = None
+        
+        # Dragging or zooming renders at interactive detail; once input has
+        # been quiet for lod_settle_ms a full-quality render follows
+        self.lod_settle_ms = 150
+        self._settle_timer = None
         
         # Update center point after UI is created and initial render
         self.update_center()
@@ -86,237 +145,43 @@ class MinecraftSkinViewer:
     def on_canvas_resize(self, event):
         """Handle canvas resize events to keep rendering centered"""
         self.update_center()
-        self.render()
+        self.request_render()
     
     def on_outer_layers_toggle(self):
         """Handle outer layers toggle"""
+        self.request_render()
+    
+    def request_render(self):
+        """Mark the view dirty so the latest state is rendered once on the next idle cycle"""
+        if self._render_pending is None:
+            self._render_pending = self.canvas.after_idle(self._flush_render)
+    
+    def _flush_render(self):
+        """Idle callback that performs a requested render"""
+        self._render_pending = None
         self.render()
     
-    def setup_model(self):
-        """Setup the Minecraft player model geometry with proper positioning"""
-        
-        # Define base dimensions (in Minecraft pixels)
-        head_size = 4  # Head is 8x8x8, so radius = 4
-        body_width = 4  # Body is 8x12x4
-        body_height = 6  # Half of 12
-        body_depth = 2  # Half of 4
-        arm_width = 2   # Arms are 4x12x4
-        arm_height = 6
-        arm_depth = 2
-        leg_width = 2   # Legs are 4x12x4  
-        leg_height = 6
-        leg_depth = 2
-        
-        # Positioning: Head at top, body below, arms to sides, legs below body
-        # Note: In our coordinate system, positive Y is up
-        head_y = 12      # Head center (above body) - moved up to prevent clipping
-        body_y = 2       # Body center  
-        arm_y = 2        # Arms at shoulder level (same as body)
-        leg_y = -10      # Legs below body
-        
-        # Head (8x8x8 pixels) - positioned above body
-        self.head_vertices = [
-            # Front face
-            [-head_size, head_y-head_size, head_size], [head_size, head_y-head_size, head_size], 
-            [head_size, head_y+head_size, head_size], [-head_size, head_y+head_size, head_size],
-            # Back face  
-            [head_size, head_y-head_size, -head_size], [-head_size, head_y-head_size, -head_size], 
-            [-head_size, head_y+head_size, -head_size], [head_size, head_y+head_size, -head_size],
-            # Top face
-            [-head_size, head_y+head_size, -head_size], [-head_size, head_y+head_size, head_size], 
-            [head_size, head_y+head_size, head_size], [head_size, head_y+head_size, -head_size],
-            # Bottom face
-            [-head_size, head_y-head_size, head_size], [-head_size, head_y-head_size, -head_size], 
-            [head_size, head_y-head_size, -head_size], [head_size, head_y-head_size, head_size],
-            # Left face
-            [-head_size, head_y-head_size, -head_size], [-head_size, head_y-head_size, head_size], 
-            [-head_size, head_y+head_size, head_size], [-head_size, head_y+head_size, -head_size],
-            # Right face
-            [head_size, head_y-head_size, head_size], [head_size, head_y-head_size, -head_size], 
-            [head_size, head_y+head_size, -head_size], [head_size, head_y+head_size, head_size]
-        ]
-        
-        # Head outer layer (hat layer) - slightly larger
-        hat_size = head_size + 0.5
-        self.head_outer_vertices = [
-            # Front face
-            [-hat_size, head_y-hat_size, hat_size], [hat_size, head_y-hat_size, hat_size], 
-            [hat_size, head_y+hat_size, hat_size], [-hat_size, head_y+hat_size, hat_size],
-            # Back face  
-            [hat_size, head_y-hat_size, -hat_size], [-hat_size, head_y-hat_size, -hat_size], 
-            [-hat_size, head_y+hat_size, -hat_size], [hat_size, head_y+hat_size, -hat_size],
-            # Top face
-            [-hat_size, head_y+hat_size, -hat_size], [-hat_size, head_y+hat_size, hat_size], 
-            [hat_size, head_y+hat_size, hat_size], [hat_size, head_y+hat_size, -hat_size],
-            # Bottom face
-            [-hat_size, head_y-hat_size, hat_size], [-hat_size, head_y-hat_size, -hat_size], 
-            [hat_size, head_y-hat_size, -hat_size], [hat_size, head_y-hat_size, hat_size],
-            # Left face
-            [-hat_size, head_y-hat_size, -hat_size], [-hat_size, head_y-hat_size, hat_size], 
-            [-hat_size, head_y+hat_size, hat_size], [-hat_size, head_y+hat_size, -hat_size],
-            # Right face
-            [hat_size, head_y-hat_size, hat_size], [hat_size, head_y-hat_size, -hat_size], 
-            [hat_size, head_y+hat_size, -hat_size], [hat_size, head_y+hat_size, hat_size]
-        ]
-        
-        # Body (8x12x4 pixels) - at center
-        self.body_vertices = [
-            # Front face
-            [-body_width, body_y-body_height, body_depth], [body_width, body_y-body_height, body_depth], 
-            [body_width, body_y+body_height, body_depth], [-body_width, body_y+body_height, body_depth],
-            # Back face
-            [body_width, body_y-body_height, -body_depth], [-body_width, body_y-body_height, -body_depth], 
-            [-body_width, body_y+body_height, -body_depth], [body_width, body_y+body_height, -body_depth],
-            # Top face
-            [-body_width, body_y+body_height, -body_depth], [-body_width, body_y+body_height, body_depth], 
-            [body_width, body_y+body_height, body_depth], [body_width, body_y+body_height, -body_depth],
-            # Bottom face
-            [-body_width, body_y-body_height, body_depth], [-body_width, body_y-body_height, -body_depth], 
-            [body_width, body_y-body_height, -body_depth], [body_width, body_y-body_height, body_depth],
-            # Left face
-            [-body_width, body_y-body_height, -body_depth], [-body_width, body_y-body_height, body_depth], 
-            [-body_width, body_y+body_height, body_depth], [-body_width, body_y+body_height, -body_depth],
-            # Right face
-            [body_width, body_y-body_height, body_depth], [body_width, body_y-body_height, -body_depth], 
-            [body_width, body_y+body_height, -body_depth], [body_width, body_y+body_height, body_depth]
-        ]
-        
-        # Body outer layer (jacket layer)
-        jacket_width = body_width + 0.25
-        jacket_depth = body_depth + 0.25
-        self.body_outer_vertices = [
-            # Front face
-            [-jacket_width, body_y-body_height, jacket_depth], [jacket_width, body_y-body_height, jacket_depth], 
-            [jacket_width, body_y+body_height, jacket_depth], [-jacket_width, body_y+body_height, jacket_depth],
-            # Back face
-            [jacket_width, body_y-body_height, -jacket_depth], [-jacket_width, body_y-body_height, -jacket_depth], 
-            [-jacket_width, body_y+body_height, -jacket_depth], [jacket_width, body_y+body_height, -jacket_depth],
-            # Top face
-            [-jacket_width, body_y+body_height, -jacket_depth], [-jacket_width, body_y+body_height, jacket_depth], 
-            [jacket_width, body_y+body_height, jacket_depth], [jacket_width, body_y+body_height, -jacket_depth],
-            # Bottom face
-            [-jacket_width, body_y-body_height, jacket_depth], [-jacket_width, body_y-body_height, -jacket_depth], 
-            [jacket_width, body_y-body_height, -jacket_depth], [jacket_width, body_y-body_height, jacket_depth],
-            # Left face
-            [-jacket_width, body_y-body_height, -jacket_depth], [-jacket_width, body_y-body_height, jacket_depth], 
-            [-jacket_width, body_y+body_height, jacket_depth], [-jacket_width, body_y+body_height, -jacket_depth],
-            # Right face
-            [jacket_width, body_y-body_height, jacket_depth], [jacket_width, body_y-body_height, -jacket_depth], 
-            [jacket_width, body_y+body_height, -jacket_depth], [jacket_width, body_y+body_height, jacket_depth]
-        ]
-        
-        # Left arm (4x12x4 pixels) - positioned to the left of body
-        left_arm_x = -body_width - arm_width  # Position left of body
-        self.left_arm_vertices = [
-            # Front face
-            [left_arm_x-arm_width, arm_y-arm_height, arm_depth], [left_arm_x+arm_width, arm_y-arm_height, arm_depth], 
-            [left_arm_x+arm_width, arm_y+arm_height, arm_depth], [left_arm_x-arm_width, arm_y+arm_height, arm_depth],
-            # Back face
-            [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
-            [left_arm_x-arm_width, arm_y+arm_height, -arm_depth], [left_arm_x+arm_width, arm_y+arm_height, -arm_depth],
-            # Top face
-            [left_arm_x-arm_width, arm_y+arm_height, -arm_depth], [left_arm_x-arm_width, arm_y+arm_height, arm_depth], 
-            [left_arm_x+arm_width, arm_y+arm_height, arm_depth], [left_arm_x+arm_width, arm_y+arm_height, -arm_depth],
-            # Bottom face
-            [left_arm_x-arm_width, arm_y-arm_height, arm_depth], [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
-            [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], [left_arm_x+arm_width, arm_y-arm_height, arm_depth],
-            # Left face
-            [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], [left_arm_x-arm_width, arm_y-arm_height, arm_depth], 
-            [left_arm_x-arm_width, arm_y+arm_height, arm_depth], [left_arm_x-arm_width, arm_y+arm_height, -arm_depth],
-            # Right face
-            [left_arm_x+arm_width, arm_y-arm_height, arm_depth], [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], 
-            [left_arm_x+arm_width, arm_y+arm_height, -arm_depth], [left_arm_x+arm_width, arm_y+arm_height, arm_depth]
-        ]
-        
-        # Right arm (4x12x4 pixels) - positioned to the right of body
-        right_arm_x = body_width + arm_width  # Position right of body
-        self.right_arm_vertices = [
-            # Front face
-            [right_arm_x-arm_width, arm_y-arm_height, arm_depth], [right_arm_x+arm_width, arm_y-arm_height, arm_depth], 
-            [right_arm_x+arm_width, arm_y+arm_height, arm_depth], [right_arm_x-arm_width, arm_y+arm_height, arm_depth],
-            # Back face
-            [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
-            [right_arm_x-arm_width, arm_y+arm_height, -arm_depth], [right_arm_x+arm_width, arm_y+arm_height, -arm_depth],
-            # Top face
-            [right_arm_x-arm_width, arm_y+arm_height, -arm_depth], [right_arm_x-arm_width, arm_y+arm_height, arm_depth], 
-            [right_arm_x+arm_width, arm_y+arm_height, arm_depth], [right_arm_x+arm_width, arm_y+arm_height, -arm_depth],
-            # Bottom face
-            [right_arm_x-arm_width, arm_y-arm_height, arm_depth], [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
-            [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], [right_arm_x+arm_width, arm_y-arm_height, arm_depth],
-            # Left face
-            [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], [right_arm_x-arm_width, arm_y-arm_height, arm_depth], 
-            [right_arm_x-arm_width, arm_y+arm_height, arm_depth], [right_arm_x-arm_width, arm_y+arm_height, -arm_depth],
-            # Right face
-            [right_arm_x+arm_width, arm_y-arm_height, arm_depth], [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], 
-            [right_arm_x+arm_width, arm_y+arm_height, -arm_depth], [right_arm_x+arm_width, arm_y+arm_height, arm_depth]
-        ]
-        
-        # Left leg (4x12x4 pixels) - positioned below left side of body
-        left_leg_x = -leg_width  # Slightly left of center
-        self.left_leg_vertices = [
-            # Front face
-            [left_leg_x-leg_width, leg_y-leg_height, leg_depth], [left_leg_x+leg_width, leg_y-leg_height, leg_depth], 
-            [left_leg_x+leg_width, leg_y+leg_height, leg_depth], [left_leg_x-leg_width, leg_y+leg_height, leg_depth],
-            # Back face
-            [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
-            [left_leg_x-leg_width, leg_y+leg_height, -leg_depth], [left_leg_x+leg_width, leg_y+leg_height, -leg_depth],
-            # Top face
-            [left_leg_x-leg_width, leg_y+leg_height, -leg_depth], [left_leg_x-leg_width, leg_y+leg_height, leg_depth], 
-            [left_leg_x+leg_width, leg_y+leg_height, leg_depth], [left_leg_x+leg_width, leg_y+leg_height, -leg_depth],
-            # Bottom face
-            [left_leg_x-leg_width, leg_y-leg_height, leg_depth], [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
-            [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], [left_leg_x+leg_width, leg_y-leg_height, leg_depth],
-            # Left face
-            [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], [left_leg_x-leg_width, leg_y-leg_height, leg_depth], 
-            [left_leg_x-leg_width, leg_y+leg_height, leg_depth], [left_leg_x-leg_width, leg_y+leg_height, -leg_depth],
-            # Right face
-            [left_leg_x+leg_width, leg_y-leg_height, leg_depth], [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], 
-            [left_leg_x+leg_width, leg_y+leg_height, -leg_depth], [left_leg_x+leg_width, leg_y+leg_height, leg_depth]
-        ]
-        
-        # Right leg (4x12x4 pixels) - positioned below right side of body
-        right_leg_x = leg_width  # Slightly right of center
-        self.right_leg_vertices = [
-            # Front face
-            [right_leg_x-leg_width, leg_y-leg_height, leg_depth], [right_leg_x+leg_width, leg_y-leg_height, leg_depth], 
-            [right_leg_x+leg_width, leg_y+leg_height, leg_depth], [right_leg_x-leg_width, leg_y+leg_height, leg_depth],
-            # Back face
-            [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
-            [right_leg_x-leg_width, leg_y+leg_height, -leg_depth], [right_leg_x+leg_width, leg_y+leg_height, -leg_depth],
-            # Top face
-            [right_leg_x-leg_width, leg_y+leg_height, -leg_depth], [right_leg_x-leg_width, leg_y+leg_height, leg_depth], 
-            [right_leg_x+leg_width, leg_y+leg_height, leg_depth], [right_leg_x+leg_width, leg_y+leg_height, -leg_depth],
-            # Bottom face
-            [right_leg_x-leg_width, leg_y-leg_height, leg_depth], [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
-            [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], [right_leg_x+leg_width, leg_y-leg_height, leg_depth],
-            # Left face
-            [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], [right_leg_x-leg_width, leg_y-leg_height, leg_depth], 
-            [right_leg_x-leg_width, leg_y+leg_height, leg_depth], [right_leg_x-leg_width, leg_y+leg_height, -leg_depth],
-            # Right face
-            [right_leg_x+leg_width, leg_y-leg_height, leg_depth], [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], 
-            [right_leg_x+leg_width, leg_y+leg_height, -leg_depth], [right_leg_x+leg_width, leg_y+leg_height, leg_depth]
-        ]
-        
-        # Define faces for each part (indices into vertex arrays)
-        self.faces = [
-            [0, 1, 2, 3],    # Front
-            [4, 5, 6, 7],    # Back
-            [8, 9, 10, 11],  # Top
-            [12, 13, 14, 15], # Bottom
-            [16, 17, 18, 19], # Left
-            [20, 21, 22, 23]  # Right
-        ]
+    def begin_interaction(self):
+        """Switch to interactive detail until input has been quiet for lod_settle_ms"""
+        self.interacting = True
+        if self._settle_timer is not None:
+            self.canvas.after_cancel(self._settle_timer)
+        self._settle_timer = self.canvas.after(self.lod_settle_ms, self._end_interaction)
+    
+    def _end_interaction(self):
+        """Render at full quality once the interaction has settled"""
+        self._settle_timer = None
+        self.interacting = False
+        self.request_render()
     
     def load_skin(self, skin_path):
         """Load a Minecraft skin texture"""
         try:
-            skin_image = Image.open(skin_path).convert('RGBA')
             # Ensure it's 64x64 (classic skin format)
-            if skin_image.size != (64, 64):
-                skin_image = skin_image.resize((64, 64), Image.NEAREST)
+            texture = load_skin_texture(skin_path, (64, 64))
+            skin_image = texture.image
             
-            self.skin_texture = skin_image
-            self.skin_pixels = np.array(skin_image)
+            self.set_skin_texture(skin_image, texture.pixels)
             self.render()
             return True
         except Exception as e:
@@ -326,18 +191,18 @@ class MinecraftSkinViewer:
     def load_base_skin(self, skin_path):
         """Load a base skin texture for animation preview"""
         try:
-            skin_image = Image.open(skin_path).convert('RGBA')
             # Ensure it's 64x64 (classic skin format)
-            if skin_image.size != (64, 64):
-                skin_image = skin_image.resize((64, 64), Image.NEAREST)
+            texture = load_skin_texture(skin_path, (64, 64))
+            skin_image = texture.image
             
             self.base_skin_texture = skin_image
-            self.base_skin_pixels = np.array(skin_image)
+            self.base_skin_pixels = texture.pixels
+            self.base_face_visibility = self.compute_face_visibility(self.base_skin_pixels)
+            self.clear_frame_cache()
             
             # If no animation is active, show the base skin
-            if not self.animation_frames:
-                self.skin_texture = skin_image
-                self.skin_pixels = self.base_skin_pixels
+            if not self.frame_count():
+                self.set_skin_texture(skin_image, self.base_skin_pixels, self.base_face_visibility)
                 self.render()
             
             return True
@@ -348,48 +213,192 @@ class MinecraftSkinViewer:
     def load_input_skin(self, skin_path):
         """Load an input skin texture for animation preview"""
         try:
-            skin_image = Image.open(skin_path).convert('RGBA')
             # Ensure it's 64x64 (classic skin format)
-            if skin_image.size != (64, 64):
-                skin_image = skin_image.resize((64, 64), Image.NEAREST)
+            texture = load_skin_texture(skin_path, (64, 64))
+            skin_image = texture.image
             
             self.input_skin_texture = skin_image
-            self.input_skin_pixels = np.array(skin_image)
+            self.input_skin_pixels = texture.pixels
+            self.clear_frame_cache()
             return True
         except Exception as e:
             print(f"Error loading input skin: {e}")
             return False
     
     def load_animation_frames(self, frame_paths):
-        """Load animation frame paths for preview"""
-        self.animation_frames = frame_paths
+        """Load animation frames for preview, decoding every mask once into an alpha stack"""
+        self.clear_frame_cache()
+        self.current_animation_frame = 0
+        try:
+            self.mask_stack = self.load_mask_stack(frame_paths) if frame_paths else None
+            self.animation_frames = frame_paths
+        except Exception as e:
+            print(f"Error loading animation frames: {e}")
+            self.mask_stack = None
+            self.animation_frames = []
+        if self.animation_frames:
+            self.show_animation_frame(0)
+    
+    def load_animation_masks(self, mask_stack, frame_paths=None):
+        """
+        Load an in-memory mask stack (e.g. straight from mask_generator) for preview.
+        
+        Args:
+            mask_stack (np.ndarray): (frames, H, W) uint8 mask alpha planes;
+                frames of other sizes are resized to 64x64 as they are shown,
+                so a memory-mapped stack is still only read a frame at a time
+            frame_paths (list): Saved frame files the masks correspond to, if any
+        """
+        self.clear_frame_cache()
         self.current_animation_frame = 0
-        if frame_paths:
+        try:
+            mask_stack = np.asarray(mask_stack, dtype=np.uint8)
+            if mask_stack.shape[1:] != (64, 64):
+                mask_stack = ResizedMaskStack(mask_stack)
+            self.mask_stack = mask_stack if len(mask_stack) else None
+            self.animation_frames = list(frame_paths) if frame_paths else []
+        except Exception as e:
+            print(f"Error loading animation masks: {e}")
+            self.mask_stack = None
+            self.animation_frames = []
+        if self.frame_count():
             self.show_animation_frame(0)
     
+    def load_mask_cube(self, cube_path):
+        """
+        Preview a .npy mask cube (see mask_generator.save_mask_cube).
+        
+        The cube is memory-mapped rather than read, so only the frames that are
+        shown or prefetched are ever loaded from disk.
+        """
+        try:
+            mask_stack = load_mask_cube(cube_path)
+        except Exception as e:
+            print(f"Error loading mask cube: {e}")
+            return False
+        self.load_animation_masks(mask_stack)
+        return self.frame_count() > 0
+    
+    def frame_count(self):
+        """Number of animation frames loaded"""
+        return len(self.mask_stack) if self.mask_stack is not None else 0
+    
+    def load_mask_stack(self, frame_paths):
+        """Decode mask frames into a (frames, 64, 64) uint8 alpha array.
+        
+        Sequences of MASK_MMAP_THRESHOLD frames or more are backed by a .npy
+        file in MASK_CACHE_DIR and memory-mapped instead of held in RAM.
+        """
+        if len(frame_paths) >= self.MASK_MMAP_THRESHOLD:
+            try:
+                return self._load_mapped_mask_stack(frame_paths)
+            except OSError as e:
+                print(f"Could not memory-map mask stack, decoding into memory: {e}")
+        
+        mask_stack = np.empty((len(frame_paths), 64, 64), dtype=np.uint8)
+        for i, frame_path in enumerate(frame_paths):
+            mask_stack[i] = self._decode_mask_alpha(frame_path)
+        return mask_stack
+    
+    def _load_mapped_mask_stack(self, frame_paths):
+        """Memory-map the cached .npy of a frame sequence, rebuilding it if stale"""
+        first_frame = Path(frame_paths[0]).resolve()
+        base_name = first_frame.stem.rsplit('_', 1)[0]
+        # One cache file per sequence, named after its folder and prefix; never written next to the frames
+        sequence_key = hashlib.sha1(str(first_frame.parent / base_name).encode()).hexdigest()[:16]
+        stack_path = self.MASK_CACHE_DIR / f"{base_name}_{sequence_key}.npy"
+        shape = (len(frame_paths), 64, 64)
+        
+        # Reuse the cached file if it matches the sequence and is newer than every frame
+        if stack_path.exists():
+            newest_frame = max(os.path.getmtime(path) for path in frame_paths)
+            if stack_path.stat().st_mtime >= newest_frame:
+                mask_stack = np.load(stack_path, mmap_mode='r')
+                if mask_stack.shape == shape and mask_stack.dtype == np.uint8:
+                    # Mark it recently used for _prune_mask_cache
+                    os.utime(stack_path)
+                    return mask_stack
+                del mask_stack
+        
+        # Written under a temporary name and renamed, so an interrupted build never leaves a partial cache file
+        self.MASK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        staging = staging_path(stack_path)
+        try:
+            mask_stack = np.lib.format.open_memmap(staging, mode='w+', dtype=np.uint8, shape=shape)
+            for i, frame_path in enumerate(frame_paths):
+                mask_stack[i] = self._decode_mask_alpha(frame_path)
+            mask_stack.flush()
+            del mask_stack
+            os.replace(staging, stack_path)
+        finally:
+            if staging.exists():
+                staging.unlink()
+        self._prune_mask_cache(stack_path)
+        return np.load(stack_path, mmap_mode='r')
+    
+    def _prune_mask_cache(self, keep_path):
+        """Delete the least recently used cache files beyond MASK_CACHE_BYTES, never keep_path"""
+        entries = []
+        for cache_path in self.MASK_CACHE_DIR.glob("*.npy"):
+            try:
+                stat = cache_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, cache_path))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, cache_path in sorted(entries):
+            if total_bytes <= self.MASK_CACHE_BYTES:
+                break
+            if cache_path == keep_path:
+                continue
+            try:
+                cache_path.unlink()
+                total_bytes -= size
+            except OSError:
+                # Still mapped by another viewer (Windows); try again next time
+                pass
+    
+    def _decode_mask_alpha(self, frame_path):
+        """Decode a single mask frame into its 64x64 alpha plane"""
+        mask_image = Image.open(frame_path).convert('RGBA')
+        if mask_image.size != (64, 64):
+            mask_image = mask_image.resize((64, 64), Image.NEAREST)
+        return np.array(mask_image)[:, :, 3]
+    
     def show_animation_frame(self, frame_index):
         """Show a specific animation frame by composing base + input + mask"""
-        if not self.animation_frames or frame_index >= len(self.animation_frames):
+        if frame_index >= self.frame_count():
             return False
         
         if not self.base_skin_texture or not self.input_skin_texture:
             return False
         
         try:
-            # Load the alpha mask frame
-            mask_path = self.animation_frames[frame_index]
-            mask_image = Image.open(mask_path).convert('RGBA')
-            if mask_image.size != (64, 64):
-                mask_image = mask_image.resize((64, 64), Image.NEAREST)
-            
-            # Compose the final skin
-            composed_skin = self.compose_skin(self.base_skin_texture, self.input_skin_texture, mask_image)
-            
-            if composed_skin:
-                self.skin_texture = composed_skin
-                self.skin_pixels = np.array(composed_skin)
+            # Reuse the composed frame if it is cached, otherwise compose it now
+            key = self._frame_cache_key(frame_index)
+            entry = self._get_cached_frame(key)
+            if entry is None:
+                entry = self._compose_frame_delta(frame_index)
+                if entry is None:
+                    entry = self._compose_frame(frame_index, self.base_skin_texture,
+                                                self.input_skin_texture, self.mask_stack)
+                if entry is not None:
+                    self._store_cached_frame(key, entry)
+            
+            if entry is not None:
+                composed_skin, skin_pixels, face_visibility = entry[0], entry[1], entry[2]
+                delta_base = self._drawn_pixels if self._can_redraw_delta(face_visibility) else None
+                
+                self.set_skin_texture(composed_skin, skin_pixels, face_visibility)
                 self.current_animation_frame = frame_index
-                self.render()
+                self.prefetch_frames(frame_index)
+                if delta_base is None:
+                    self.render()
+                else:
+                    # Same view and visible faces: only redraw faces whose texels changed
+                    self.redraw_changed_texels(np.any(skin_pixels != delta_base, axis=-1))
+                self._drawn_frame_key = key
                 return True
             
         except Exception as e:
@@ -397,42 +406,153 @@ class MinecraftSkinViewer:
         
         return False
     
+    def _frame_cache_key(self, frame_index):
+        """Build the cache key for a frame from the identities of its base, input and mask"""
+        return (frame_index, id(self.base_skin_texture), id(self.input_skin_texture),
+                id(self.mask_stack))
+    
+    def _compose_frame(self, frame_index, base_skin, input_skin, mask_stack):
+        """Compose a frame from its slice of the mask stack, returning a cache entry or None"""
+        composed_skin = self.compose_skin(base_skin, input_skin, mask_stack[frame_index])
+        if composed_skin is None:
+            return None
+        
+        # The entry keeps its sources alive so the ids in its key stay unique
+        skin_pixels = np.array(composed_skin)
+        return (composed_skin, skin_pixels, self.compute_face_visibility(skin_pixels),
+                (base_skin, input_skin, mask_stack))
+    
+    def _compose_frame_delta(self, frame_index):
+        """
+        Compose a frame by updating only the texels whose mask differs from the
+        frame currently on screen, returning a cache entry or None if the screen
+        doesn't show a frame of the same animation.
+        """
+        key = self._frame_cache_key(frame_index)
+        if self._drawn_frame_key is None or self._drawn_frame_key[1:] != key[1:]:
+            return None
+        
+        mask_stack = self.mask_stack
+        frame_mask = mask_stack[frame_index]
+        ys, xs = np.nonzero(mask_stack[self._drawn_frame_key[0]] != frame_mask)
+        
+        skin_pixels = self._drawn_pixels.copy()
+        skin_pixels[ys, xs] = compose_skin_stack(self.base_skin_pixels[ys, xs],
+                                                 self.input_skin_pixels[ys, xs], frame_mask[ys, xs])
+        return (Image.fromarray(skin_pixels, 'RGBA'), skin_pixels, self.compute_face_visibility(skin_pixels),
+                (self.base_skin_texture, self.input_skin_texture, mask_stack))
+    
+    def _can_redraw_delta(self, face_visibility):
+        """Whether the canvas is up to date for the current view and shows the same faces"""
+        return (self._render_pending is None and
+                self._drawn_pixels is not None and
+                self._drawn_view == (self.camera_key(), self.interacting) and
+                self._drawn_visibility == face_visibility)
+    
+    def redraw_changed_texels(self, changed_texels):
+        """
+        Redraw only the drawn faces whose texture region has a changed texel.
+        
+        Args:
+            changed_texels (np.ndarray): (64, 64) bool, True where the texture changed
+        """
+        self.begin_render_stats("delta")
+        face_tags = [f"face-{face[3]}_{face[4]}" for face, cell_budget in self.drawn_faces]
+        
+        for i, (face, cell_budget) in enumerate(self.drawn_faces):
+            x1, y1, x2, y2 = self.get_uv_mapping(f"{face[3]}_{face[4]}")
+            if not changed_texels[y1:y2, x1:x2].any():
+                continue
+            
+            self.canvas.delete(face_tags[i])
+            self.draw_face_entry(face, cell_budget)
+            
+            # New items go on top; slide them under the next face to keep the painter's order
+            for next_tag in face_tags[i + 1:]:
+                if self.canvas.find_withtag(next_tag):
+                    self.canvas.tag_lower(face_tags[i], next_tag)
+                    break
+            self.add_render_stat("faces_drawn", 1)
+        
+        self._drawn_pixels = self.skin_pixels
+        self.end_render_stats()
+        self.draw_render_stats_overlay()
+    
+    def _get_cached_frame(self, key):
+        """Return a cached frame entry and mark it as recently used"""
+        with self._frame_cache_lock:
+            entry = self._frame_cache.get(key)
+            if entry is not None:
+                self._frame_cache.move_to_end(key)
+            return entry
+    
+    def _store_cached_frame(self, key, entry):
+        """Store a frame entry, evicting the least recently used ones"""
+        with self._frame_cache_lock:
+            self._frame_cache[key] = entry
+            self._frame_cache.move_to_end(key)
+            while len(self._frame_cache) > self.frame_cache_size:
+                self._frame_cache.popitem(last=False)
+    
+    def clear_frame_cache(self):
+        """Drop all cached frames and cancel pending prefetches"""
+        with self._frame_cache_lock:
+            self._frame_cache.clear()
+            self._prefetch_pending.clear()
+        while True:
+            try:
+                self._prefetch_queue.get_nowait()
+            except queue.Empty:
+                break
+    
+    def prefetch_frames(self, frame_index):
+        """Queue the frames following frame_index for background composition"""
+        frame_count = self.frame_count()
+        for step in range(1, min(self.prefetch_count, frame_count - 1) + 1):
+            next_index = (frame_index + step) % frame_count
+            key = self._frame_cache_key(next_index)
+            with self._frame_cache_lock:
+                if key in self._frame_cache or key in self._prefetch_pending:
+                    continue
+                self._prefetch_pending.add(key)
+            self._prefetch_queue.put((key, next_index, self.base_skin_texture,
+                                      self.input_skin_texture, self.mask_stack))
+        
+        if self._prefetch_thread is None:
+            self._prefetch_thread = threading.Thread(target=self._prefetch_worker)
+            self._prefetch_thread.daemon = True
+            self._prefetch_thread.start()
+    
+    def _prefetch_worker(self):
+        """Compose queued frames in the background and add them to the cache"""
+        while True:
+            key, frame_index, base_skin, input_skin, mask_stack = self._prefetch_queue.get()
+            try:
+                with self._frame_cache_lock:
+                    # Skip requests cancelled by a cache clear or already composed
+                    if key not in self._prefetch_pending or key in self._frame_cache:
+                        continue
+                entry = self._compose_frame(frame_index, base_skin, input_skin, mask_stack)
+                if entry is not None:
+                    with self._frame_cache_lock:
+                        still_wanted = key in self._prefetch_pending
+                    if still_wanted:
+                        self._store_cached_frame(key, entry)
+            except Exception as e:
+                print(f"Error prefetching animation frame {frame_index}: {e}")
+            finally:
+                with self._frame_cache_lock:
+                    self._prefetch_pending.discard(key)
+    
     def compose_skin(self, base_skin, input_skin, alpha_mask):
-        """Compose base skin + input skin using alpha mask"""
+        """Compose base skin + input skin using alpha mask (RGBA image or 2D alpha array)"""
         try:
-            # Create a copy of the base skin to work with
-            result_skin = base_skin.copy()
-            
-            # Convert images to numpy arrays for pixel manipulation
-            base_pixels = np.array(base_skin)
-            input_pixels = np.array(input_skin)
+            # Accept either an RGBA mask image or a 2D alpha plane
             mask_pixels = np.array(alpha_mask)
-            result_pixels = np.array(result_skin)
+            if mask_pixels.ndim == 3:
+                mask_pixels = mask_pixels[:, :, 3]
             
-            # For each pixel, if the mask is not transparent, use input skin pixel
-            for y in range(64):
-                for x in range(64):
-                    # Get mask alpha value
-                    mask_alpha = mask_pixels[y, x][3] if mask_pixels[y, x][3] > 0 else 0
-                    
-                    if mask_alpha > 0:  # If mask is not transparent at this pixel
-                        # Get input skin pixel
-                        input_pixel = input_pixels[y, x]
-                        
-                        # Only use input pixel if it's not transparent
-                        if input_pixel[3] > 0:
-                            # Use mask alpha to blend between base and input
-                            blend_factor = mask_alpha / 255.0
-                            
-                            # Blend the colors
-                            for c in range(3):  # RGB channels
-                                result_pixels[y, x][c] = int(
-                                    base_pixels[y, x][c] * (1 - blend_factor) +
-                                    input_pixel[c] * blend_factor
-                                )
-                            
-                            # For alpha channel, use the maximum of base and input
-                            result_pixels[y, x][3] = max(base_pixels[y, x][3], input_pixel[3])
+            result_pixels = compose_skin_stack(np.array(base_skin), np.array(input_skin), mask_pixels)
             
             # Create result image from modified pixels
             result_image = Image.fromarray(result_pixels, 'RGBA')
@@ -445,155 +565,14 @@ class MinecraftSkinViewer:
     def reset_to_base_skin(self):
         """Reset to showing just the base skin"""
         if self.base_skin_texture:
-            self.skin_texture = self.base_skin_texture
-            self.skin_pixels = self.base_skin_pixels
+            self.set_skin_texture(self.base_skin_texture, self.base_skin_pixels, self.base_face_visibility)
             self.render()
     
     def has_animation_data(self):
         """Check if animation data is loaded"""
         return (self.base_skin_texture is not None and 
                 self.input_skin_texture is not None and 
-                len(self.animation_frames) > 0)
-    
-    def get_texture_color(self, u, v, part='head'):
-        """Get color from skin texture based on UV coordinates and body part"""
-        if self.skin_pixels is None:
-            return "#8B4513"  # Default brown color
-        
-        if part in SKIN_UV_MAPPING:
-            x1, y1, x2, y2 = SKIN_UV_MAPPING[part]
-            
-            # Define faces that need horizontal (U) flipping for proper Minecraft skin mapping
-            faces_needing_u_flip = {
-                'head_front', 'head_outer_front',
-                'body_front', 'body_outer_front', 
-                'left_arm_front', 'right_arm_front',
-                'left_leg_front', 'right_leg_front',
-                'head_back', 'head_outer_back',
-                'body_back', 'body_outer_back',
-                'left_arm_back', 'right_arm_back', 
-                'left_leg_back', 'right_leg_back',
-                'head_left', 'head_outer_left',
-                'body_left', 'body_outer_left',
-                'left_arm_left', 'right_arm_left',
-                'left_leg_left', 'right_leg_left',
-                'head_right', 'head_outer_right',
-                'body_right', 'body_outer_right',
-                'left_arm_right', 'right_arm_right',
-                'left_leg_right', 'right_leg_right',
-                # Top faces that need mirroring
-                'head_top', 'head_outer_top',
-                'left_arm_top', 'right_arm_top'
-            }
-            
-            # Define faces that need rotation (in degrees: 90, 180, 270)
-            faces_needing_rotation = {
-                # Top faces typically need 90° rotation
-                'head_top': 90, 'head_outer_top': 90,
-                'body_top': 90, 'body_outer_top': 90,
-                'left_arm_top': 90, 'right_arm_top': 90,
-                'left_leg_top': 90, 'right_leg_top': 90,
-                
-                # Bottom faces typically need 270° rotation (or -90°)
-                'head_bottom': 270, 'head_outer_bottom': 270,
-                'body_bottom': 270, 'body_outer_bottom': 270,
-                'left_arm_bottom': 270, 'right_arm_bottom': 270,
-                'left_leg_bottom': 270, 'right_leg_bottom': 270,
-                
-                # Some side faces might need 180° rotation - adjust as needed
-                # Uncomment and modify these if certain sides appear upside down:
-                # 'head_left': 180, 'head_outer_left': 180,
-                # 'body_left': 180, 'body_outer_left': 180,
-            }
-            
-            # Apply rotation to UV coordinates if needed
-            orig_u, orig_v = u, v
-            if part in faces_needing_rotation:
-                rotation = faces_needing_rotation[part]
-                if rotation == 90:
-                    # 90° clockwise: new_u = v, new_v = 1-u
-                    u, v = orig_v, 1 - orig_u
-                elif rotation == 180:
-                    # 180°: new_u = 1-u, new_v = 1-v
-                    u, v = 1 - orig_u, 1 - orig_v
-                elif rotation == 270:
-                    # 270° clockwise (or 90° counter-clockwise): new_u = 1-v, new_v = u
-                    u, v = 1 - orig_v, orig_u
-            
-            # Convert UV coordinates (0-1) to texture coordinates
-            # Apply horizontal flipping for faces that need it
-            if part in faces_needing_u_flip:
-                tx = int(x1 + (1 - u) * (x2 - x1))  # Flip U coordinate
-            else:
-                tx = int(x1 + u * (x2 - x1))  # Normal U coordinate
-            
-            # Flip V coordinate to fix upside-down textures (this was already correct)
-            ty = int(y1 + (1 - v) * (y2 - y1))
-            
-            # Clamp to texture bounds
-            tx = max(0, min(63, tx))
-            ty = max(0, min(63, ty))
-            
-            r, g, b, a = self.skin_pixels[ty, tx]
-            
-            # Handle transparent pixels - return None to indicate they shouldn't be drawn
-            if a < 128:  # Mostly transparent
-                return None
-            
-            return f"#{r:02x}{g:02x}{b:02x}"
-        
-        return "#8B4513"  # Default brown
-    
-    def get_uv_mapping(self, part):
-        """Get UV mapping coordinates for a given part"""
-        return SKIN_UV_MAPPING.get(part, (0, 0, 8, 8))
-    
-    def has_visible_texture(self, part):
-        """Check if a texture region has any non-transparent pixels"""
-        if self.skin_pixels is None:
-            return False
-        
-        if part in SKIN_UV_MAPPING:
-            x1, y1, x2, y2 = SKIN_UV_MAPPING[part]
-            # Check if any pixel in the region is non-transparent
-            for y in range(y1, min(y2, 64)):
-                for x in range(x1, min(x2, 64)):
-                    if y < self.skin_pixels.shape[0] and x < self.skin_pixels.shape[1]:
-                        r, g, b, a = self.skin_pixels[y, x]
-                        if a > 0:  # Found non-transparent pixel
-                            return True
-            return False
-        
-        return True  # Default to visible for non-outer layers
-    
-    def project_3d_to_2d(self, vertex):
-        """Project a 3D vertex to 2D screen coordinates"""
-        x, y, z = vertex
-        
-        # Apply rotations
-        # Rotation around Y axis
-        cos_y = math.cos(self.rotation_y)
-        sin_y = math.sin(self.rotation_y)
-        x_rot = x * cos_y - z * sin_y
-        z_rot = x * sin_y + z * cos_y
-        
-        # Rotation around X axis
-        cos_x = math.cos(self.rotation_x)
-        sin_x = math.sin(self.rotation_x)
-        y_rot = y * cos_x - z_rot * sin_x
-        z_final = y * sin_x + z_rot * cos_x
-        
-        # Simple perspective projection
-        if z_final < -50:  # Prevent divide by zero and maintain reasonable perspective
-            z_final = -50
-        
-        perspective = 1000 / (1000 + z_final)
-        
-        # Scale and translate to screen coordinates
-        screen_x = x_rot * self.scale * perspective + self.offset_x
-        screen_y = -y_rot * self.scale * perspective + self.offset_y  # Flip Y to correct orientation
-        
-        return screen_x, screen_y, z_final
+                self.frame_count() > 0)
     
     def draw_face(self, vertices, face_indices, part_name, face_name):
         """Draw a single face of the model"""
@@ -620,218 +599,42 @@ class MinecraftSkinViewer:
                 points.extend([x, y])
             self.canvas.create_polygon(points, fill=color, outline="black", width=1)
     
-    def draw_textured_face(self, vertices, face_indices, part_name, face_name, z_depth):
-        """Draw a textured face by subdividing it into a grid of small polygons"""
-        if self.skin_pixels is None:
-            # Fallback to simple colored face
-            color = self.get_texture_color(0.5, 0.5, f"{part_name}_{face_name}")
-            if color is None:  # Skip transparent faces
-                return
-                
-            projected = []
-            for i in face_indices:
-                x, y, z = self.project_3d_to_2d(vertices[i])
-                projected.append((x, y))
-            
-            if len(projected) >= 3:
-                points = []
-                for x, y in projected:
-                    points.extend([x, y])
-                # Draw solid polygon
-                self.canvas.create_polygon(points, fill=color, outline="", width=0)
-            return
-
-        # Project the 4 corners of the face
-        projected_corners = []
-        for i in face_indices:
-            x, y, z = self.project_3d_to_2d(vertices[i])
-            projected_corners.append((x, y))
-        
-        if len(projected_corners) != 4:
-            return
-        
-        # Get texture region for this face
-        face_key = f"{part_name}_{face_name}"
-        x1, y1, x2, y2 = self.get_uv_mapping(face_key)
-        tex_width = x2 - x1
-        tex_height = y2 - y1
-        
-        # Determine grid resolution based on the projected face size
-        # Calculate approximate face size in pixels
-        min_x = min(x for x, y in projected_corners)
-        max_x = max(x for x, y in projected_corners)
-        min_y = min(y for x, y in projected_corners)
-        max_y = max(y for x, y in projected_corners)
-        
-        face_width = max_x - min_x
-        face_height = max_y - min_y
-        
-        # Determine grid resolution (balance between quality and performance)
-        grid_res_x = max(2, min(tex_width, int(face_width / 4)))
-        grid_res_y = max(2, min(tex_height, int(face_height / 4)))
-        
-        # Draw the face as a grid of small quads
-        for grid_y in range(grid_res_y):
-            for grid_x in range(grid_res_x):
-                # Calculate UV coordinates for this grid cell
-                u1 = grid_x / grid_res_x
-                u2 = (grid_x + 1) / grid_res_x
-                v1 = grid_y / grid_res_y
-                v2 = (grid_y + 1) / grid_res_y
-                
-                # Interpolate 3D positions for the quad corners
-                # Using bilinear interpolation on the face
-                def lerp_2d(u, v):
-                    # Bilinear interpolation between the 4 projected corners
-                    # Corners are assumed to be in order: bottom-left, bottom-right, top-right, top-left
-                    x_bottom = projected_corners[0][0] * (1-u) + projected_corners[1][0] * u
-                    x_top = projected_corners[3][0] * (1-u) + projected_corners[2][0] * u
-                    y_bottom = projected_corners[0][1] * (1-u) + projected_corners[1][1] * u
-                    y_top = projected_corners[3][1] * (1-u) + projected_corners[2][1] * u
-                    
-                    x = x_bottom * (1-v) + x_top * v
-                    y = y_bottom * (1-v) + y_top * v
-                    return x, y
-                
-                # Get the 4 corners of this grid cell
-                quad_corners = [
-                    lerp_2d(u1, v1),  # bottom-left
-                    lerp_2d(u2, v1),  # bottom-right  
-                    lerp_2d(u2, v2),  # top-right
-                    lerp_2d(u1, v2),  # top-left
-                ]
-                
-                # Get color from texture (sample at center of grid cell)
-                center_u = (u1 + u2) / 2
-                center_v = (v1 + v2) / 2
-                color = self.get_texture_color(center_u, center_v, face_key)
-                
-                # Skip transparent pixels
-                if color is None:
-                    continue
-                
-                # Draw the quad
-                points = []
-                for x, y in quad_corners:
-                    points.extend([x, y])
-                
-                if len(points) >= 6:  # At least 3 points for a polygon
-                    # Draw solid polygon
-                    self.canvas.create_polygon(points, fill=color, outline="", width=0)
+    def clear(self):
+        """Remove everything drawn on the canvas"""
+        self.canvas.delete("all")
+    
+    def begin_face(self, face_key):
+        """Tag the following polygons with their face so they can be redrawn on their own"""
+        self._face_tag = (f"face-{face_key}",)
+    
+    def draw_polygon(self, points, color):
+        """Draw a filled, borderless polygon on the canvas"""
+        self.canvas.create_polygon(points, fill=color, outline="", width=0, tags=self._face_tag)
+    
+    def outer_layers_enabled(self):
+        """Whether the outer layers checkbox is ticked"""
+        return self.show_outer_layers.get()
     
     def render(self):
-        """Render the 3D model"""
-        self.canvas.delete("all")
-        
-        # List of model parts with their vertices and part names
-        # Inner layers first, then outer layers (if enabled)
-        model_parts = [
-            (self.head_vertices, "head"),
-            (self.body_vertices, "body"),
-            (self.left_arm_vertices, "left_arm"),
-            (self.right_arm_vertices, "right_arm"),
-            (self.left_leg_vertices, "left_leg"),
-            (self.right_leg_vertices, "right_leg")
-        ]
-        
-        # Add outer layers only if the toggle is enabled
-        if self.show_outer_layers.get():
-            model_parts.extend([
-                (self.head_outer_vertices, "head_outer"),
-                (self.body_outer_vertices, "body_outer")
-            ])
-        
-        face_names = ["front", "back", "top", "bottom", "left", "right"]
-        
-        # Collect all faces with their Z-depth for proper rendering order
-        faces_to_draw = []
-        
-        for vertices, part_name in model_parts:
-            for i, face_indices in enumerate(self.faces):
-                # Skip outer layers if they don't have visible content
-                face_key = f"{part_name}_{face_names[i]}"
-                if part_name.endswith("_outer") and not self.has_visible_texture(face_key):
-                    continue
-                
-                # Calculate actual distance from camera for proper depth sorting
-                face_center = [0, 0, 0]
-                projected_face = []
-                
-                # Calculate face center in 3D space
-                for vertex_idx in face_indices:
-                    vertex = vertices[vertex_idx]
-                    face_center[0] += vertex[0]
-                    face_center[1] += vertex[1] 
-                    face_center[2] += vertex[2]
-                    
-                    x, y, z = self.project_3d_to_2d(vertex)
-                    projected_face.append((x, y))
-                
-                # Get average position of face
-                face_center = [coord / len(face_indices) for coord in face_center]
-                
-                # Apply same transformations as in projection to get world space position
-                x, y, z = face_center
-                
-                # Rotation around Y axis
-                cos_y = math.cos(self.rotation_y)
-                sin_y = math.sin(self.rotation_y)
-                x_rot = x * cos_y - z * sin_y
-                z_rot = x * sin_y + z * cos_y
-                
-                # Rotation around X axis  
-                cos_x = math.cos(self.rotation_x)
-                sin_x = math.sin(self.rotation_x)
-                y_rot = y * cos_x - z_rot * sin_x
-                z_final = y * sin_x + z_rot * cos_x
-                
-                # Use Z-depth for sorting - farther negative values are farther from camera
-                camera_distance = z_final
-                
-                # Add small offset for outer layers to render in front of their inner counterparts
-                # This prevents z-fighting between inner and outer layers of the same body part
-                if part_name.endswith('_outer'):
-                    camera_distance += 0.01  # Small offset to put outer layers slightly closer to camera
-                
-                # Proper back-face culling using face normal
-                if len(face_indices) >= 3:
-                    # Calculate face normal for proper culling
-                    v1 = vertices[face_indices[0]]
-                    v2 = vertices[face_indices[1]]
-                    v3 = vertices[face_indices[2]]
-                    
-                    # Cross product to get normal (in original model space)
-                    edge1 = [v2[i] - v1[i] for i in range(3)]
-                    edge2 = [v3[i] - v1[i] for i in range(3)]
-                    normal = [
-                        edge1[1] * edge2[2] - edge1[2] * edge2[1],
-                        edge1[2] * edge2[0] - edge1[0] * edge2[2],
-                        edge1[0] * edge2[1] - edge1[1] * edge2[0]
-                    ]
-                    
-                    # Apply same rotations to normal as we do to vertices
-                    cos_y = math.cos(self.rotation_y)
-                    sin_y = math.sin(self.rotation_y)
-                    nx_rot = normal[0] * cos_y - normal[2] * sin_y
-                    nz_rot = normal[0] * sin_y + normal[2] * cos_y
-                    
-                    cos_x = math.cos(self.rotation_x)
-                    sin_x = math.sin(self.rotation_x)
-                    ny_rot = normal[1] * cos_x - nz_rot * sin_x
-                    nz_final = normal[1] * sin_x + nz_rot * cos_x
-                    
-                    # Only render faces facing towards camera
-                    # For outward-facing normals, we want nz_final < 0 (pointing away from camera)
-                    if nz_final < 0:
-                        faces_to_draw.append((camera_distance, vertices, face_indices, part_name, face_names[i], projected_face))
-        
-        # Sort faces by camera distance (far to near for painter's algorithm)
-        # Higher Z values are farther from camera, lower Z values are closer
-        faces_to_draw.sort(key=lambda x: x[0], reverse=True)
-        
-        # Draw faces in correct order
-        for z_depth, vertices, face_indices, part_name, face_name, projected_face in faces_to_draw:
-            self.draw_textured_face(vertices, face_indices, part_name, face_name, z_depth)
+        """Render the 3D model onto the canvas"""
+        # A synchronous render supersedes any pending idle render
+        if self._render_pending is not None:
+            self.canvas.after_cancel(self._render_pending)
+            self._render_pending = None
+        
+        SkinRenderer.render(self)
+        self._drawn_pixels = self.skin_pixels
+        self._drawn_visibility = self.face_visibility
+        self._drawn_view = (self.camera_key(), self.interacting)
+        self._drawn_frame_key = None
+        self.draw_render_stats_overlay()
+    
+    def draw_render_stats_overlay(self):
+        """Show the latest render statistics in the canvas corner if the overlay is enabled"""
+        self.canvas.delete("render-stats")
+        if self.show_render_stats.get():
+            self.canvas.create_text(8, 8, anchor="nw", text=self.format_render_stats(), fill="#a0a0a0",
+                                    font=("Consolas", 9), tags=("render-stats",))
     
     def on_mouse_press(self, event):
         """Handle mouse press events"""
@@ -855,7 +658,8 @@ class MinecraftSkinViewer:
             self.last_mouse_x = event.x
             self.last_mouse_y = event.y
             
-            self.render()
+            self.begin_interaction()
+            self.request_render()
     
     def on_mouse_release(self, event):
         """Handle mouse release events"""
@@ -879,7 +683,8 @@ class MinecraftSkinViewer:
         
         # Clamp scale to reasonable bounds
         self.scale = max(2, min(300, self.scale))
-        self.render()
+        self.begin_interaction()
+        self.request_render()
     
     def force_render_refresh(self):
         """Force a complete render refresh - useful for CustomTkinter context"""
@@ -888,58 +693,4 @@ class MinecraftSkinViewer:
         # Update canvas to ensure it's ready
         self.canvas.update_idletasks()
         # Re-render
-        self.render()
-        
-    def debug_depth_sorting(self):
-        """Debug function to print depth sorting information"""
-        if not hasattr(self, '_debug_enabled'):
-            return
-            
-        print(f"\n--- Debug Depth Sorting ---")
-        print(f"Camera rotation: X={self.rotation_x:.2f}, Y={self.rotation_y:.2f}")
-        
-        # Quick check of face positions
-        model_parts = [
-            (self.head_vertices, "head"),
-            (self.body_vertices, "body"), 
-            (self.left_leg_vertices, "left_leg"),
-            (self.right_leg_vertices, "right_leg")
-        ]
-        
-        for vertices, part_name in model_parts:
-            # Get first face (front face)
-            face_indices = [0, 1, 2, 3]  
-            face_center = [0, 0, 0]
-            
-            for vertex_idx in face_indices:
-                vertex = vertices[vertex_idx]
-                face_center[0] += vertex[0]
-                face_center[1] += vertex[1] 
-                face_center[2] += vertex[2]
-            
-            face_center = [coord / len(face_indices) for coord in face_center]
-            x, y, z = face_center
-            
-            # Apply same transformations as in render
-            cos_y = math.cos(self.rotation_y)
-            sin_y = math.sin(self.rotation_y)
-            x_rot = x * cos_y - z * sin_y
-            z_rot = x * sin_y + z * cos_y
-            
-            cos_x = math.cos(self.rotation_x)
-            sin_x = math.sin(self.rotation_x)
-            y_rot = y * cos_x - z_rot * sin_x
-            z_final = y * sin_x + z_rot * cos_x
-            
-            # Apply same logic as in render
-            camera_distance = z_final
-                
-            print(f"{part_name}: z_final={z_final:.2f}, distance={camera_distance:.2f}")
-    
-    def enable_debug(self):
-        """Enable debug output"""
-        self._debug_enabled = True
-        
-    def disable_debug(self):
-        """Disable debug output"""
-        self._debug_enabled = False 
\ No newline at end of file
+        self.render() 
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Headless rendering of the Minecraft player model into PIL images.
+
+OffscreenSkinRenderer uses the same geometry, UV mapping and depth sorting as
+the 3D preview but needs no display or Tk, so it can run on build machines.
+It also exports the 3D reveal animation (see export_reveal_animation).
+Run this file as a script to render turntable thumbnails for many skins
+across a process pool:
+
+    python offscreen_renderer.py turntable skins/ --angles 36 --size 256
+"""
+
+import argparse
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from PIL import Image, ImageDraw
+from skin_compositor import compose_skin_frames
+from skin_renderer import SkinRenderer
+from skin_texture import load_skin_texture
+
+# Frames composed together by render_reveal; bounds memory for long (memory-mapped) mask stacks
+REVEAL_CHUNK_FRAMES = 64
+
+class OffscreenSkinRenderer(SkinRenderer):
+    # Height of the player model (including the hat layer) in model units
+    MODEL_HEIGHT = 33
+    # Model-space Y coordinate of the middle of the model
+    MODEL_CENTER_Y = 0.25
+
+    def __init__(self, width=256, height=256, background=(0, 0, 0, 0), supersample=2):
+        """
+        Args:
+            width (int): Output image width in pixels
+            height (int): Output image height in pixels
+            background (tuple): RGBA background color
+            supersample (int): Render at this multiple of the output size and
+                downsample, which smooths polygon edges
+        """
+        self.output_size = (width, height)
+        self.supersample = max(1, int(supersample))
+        SkinRenderer.__init__(self, width * self.supersample, height * self.supersample)
+        self.background = background
+        self.image = None
+        self._draw = None
+        self.fit_camera()
+
+    def fit_camera(self, margin=0.9):
+        """Center the model and scale it so its height fills margin of the image"""
+        self.scale = min(self.width, self.height) * margin / self.MODEL_HEIGHT
+        self.offset_x = self.width / 2
+        self.offset_y = self.height / 2 + self.MODEL_CENTER_Y * self.scale
+
+    def load_skin(self, skin_path):
+        """Load a skin file as the current texture"""
+        # Ensure it's 64x64 (classic skin format)
+        texture = load_skin_texture(skin_path, (64, 64))
+        self.set_skin_texture(texture.image, texture.pixels)
+
+    def face_grid_resolution(self, tex_width, tex_height, face_width, face_height):
+        """Always draw one cell per texel"""
+        return tex_width, tex_height
+
+    def clear(self):
+        """Start a new image filled with the background color"""
+        self.image = Image.new('RGBA', (self.width, self.height), self.background)
+        self._draw = ImageDraw.Draw(self.image)
+
+    def draw_polygon(self, points, color):
+        """Fill a polygon in the current image"""
+        self._draw.polygon(points, fill=color)
+
+    def render_image(self, rotation_x=None, rotation_y=None):
+        """Render the model, optionally from a new camera angle, at the output size"""
+        if rotation_x is not None:
+            self.rotation_x = rotation_x
+        if rotation_y is not None:
+            self.rotation_y = rotation_y
+
+        self.render()
+        if self.supersample == 1:
+            return self.image
+        # Downsample with premultiplied alpha so edges don't pick up the background color
+        return self.image.convert('RGBa').resize(self.output_size, Image.LANCZOS).convert('RGBA')
+
+    def render_turntable(self, angles=36, pitch=-0.3):
+        """Render the model at evenly spaced yaw angles, returning a list of images"""
+        return [self.render_image(pitch, 2 * math.pi * i / angles) for i in range(angles)]
+
+    def render_reveal(self, base_pixels, input_pixels, mask_stack, orbit_degrees=0.0):
+        """
+        Render every frame of a reveal animation from the current camera.
+
+        Frames are composed REVEAL_CHUNK_FRAMES at a time, so only that part of
+        a memory-mapped mask stack is read at once, and when the camera doesn't
+        orbit the faces are projected and sorted only once.
+
+        Args:
+            base_pixels (np.ndarray): (64, 64, 4) base skin
+            input_pixels (np.ndarray): (64, 64, 4) input skin
+            mask_stack (np.ndarray): (frames, 64, 64) mask alpha planes
+            orbit_degrees (float): Total yaw the camera turns over the animation
+
+        Yields:
+            PIL.Image: One rendered frame at the output size per mask
+        """
+        frame_count = len(mask_stack)
+        start_yaw = self.rotation_y
+        for i, skin_pixels in self.iter_composed_frames(base_pixels, input_pixels, mask_stack):
+            if orbit_degrees:
+                self.rotation_y = start_yaw + math.radians(orbit_degrees) * i / frame_count
+
+            # get_sorted_faces() reuses the projection while the camera stays put
+            self.set_skin_texture(Image.fromarray(skin_pixels, 'RGBA'), skin_pixels)
+            self.begin_render_stats("full")
+            self.clear()
+            self.draw_faces(self.get_sorted_faces())
+            self.end_render_stats()
+            if self.supersample == 1:
+                yield self.image
+            else:
+                yield self.image.convert('RGBa').resize(self.output_size, Image.LANCZOS).convert('RGBA')
+
+        self.rotation_y = start_yaw
+
+    @staticmethod
+    def iter_composed_frames(base_pixels, input_pixels, mask_stack):
+        """Yield (index, composed RGBA skin) for each mask, composing a chunk of frames at a time"""
+        for start in range(0, len(mask_stack), REVEAL_CHUNK_FRAMES):
+            chunk = compose_skin_frames(base_pixels, input_pixels, mask_stack[start:start + REVEAL_CHUNK_FRAMES])
+            for offset, skin_pixels in enumerate(chunk):
+                yield start + offset, skin_pixels
+
+def find_skin_files(paths):
+    """Expand a list of files and directories into sorted PNG skin paths"""
+    skin_files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            skin_files.extend(sorted(path.glob("*.png")))
+        else:
+            skin_files.append(path)
+    return skin_files
+
+def render_turntable_job(skin_path, output_root, angles=36, size=256, pitch=-0.3, supersample=2):
+    """Render one skin's turntable to <output_root>/<name>_turntable/<name>_<angle>.png"""
+    renderer = OffscreenSkinRenderer(size, size, supersample=supersample)
+    renderer.load_skin(skin_path)
+
+    base_name = Path(skin_path).stem
+    output_dir = Path(output_root) / f"{base_name}_turntable"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for i, image in enumerate(renderer.render_turntable(angles, pitch)):
+        image.save(output_dir / f"{base_name}_{i}.png", "PNG")
+    return str(output_dir)
+
+def render_turntables(skin_paths, output_root, angles=36, size=256, pitch=-0.3, supersample=2, workers=None):
+    """Render turntables for many skins across a process pool.
+
+    Returns:
+        dict: Skin path -> output directory, or the exception that job raised
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_turntable_job, str(skin_path), str(output_root), angles, size, pitch, supersample): skin_path
+            for skin_path in skin_paths
+        }
+        for future in as_completed(futures):
+            skin_path = futures[future]
+            try:
+                results[skin_path] = future.result()
+                print(f"Rendered {skin_path} -> {results[skin_path]}")
+            except Exception as e:
+                results[skin_path] = e
+                print(f"Error rendering {skin_path}: {e}")
+    return results
+
+def export_reveal_animation(base_pixels, input_pixels, mask_stack, output_path, size=256,
+                            orbit_degrees=0.0, rotation_x=-0.3, rotation_y=0.0, fps=10,
+                            progress_callback=None):
+    """
+    Render the 3D reveal animation and save it as an animated image or PNG sequence.
+
+    A .gif or .webp output_path is written as a single looping animation on the
+    preview background color; any other path is treated as a directory and
+    filled with <name>_<frame>.png images with a transparent background.
+
+    Args:
+        base_pixels (np.ndarray): (64, 64, 4) base skin
+        input_pixels (np.ndarray): (64, 64, 4) input skin
+        mask_stack (np.ndarray): (frames, 64, 64) mask alpha planes
+        output_path (str): Animated image file or output directory
+        size (int): Frame width and height in pixels
+        orbit_degrees (float): Total yaw the camera turns over the animation
+        rotation_x (float): Camera pitch in radians
+        rotation_y (float): Starting camera yaw in radians
+        fps (float): Playback rate of animated outputs
+        progress_callback (callable): Called with (frames_done, frame_count)
+
+    Returns:
+        str: The path that was written
+    """
+    output_path = Path(output_path)
+    animated = output_path.suffix.lower() in (".gif", ".webp")
+    background = (43, 43, 43, 255) if animated else (0, 0, 0, 0)
+
+    renderer = OffscreenSkinRenderer(size, size, background=background)
+    renderer.rotation_x = rotation_x
+    renderer.rotation_y = rotation_y
+
+    frame_count = len(mask_stack)
+    if not animated:
+        output_path.mkdir(parents=True, exist_ok=True)
+
+    frames = []
+    for i, image in enumerate(renderer.render_reveal(base_pixels, input_pixels, mask_stack, orbit_degrees)):
+        if animated:
+            frames.append(image.convert('RGB'))
+        else:
+            image.save(output_path / f"{output_path.name}_{i}.png", "PNG")
+        if progress_callback:
+            progress_callback(i + 1, frame_count)
+
+    if animated and frames:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        frames[0].save(output_path, save_all=True, append_images=frames[1:],
+                       duration=int(1000 / fps), loop=0)
+    return str(output_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Minecraft skins without a display")
+    subparsers = parser.add_subparsers(dest="command")
+
+    turntable_parser = subparsers.add_parser("turntable", help="Render turntable thumbnails for many skins")
+    turntable_parser.add_argument("skins", nargs="+", help="Skin PNG files or directories containing them")
+    turntable_parser.add_argument("--output", default="output", help="Output root directory (default: output)")
+    turntable_parser.add_argument("--angles", type=int, default=36, help="Number of yaw angles (default: 36)")
+    turntable_parser.add_argument("--size", type=int, default=256, help="Image width and height in pixels (default: 256)")
+    turntable_parser.add_argument("--pitch", type=float, default=-0.3, help="Camera pitch in radians, negative looks down on the model (default: -0.3)")
+    turntable_parser.add_argument("--supersample", type=int, default=2, help="Supersampling factor (default: 2)")
+    turntable_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args(argv)
+    if args.command != "turntable":
+        parser.print_help()
+        return 1
+
+    skin_paths = find_skin_files(args.skins)
+    if not skin_paths:
+        print("No skin files found")
+        return 1
+
+    results = render_turntables(skin_paths, args.output, args.angles, args.size,
+                                args.pitch, args.supersample, args.workers)
+    failures = sum(1 for result in results.values() if isinstance(result, Exception))
+    print(f"Rendered {len(results) - failures}/{len(results)} turntables")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Wall-clock playback scheduling for the animation viewers.
+
+The frame to display is derived from the time elapsed since playback started,
+so when drawing a frame takes longer than the frame interval the scheduler
+skips ahead instead of letting the animation drift slower than intended.
+"""
+
+import time
+from collections import deque
+
+
+class PlaybackScheduler:
+    """Drive looped frame playback from a wall-clock timeline at a target FPS"""
+
+    MIN_FPS = 0.5
+    MAX_FPS = 120.0
+
+    def __init__(self, root, show_frame, get_frame_count, on_stats=None, target_fps=10.0):
+        """
+        Args:
+            root: Tk widget used for scheduling with after()
+            show_frame (callable): Displays a frame index
+            get_frame_count (callable): Returns the number of frames to loop over
+            on_stats (callable): Called with (measured_fps, render_ms, skipped_frames)
+            target_fps (float): Playback rate to aim for
+        """
+        self.root = root
+        self.show_frame = show_frame
+        self.get_frame_count = get_frame_count
+        self.on_stats = on_stats
+        self.target_fps = self.clamp_fps(target_fps)
+
+        self.is_running = False
+        self.current_frame = 0
+        self.render_ms = 0.0
+        self.skipped_frames = 0
+
+        self._timer = None
+        self._start_time = 0.0
+        self._start_frame = 0
+        self._last_step = -1
+        self._display_times = deque(maxlen=30)
+
+    @classmethod
+    def clamp_fps(cls, fps):
+        """Clamp a requested FPS to the supported range"""
+        return max(cls.MIN_FPS, min(cls.MAX_FPS, float(fps)))
+
+    @property
+    def measured_fps(self):
+        """Frames actually displayed per second over the recent window"""
+        if len(self._display_times) < 2:
+            return 0.0
+        span = self._display_times[-1] - self._display_times[0]
+        return (len(self._display_times) - 1) / span if span > 0 else 0.0
+
+    def set_target_fps(self, fps):
+        """Change the target FPS, continuing from the current frame"""
+        self.target_fps = self.clamp_fps(fps)
+        if self.is_running:
+            self._restart_timeline(self.current_frame)
+
+    def start(self, start_frame=0):
+        """Start playback; the first tick shows the frame after start_frame"""
+        self.stop()
+        self.is_running = True
+        self.current_frame = start_frame
+        self.skipped_frames = 0
+        self._display_times.clear()
+        self._restart_timeline(start_frame)
+        self._tick()
+
+    def stop(self):
+        """Stop playback and cancel the pending tick"""
+        self.is_running = False
+        if self._timer:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+
+    def seek(self, frame_index):
+        """Continue playback from frame_index (e.g. after the user scrubs)"""
+        self.current_frame = frame_index
+        if self.is_running:
+            self._restart_timeline(frame_index)
+
+    def _restart_timeline(self, frame_index):
+        """Anchor the timeline so that frame_index + 1 is due now"""
+        self._start_time = time.perf_counter()
+        self._start_frame = frame_index
+        self._last_step = -1
+
+    def _tick(self):
+        """Show the frame due at the current time and schedule the next tick"""
+        self._timer = None
+        if not self.is_running:
+            return
+
+        frame_count = self.get_frame_count()
+        if frame_count <= 0:
+            self.stop()
+            return
+
+        step = int((time.perf_counter() - self._start_time) * self.target_fps)
+        if step != self._last_step:
+            # Frames whose slot passed while the previous frame was drawing are skipped
+            self.skipped_frames += max(0, step - self._last_step - 1)
+            self._last_step = step
+            frame_index = (self._start_frame + 1 + step) % frame_count
+
+            render_start = time.perf_counter()
+            self.show_frame(frame_index)
+            now = time.perf_counter()
+            if not self.is_running:
+                return
+
+            self.current_frame = frame_index
+            self.render_ms = (now - render_start) * 1000
+            self._display_times.append(now)
+            if self.on_stats:
+                self.on_stats(self.measured_fps, self.render_ms, self.skipped_frames)
+
+        # Wake up at the start of the next frame slot
+        next_slot = self._start_time + (step + 1) / self.target_fps
+        delay_ms = max(1, int((next_slot - time.perf_counter()) * 1000))
+        self._timer = self.root.after(delay_ms, self._tick)
@@ -0,0 +1,78 @@
+"""
+Numpy arrays in named shared memory blocks, for handing pixel data between processes.
+
+The process that creates a SharedArray owns its block. Other processes attach
+to it through its descriptor, a small (name, shape, dtype) tuple that is cheap
+to pickle, and read or write the same memory without copying. Only the owner
+unlinks the block, so a worker that crashes while attached leaks nothing. If
+the owner itself dies, Python's resource tracker removes the blocks it
+created.
+
+multiprocessing.shared_memory needs Python 3.8. Check SHARED_MEMORY_AVAILABLE
+and fall back to passing arrays normally on older versions.
+"""
+
+import sys
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    shared_memory = None
+
+SHARED_MEMORY_AVAILABLE = shared_memory is not None
+
+class SharedArray:
+    """A numpy array backed by a named shared memory block"""
+
+    __slots__ = ("block", "array", "owner")
+
+    def __init__(self, block, shape, dtype, owner):
+        self.block = block
+        self.array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, shape, dtype=np.uint8):
+        """Allocate a new block owned by this process"""
+        if not SHARED_MEMORY_AVAILABLE:
+            raise RuntimeError("Shared memory needs Python 3.8 or newer")
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        return cls(shared_memory.SharedMemory(create=True, size=size), tuple(shape), dtype, True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Map a block created by another process from its descriptor"""
+        name, shape, dtype = descriptor
+        if sys.version_info >= (3, 13):
+            # Attaching processes don't own the block, so keep it out of their resource tracker
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            block = shared_memory.SharedMemory(name=name)
+        return cls(block, shape, np.dtype(dtype), False)
+
+    @property
+    def descriptor(self):
+        """(name, shape, dtype) tuple to send to other processes"""
+        return (self.block.name, self.array.shape, self.array.dtype.str)
+
+    def close(self):
+        """Unmap the block, and free it if this process owns it"""
+        if self.block is None:
+            return
+        # The numpy view must go before the buffer it points into can be released
+        self.array = None
+        self.block.close()
+        if self.owner:
+            try:
+                self.block.unlink()
+            except FileNotFoundError:
+                pass
+        self.block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -0,0 +1,967 @@
+"""
+Surface-independent renderer for the Minecraft player model.
+
+SkinRenderer holds the model geometry, the current skin texture and the
+projection, culling, depth sorting and texture sampling used to draw it.
+Subclasses supply the drawing surface by implementing clear() and
+draw_polygon(): MinecraftSkinViewer draws onto a Tk canvas and
+OffscreenSkinRenderer draws into a PIL image.
+"""
+
+import math
+import time
+from collections import deque
+from skin_mapping_config import SKIN_UV_MAPPING
+
+class SkinRenderer:
+    def __init__(self, width=400, height=400, interactive_polygon_budget=600, polygon_budget=None):
+        self.width = width
+        self.height = height
+        
+        # 3D transformation parameters
+        self.rotation_x = 0
+        self.rotation_y = 0
+        self.scale = 8  # Start with smaller scale to see full model
+        self.offset_x = width // 2
+        self.offset_y = height // 2
+        self.show_outer_layers = True
+        
+        # Current skin texture (will be set later)
+        self.skin_texture = None
+        self.skin_pixels = None
+        self.face_visibility = {}  # UV face name -> has any non-transparent texel
+        
+        # Level of detail: while interacting, each render is limited to
+        # interactive_polygon_budget polygons; otherwise renders are limited
+        # by polygon_budget (None for unlimited)
+        self.interactive_polygon_budget = interactive_polygon_budget
+        self.polygon_budget = polygon_budget
+        self.interacting = False
+        self._face_average_colors = {}
+        self._face_average_source = None
+        
+        # Greedy-meshed rectangles per (face, grid_res_x, grid_res_y) for the current texture
+        self._face_meshes = {}
+        self._face_mesh_source = None
+        
+        # Sorted faces and projected corner lattices for the last camera, so
+        # texture-only changes (animation playback) skip projection and sorting
+        self._geometry_key = None
+        self._sorted_faces = []
+        self._face_lattices = {}
+        
+        # (face, cell_budget) pairs drawn by the last draw_faces(), in draw order
+        self.drawn_faces = []
+        
+        # Per-render statistics (see get_render_stats) for the most recent renders
+        self.render_stats = deque(maxlen=60)
+        self._current_stats = None
+        self._geometry_stats = {}
+        
+        # Define Minecraft player model vertices (simplified cube-based model)
+        self.setup_model()
+    
+    def setup_model(self):
+        """Setup the Minecraft player model geometry with proper positioning"""
+        
+        # Define base dimensions (in Minecraft pixels)
+        head_size = 4  # Head is 8x8x8, so radius = 4
+        body_width = 4  # Body is 8x12x4
+        body_height = 6  # Half of 12
+        body_depth = 2  # Half of 4
+        arm_width = 2   # Arms are 4x12x4
+        arm_height = 6
+        arm_depth = 2
+        leg_width = 2   # Legs are 4x12x4  
+        leg_height = 6
+        leg_depth = 2
+        
+        # Positioning: Head at top, body below, arms to sides, legs below body
+        # Note: In our coordinate system, positive Y is up
+        head_y = 12      # Head center (above body) - moved up to prevent clipping
+        body_y = 2       # Body center  
+        arm_y = 2        # Arms at shoulder level (same as body)
+        leg_y = -10      # Legs below body
+        
+        # Head (8x8x8 pixels) - positioned above body
+        self.head_vertices = [
+            # Front face
+            [-head_size, head_y-head_size, head_size], [head_size, head_y-head_size, head_size], 
+            [head_size, head_y+head_size, head_size], [-head_size, head_y+head_size, head_size],
+            # Back face  
+            [head_size, head_y-head_size, -head_size], [-head_size, head_y-head_size, -head_size], 
+            [-head_size, head_y+head_size, -head_size], [head_size, head_y+head_size, -head_size],
+            # Top face
+            [-head_size, head_y+head_size, -head_size], [-head_size, head_y+head_size, head_size], 
+            [head_size, head_y+head_size, head_size], [head_size, head_y+head_size, -head_size],
+            # Bottom face
+            [-head_size, head_y-head_size, head_size], [-head_size, head_y-head_size, -head_size], 
+            [head_size, head_y-head_size, -head_size], [head_size, head_y-head_size, head_size],
+            # Left face
+            [-head_size, head_y-head_size, -head_size], [-head_size, head_y-head_size, head_size], 
+            [-head_size, head_y+head_size, head_size], [-head_size, head_y+head_size, -head_size],
+            # Right face
+            [head_size, head_y-head_size, head_size], [head_size, head_y-head_size, -head_size], 
+            [head_size, head_y+head_size, -head_size], [head_size, head_y+head_size, head_size]
+        ]
+        
+        # Head outer layer (hat layer) - slightly larger
+        hat_size = head_size + 0.5
+        self.head_outer_vertices = [
+            # Front face
+            [-hat_size, head_y-hat_size, hat_size], [hat_size, head_y-hat_size, hat_size], 
+            [hat_size, head_y+hat_size, hat_size], [-hat_size, head_y+hat_size, hat_size],
+            # Back face  
+            [hat_size, head_y-hat_size, -hat_size], [-hat_size, head_y-hat_size, -hat_size], 
+            [-hat_size, head_y+hat_size, -hat_size], [hat_size, head_y+hat_size, -hat_size],
+            # Top face
+            [-hat_size, head_y+hat_size, -hat_size], [-hat_size, head_y+hat_size, hat_size], 
+            [hat_size, head_y+hat_size, hat_size], [hat_size, head_y+hat_size, -hat_size],
+            # Bottom face
+            [-hat_size, head_y-hat_size, hat_size], [-hat_size, head_y-hat_size, -hat_size], 
+            [hat_size, head_y-hat_size, -hat_size], [hat_size, head_y-hat_size, hat_size],
+            # Left face
+            [-hat_size, head_y-hat_size, -hat_size], [-hat_size, head_y-hat_size, hat_size], 
+            [-hat_size, head_y+hat_size, hat_size], [-hat_size, head_y+hat_size, -hat_size],
+            # Right face
+            [hat_size, head_y-hat_size, hat_size], [hat_size, head_y-hat_size, -hat_size], 
+            [hat_size, head_y+hat_size, -hat_size], [hat_size, head_y+hat_size, hat_size]
+        ]
+        
+        # Body (8x12x4 pixels) - at center
+        self.body_vertices = [
+            # Front face
+            [-body_width, body_y-body_height, body_depth], [body_width, body_y-body_height, body_depth], 
+            [body_width, body_y+body_height, body_depth], [-body_width, body_y+body_height, body_depth],
+            # Back face
+            [body_width, body_y-body_height, -body_depth], [-body_width, body_y-body_height, -body_depth], 
+            [-body_width, body_y+body_height, -body_depth], [body_width, body_y+body_height, -body_depth],
+            # Top face
+            [-body_width, body_y+body_height, -body_depth], [-body_width, body_y+body_height, body_depth], 
+            [body_width, body_y+body_height, body_depth], [body_width, body_y+body_height, -body_depth],
+            # Bottom face
+            [-body_width, body_y-body_height, body_depth], [-body_width, body_y-body_height, -body_depth], 
+            [body_width, body_y-body_height, -body_depth], [body_width, body_y-body_height, body_depth],
+            # Left face
+            [-body_width, body_y-body_height, -body_depth], [-body_width, body_y-body_height, body_depth], 
+            [-body_width, body_y+body_height, body_depth], [-body_width, body_y+body_height, -body_depth],
+            # Right face
+            [body_width, body_y-body_height, body_depth], [body_width, body_y-body_height, -body_depth], 
+            [body_width, body_y+body_height, -body_depth], [body_width, body_y+body_height, body_depth]
+        ]
+        
+        # Body outer layer (jacket layer)
+        jacket_width = body_width + 0.25
+        jacket_depth = body_depth + 0.25
+        self.body_outer_vertices = [
+            # Front face
+            [-jacket_width, body_y-body_height, jacket_depth], [jacket_width, body_y-body_height, jacket_depth], 
+            [jacket_width, body_y+body_height, jacket_depth], [-jacket_width, body_y+body_height, jacket_depth],
+            # Back face
+            [jacket_width, body_y-body_height, -jacket_depth], [-jacket_width, body_y-body_height, -jacket_depth], 
+            [-jacket_width, body_y+body_height, -jacket_depth], [jacket_width, body_y+body_height, -jacket_depth],
+            # Top face
+            [-jacket_width, body_y+body_height, -jacket_depth], [-jacket_width, body_y+body_height, jacket_depth], 
+            [jacket_width, body_y+body_height, jacket_depth], [jacket_width, body_y+body_height, -jacket_depth],
+            # Bottom face
+            [-jacket_width, body_y-body_height, jacket_depth], [-jacket_width, body_y-body_height, -jacket_depth], 
+            [jacket_width, body_y-body_height, -jacket_depth], [jacket_width, body_y-body_height, jacket_depth],
+            # Left face
+            [-jacket_width, body_y-body_height, -jacket_depth], [-jacket_width, body_y-body_height, jacket_depth], 
+            [-jacket_width, body_y+body_height, jacket_depth], [-jacket_width, body_y+body_height, -jacket_depth],
+            # Right face
+            [jacket_width, body_y-body_height, jacket_depth], [jacket_width, body_y-body_height, -jacket_depth], 
+            [jacket_width, body_y+body_height, -jacket_depth], [jacket_width, body_y+body_height, jacket_depth]
+        ]
+        
+        # Left arm (4x12x4 pixels) - positioned to the left of body
+        left_arm_x = -body_width - arm_width  # Position left of body
+        self.left_arm_vertices = [
+            # Front face
+            [left_arm_x-arm_width, arm_y-arm_height, arm_depth], [left_arm_x+arm_width, arm_y-arm_height, arm_depth], 
+            [left_arm_x+arm_width, arm_y+arm_height, arm_depth], [left_arm_x-arm_width, arm_y+arm_height, arm_depth],
+            # Back face
+            [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
+            [left_arm_x-arm_width, arm_y+arm_height, -arm_depth], [left_arm_x+arm_width, arm_y+arm_height, -arm_depth],
+            # Top face
+            [left_arm_x-arm_width, arm_y+arm_height, -arm_depth], [left_arm_x-arm_width, arm_y+arm_height, arm_depth], 
+            [left_arm_x+arm_width, arm_y+arm_height, arm_depth], [left_arm_x+arm_width, arm_y+arm_height, -arm_depth],
+            # Bottom face
+            [left_arm_x-arm_width, arm_y-arm_height, arm_depth], [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
+            [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], [left_arm_x+arm_width, arm_y-arm_height, arm_depth],
+            # Left face
+            [left_arm_x-arm_width, arm_y-arm_height, -arm_depth], [left_arm_x-arm_width, arm_y-arm_height, arm_depth], 
+            [left_arm_x-arm_width, arm_y+arm_height, arm_depth], [left_arm_x-arm_width, arm_y+arm_height, -arm_depth],
+            # Right face
+            [left_arm_x+arm_width, arm_y-arm_height, arm_depth], [left_arm_x+arm_width, arm_y-arm_height, -arm_depth], 
+            [left_arm_x+arm_width, arm_y+arm_height, -arm_depth], [left_arm_x+arm_width, arm_y+arm_height, arm_depth]
+        ]
+        
+        # Right arm (4x12x4 pixels) - positioned to the right of body
+        right_arm_x = body_width + arm_width  # Position right of body
+        self.right_arm_vertices = [
+            # Front face
+            [right_arm_x-arm_width, arm_y-arm_height, arm_depth], [right_arm_x+arm_width, arm_y-arm_height, arm_depth], 
+            [right_arm_x+arm_width, arm_y+arm_height, arm_depth], [right_arm_x-arm_width, arm_y+arm_height, arm_depth],
+            # Back face
+            [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
+            [right_arm_x-arm_width, arm_y+arm_height, -arm_depth], [right_arm_x+arm_width, arm_y+arm_height, -arm_depth],
+            # Top face
+            [right_arm_x-arm_width, arm_y+arm_height, -arm_depth], [right_arm_x-arm_width, arm_y+arm_height, arm_depth], 
+            [right_arm_x+arm_width, arm_y+arm_height, arm_depth], [right_arm_x+arm_width, arm_y+arm_height, -arm_depth],
+            # Bottom face
+            [right_arm_x-arm_width, arm_y-arm_height, arm_depth], [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], 
+            [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], [right_arm_x+arm_width, arm_y-arm_height, arm_depth],
+            # Left face
+            [right_arm_x-arm_width, arm_y-arm_height, -arm_depth], [right_arm_x-arm_width, arm_y-arm_height, arm_depth], 
+            [right_arm_x-arm_width, arm_y+arm_height, arm_depth], [right_arm_x-arm_width, arm_y+arm_height, -arm_depth],
+            # Right face
+            [right_arm_x+arm_width, arm_y-arm_height, arm_depth], [right_arm_x+arm_width, arm_y-arm_height, -arm_depth], 
+            [right_arm_x+arm_width, arm_y+arm_height, -arm_depth], [right_arm_x+arm_width, arm_y+arm_height, arm_depth]
+        ]
+        
+        # Left leg (4x12x4 pixels) - positioned below left side of body
+        left_leg_x = -leg_width  # Slightly left of center
+        self.left_leg_vertices = [
+            # Front face
+            [left_leg_x-leg_width, leg_y-leg_height, leg_depth], [left_leg_x+leg_width, leg_y-leg_height, leg_depth], 
+            [left_leg_x+leg_width, leg_y+leg_height, leg_depth], [left_leg_x-leg_width, leg_y+leg_height, leg_depth],
+            # Back face
+            [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
+            [left_leg_x-leg_width, leg_y+leg_height, -leg_depth], [left_leg_x+leg_width, leg_y+leg_height, -leg_depth],
+            # Top face
+            [left_leg_x-leg_width, leg_y+leg_height, -leg_depth], [left_leg_x-leg_width, leg_y+leg_height, leg_depth], 
+            [left_leg_x+leg_width, leg_y+leg_height, leg_depth], [left_leg_x+leg_width, leg_y+leg_height, -leg_depth],
+            # Bottom face
+            [left_leg_x-leg_width, leg_y-leg_height, leg_depth], [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
+            [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], [left_leg_x+leg_width, leg_y-leg_height, leg_depth],
+            # Left face
+            [left_leg_x-leg_width, leg_y-leg_height, -leg_depth], [left_leg_x-leg_width, leg_y-leg_height, leg_depth], 
+            [left_leg_x-leg_width, leg_y+leg_height, leg_depth], [left_leg_x-leg_width, leg_y+leg_height, -leg_depth],
+            # Right face
+            [left_leg_x+leg_width, leg_y-leg_height, leg_depth], [left_leg_x+leg_width, leg_y-leg_height, -leg_depth], 
+            [left_leg_x+leg_width, leg_y+leg_height, -leg_depth], [left_leg_x+leg_width, leg_y+leg_height, leg_depth]
+        ]
+        
+        # Right leg (4x12x4 pixels) - positioned below right side of body
+        right_leg_x = leg_width  # Slightly right of center
+        self.right_leg_vertices = [
+            # Front face
+            [right_leg_x-leg_width, leg_y-leg_height, leg_depth], [right_leg_x+leg_width, leg_y-leg_height, leg_depth], 
+            [right_leg_x+leg_width, leg_y+leg_height, leg_depth], [right_leg_x-leg_width, leg_y+leg_height, leg_depth],
+            # Back face
+            [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
+            [right_leg_x-leg_width, leg_y+leg_height, -leg_depth], [right_leg_x+leg_width, leg_y+leg_height, -leg_depth],
+            # Top face
+            [right_leg_x-leg_width, leg_y+leg_height, -leg_depth], [right_leg_x-leg_width, leg_y+leg_height, leg_depth], 
+            [right_leg_x+leg_width, leg_y+leg_height, leg_depth], [right_leg_x+leg_width, leg_y+leg_height, -leg_depth],
+            # Bottom face
+            [right_leg_x-leg_width, leg_y-leg_height, leg_depth], [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], 
+            [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], [right_leg_x+leg_width, leg_y-leg_height, leg_depth],
+            # Left face
+            [right_leg_x-leg_width, leg_y-leg_height, -leg_depth], [right_leg_x-leg_width, leg_y-leg_height, leg_depth], 
+            [right_leg_x-leg_width, leg_y+leg_height, leg_depth], [right_leg_x-leg_width, leg_y+leg_height, -leg_depth],
+            # Right face
+            [right_leg_x+leg_width, leg_y-leg_height, leg_depth], [right_leg_x+leg_width, leg_y-leg_height, -leg_depth], 
+            [right_leg_x+leg_width, leg_y+leg_height, -leg_depth], [right_leg_x+leg_width, leg_y+leg_height, leg_depth]
+        ]
+        
+        # Define faces for each part (indices into vertex arrays)
+        self.faces = [
+            [0, 1, 2, 3],    # Front
+            [4, 5, 6, 7],    # Back
+            [8, 9, 10, 11],  # Top
+            [12, 13, 14, 15], # Bottom
+            [16, 17, 18, 19], # Left
+            [20, 21, 22, 23]  # Right
+        ]
+    
+    def set_skin_texture(self, skin_texture, skin_pixels, face_visibility=None):
+        """Make a texture current, computing its face visibility table unless one is supplied"""
+        if face_visibility is None:
+            face_visibility = self.compute_face_visibility(skin_pixels)
+        self.skin_texture = skin_texture
+        self.skin_pixels = skin_pixels
+        self.face_visibility = face_visibility
+    
+    def compute_face_visibility(self, skin_pixels):
+        """Map every UV face to whether its texture region has any non-transparent pixel"""
+        alpha = skin_pixels[:, :, 3]
+        return {
+            part: bool(alpha[y1:y2, x1:x2].any())
+            for part, (x1, y1, x2, y2) in SKIN_UV_MAPPING.items()
+        }
+    
+    def get_texture_color(self, u, v, part='head'):
+        """Get color from skin texture based on UV coordinates and body part"""
+        if self.skin_pixels is None:
+            return "#8B4513"  # Default brown color
+        
+        if part in SKIN_UV_MAPPING:
+            x1, y1, x2, y2 = SKIN_UV_MAPPING[part]
+            
+            # Define faces that need horizontal (U) flipping for proper Minecraft skin mapping
+            faces_needing_u_flip = {
+                'head_front', 'head_outer_front',
+                'body_front', 'body_outer_front', 
+                'left_arm_front', 'right_arm_front',
+                'left_leg_front', 'right_leg_front',
+                'head_back', 'head_outer_back',
+                'body_back', 'body_outer_back',
+                'left_arm_back', 'right_arm_back', 
+                'left_leg_back', 'right_leg_back',
+                'head_left', 'head_outer_left',
+                'body_left', 'body_outer_left',
+                'left_arm_left', 'right_arm_left',
+                'left_leg_left', 'right_leg_left',
+                'head_right', 'head_outer_right',
+                'body_right', 'body_outer_right',
+                'left_arm_right', 'right_arm_right',
+                'left_leg_right', 'right_leg_right',
+                # Top faces that need mirroring
+                'head_top', 'head_outer_top',
+                'left_arm_top', 'right_arm_top'
+            }
+            
+            # Define faces that need rotation (in degrees: 90, 180, 270)
+            faces_needing_rotation = {
+                # Top faces typically need 90° rotation
+                'head_top': 90, 'head_outer_top': 90,
+                'body_top': 90, 'body_outer_top': 90,
+                'left_arm_top': 90, 'right_arm_top': 90,
+                'left_leg_top': 90, 'right_leg_top': 90,
+                
+                # Bottom faces typically need 270° rotation (or -90°)
+                'head_bottom': 270, 'head_outer_bottom': 270,
+                'body_bottom': 270, 'body_outer_bottom': 270,
+                'left_arm_bottom': 270, 'right_arm_bottom': 270,
+                'left_leg_bottom': 270, 'right_leg_bottom': 270,
+                
+                # Some side faces might need 180° rotation - adjust as needed
+                # Uncomment and modify these if certain sides appear upside down:
+                # 'head_left': 180, 'head_outer_left': 180,
+                # 'body_left': 180, 'body_outer_left': 180,
+            }
+            
+            # Apply rotation to UV coordinates if needed
+            orig_u, orig_v = u, v
+            if part in faces_needing_rotation:
+                rotation = faces_needing_rotation[part]
+                if rotation == 90:
+                    # 90° clockwise: new_u = v, new_v = 1-u
+                    u, v = orig_v, 1 - orig_u
+                elif rotation == 180:
+                    # 180°: new_u = 1-u, new_v = 1-v
+                    u, v = 1 - orig_u, 1 - orig_v
+                elif rotation == 270:
+                    # 270° clockwise (or 90° counter-clockwise): new_u = 1-v, new_v = u
+                    u, v = 1 - orig_v, orig_u
+            
+            # Convert UV coordinates (0-1) to texture coordinates
+            # Apply horizontal flipping for faces that need it
+            if part in faces_needing_u_flip:
+                tx = int(x1 + (1 - u) * (x2 - x1))  # Flip U coordinate
+            else:
+                tx = int(x1 + u * (x2 - x1))  # Normal U coordinate
+            
+            # Flip V coordinate to fix upside-down textures (this was already correct)
+            ty = int(y1 + (1 - v) * (y2 - y1))
+            
+            # Clamp to texture bounds
+            tx = max(0, min(63, tx))
+            ty = max(0, min(63, ty))
+            
+            r, g, b, a = self.skin_pixels[ty, tx]
+            
+            # Handle transparent pixels - return None to indicate they shouldn't be drawn
+            if a < 128:  # Mostly transparent
+                return None
+            
+            return f"#{r:02x}{g:02x}{b:02x}"
+        
+        return "#8B4513"  # Default brown
+    
+    def get_uv_mapping(self, part):
+        """Get UV mapping coordinates for a given part"""
+        return SKIN_UV_MAPPING.get(part, (0, 0, 8, 8))
+    
+    def has_visible_texture(self, part):
+        """Check if a texture region has any non-transparent pixels"""
+        if self.skin_pixels is None:
+            return False
+        
+        # Parts without a UV mapping default to visible
+        return self.face_visibility.get(part, True)
+    
+    def project_3d_to_2d(self, vertex):
+        """Project a 3D vertex to 2D screen coordinates"""
+        x, y, z = vertex
+        
+        # Apply rotations
+        # Rotation around Y axis
+        cos_y = math.cos(self.rotation_y)
+        sin_y = math.sin(self.rotation_y)
+        x_rot = x * cos_y - z * sin_y
+        z_rot = x * sin_y + z * cos_y
+        
+        # Rotation around X axis
+        cos_x = math.cos(self.rotation_x)
+        sin_x = math.sin(self.rotation_x)
+        y_rot = y * cos_x - z_rot * sin_x
+        z_final = y * sin_x + z_rot * cos_x
+        
+        # Simple perspective projection
+        if z_final < -50:  # Prevent divide by zero and maintain reasonable perspective
+            z_final = -50
+        
+        perspective = 1000 / (1000 + z_final)
+        
+        # Scale and translate to screen coordinates
+        screen_x = x_rot * self.scale * perspective + self.offset_x
+        screen_y = -y_rot * self.scale * perspective + self.offset_y  # Flip Y to correct orientation
+        
+        return screen_x, screen_y, z_final
+    
+    def get_face_average_color(self, face_key):
+        """Average color of the opaque texels in a face's texture region, or None if it has none"""
+        if self._face_average_source is not self.skin_pixels:
+            self._face_average_colors = {}
+            self._face_average_source = self.skin_pixels
+        
+        if face_key not in self._face_average_colors:
+            x1, y1, x2, y2 = self.get_uv_mapping(face_key)
+            region = self.skin_pixels[y1:y2, x1:x2].reshape(-1, 4)
+            opaque = region[region[:, 3] >= 128]
+            if len(opaque) == 0:
+                color = None
+            else:
+                r, g, b = (int(c) for c in opaque[:, :3].mean(axis=0))
+                color = f"#{r:02x}{g:02x}{b:02x}"
+            self._face_average_colors[face_key] = color
+        
+        return self._face_average_colors[face_key]
+    
+    def allocate_cell_budgets(self, faces_to_draw, budget):
+        """Split a per-render polygon budget across faces in proportion to their projected area"""
+        if budget is None:
+            return [None] * len(faces_to_draw)
+        
+        areas = []
+        for face in faces_to_draw:
+            points = face[5]
+            # Shoelace formula over the projected corners
+            area = 0.0
+            for i in range(len(points)):
+                x_a, y_a = points[i]
+                x_b, y_b = points[(i + 1) % len(points)]
+                area += x_a * y_b - x_b * y_a
+            areas.append(abs(area) / 2)
+        
+        total_area = sum(areas) or 1.0
+        return [max(1, int(budget * area / total_area)) for area in areas]
+    
+    def face_grid_resolution(self, tex_width, tex_height, face_width, face_height):
+        """Choose how many grid cells to draw a face with from its projected size"""
+        # Balance between quality and performance
+        grid_res_x = max(2, min(tex_width, int(face_width / 4)))
+        grid_res_y = max(2, min(tex_height, int(face_height / 4)))
+        return grid_res_x, grid_res_y
+    
+    def draw_textured_face(self, vertices, face_indices, part_name, face_name, z_depth, cell_budget=None,
+                           projected_corners=None):
+        """Draw a textured face by subdividing it into a grid of small polygons"""
+        if self.skin_pixels is None:
+            # Fallback to simple colored face
+            color = self.get_texture_color(0.5, 0.5, f"{part_name}_{face_name}")
+            if color is None:  # Skip transparent faces
+                return
+                
+            projected = []
+            for i in face_indices:
+                x, y, z = self.project_3d_to_2d(vertices[i])
+                projected.append((x, y))
+            
+            if len(projected) >= 3:
+                points = []
+                for x, y in projected:
+                    points.extend([x, y])
+                # Draw solid polygon
+                self.emit_polygon(points, color)
+            return
+
+        # Project the 4 corners of the face unless the caller already has them
+        if projected_corners is None:
+            projected_corners = []
+            for i in face_indices:
+                x, y, z = self.project_3d_to_2d(vertices[i])
+                projected_corners.append((x, y))
+        
+        if len(projected_corners) != 4:
+            return
+        
+        # Get texture region for this face
+        face_key = f"{part_name}_{face_name}"
+        x1, y1, x2, y2 = self.get_uv_mapping(face_key)
+        tex_width = x2 - x1
+        tex_height = y2 - y1
+        
+        # Determine grid resolution based on the projected face size
+        # Calculate approximate face size in pixels
+        min_x = min(x for x, y in projected_corners)
+        max_x = max(x for x, y in projected_corners)
+        min_y = min(y for x, y in projected_corners)
+        max_y = max(y for x, y in projected_corners)
+        
+        face_width = max_x - min_x
+        face_height = max_y - min_y
+        
+        grid_res_x, grid_res_y = self.face_grid_resolution(tex_width, tex_height, face_width, face_height)
+        mesh = self.timed_face_mesh(face_key, grid_res_x, grid_res_y)
+        
+        # Coarsen the grid when even the merged mesh exceeds this face's share of the polygon budget
+        if cell_budget is not None and len(mesh) > cell_budget:
+            if cell_budget < 4:
+                # Too few polygons for a grid: draw the face flat in its average color
+                color = self.get_face_average_color(face_key)
+                if color is not None:
+                    points = [coord for corner in projected_corners for coord in corner]
+                    self.emit_polygon(points, color)
+                return
+            if grid_res_x * grid_res_y > cell_budget:
+                shrink = math.sqrt(cell_budget / (grid_res_x * grid_res_y))
+                grid_res_x = max(1, int(grid_res_x * shrink))
+                grid_res_y = max(1, int(grid_res_y * shrink))
+                mesh = self.timed_face_mesh(face_key, grid_res_x, grid_res_y)
+        
+        # Draw each merged rectangle of same-colored cells as one quad. Lines of
+        # constant u or v stay straight under bilinear interpolation, so the quad
+        # covers exactly the cells it replaces.
+        lattice_start = time.perf_counter()
+        lattice = self.get_face_lattice(face_key, projected_corners, grid_res_x, grid_res_y)
+        self.add_render_stat("projection_ms", (time.perf_counter() - lattice_start) * 1000)
+        for grid_x1, grid_y1, grid_x2, grid_y2, color in mesh:
+            points = []
+            for x, y in (lattice[grid_y1][grid_x1], lattice[grid_y1][grid_x2],
+                         lattice[grid_y2][grid_x2], lattice[grid_y2][grid_x1]):
+                points.extend([x, y])
+            self.emit_polygon(points, color)
+    
+    def get_face_lattice(self, face_key, projected_corners, grid_res_x, grid_res_y):
+        """
+        Screen positions of a face's grid corners, cached until the camera changes.
+        
+        Returns:
+            list: (grid_res_y + 1) rows of (grid_res_x + 1) (x, y) points
+        """
+        lattice_key = (face_key, grid_res_x, grid_res_y)
+        if lattice_key in self._face_lattices:
+            return self._face_lattices[lattice_key]
+        
+        def lerp_2d(u, v):
+            # Bilinear interpolation between the 4 projected corners
+            # Corners are assumed to be in order: bottom-left, bottom-right, top-right, top-left
+            x_bottom = projected_corners[0][0] * (1-u) + projected_corners[1][0] * u
+            x_top = projected_corners[3][0] * (1-u) + projected_corners[2][0] * u
+            y_bottom = projected_corners[0][1] * (1-u) + projected_corners[1][1] * u
+            y_top = projected_corners[3][1] * (1-u) + projected_corners[2][1] * u
+            
+            x = x_bottom * (1-v) + x_top * v
+            y = y_bottom * (1-v) + y_top * v
+            return x, y
+        
+        lattice = [
+            [lerp_2d(grid_x / grid_res_x, grid_y / grid_res_y) for grid_x in range(grid_res_x + 1)]
+            for grid_y in range(grid_res_y + 1)
+        ]
+        self._face_lattices[lattice_key] = lattice
+        return lattice
+    
+    def timed_face_mesh(self, face_key, grid_res_x, grid_res_y):
+        """get_face_mesh(), with the time spent counted as color lookup"""
+        lookup_start = time.perf_counter()
+        mesh = self.get_face_mesh(face_key, grid_res_x, grid_res_y)
+        self.add_render_stat("color_ms", (time.perf_counter() - lookup_start) * 1000)
+        return mesh
+    
+    def get_face_color_grid(self, face_key, grid_res_x, grid_res_y):
+        """Sample a face's texture at the center of each grid cell (None where transparent)"""
+        return [
+            [self.get_texture_color((grid_x + 0.5) / grid_res_x, (grid_y + 0.5) / grid_res_y, face_key)
+             for grid_x in range(grid_res_x)]
+            for grid_y in range(grid_res_y)
+        ]
+    
+    def get_face_mesh(self, face_key, grid_res_x, grid_res_y):
+        """
+        Merge a face's grid cells into maximal rectangles of a single color.
+        
+        Transparent cells are never merged or drawn. The mesh is cached until the
+        texture changes.
+        
+        Returns:
+            list: (grid_x1, grid_y1, grid_x2, grid_y2, color) rectangles, end-exclusive
+        """
+        if self._face_mesh_source is not self.skin_pixels:
+            self._face_meshes = {}
+            self._face_mesh_source = self.skin_pixels
+        
+        mesh_key = (face_key, grid_res_x, grid_res_y)
+        if mesh_key not in self._face_meshes:
+            self._face_meshes[mesh_key] = self.greedy_mesh(self.get_face_color_grid(face_key, grid_res_x, grid_res_y))
+        return self._face_meshes[mesh_key]
+    
+    @staticmethod
+    def greedy_mesh(color_grid):
+        """Cover the non-None cells of a color grid with maximal same-colored rectangles"""
+        rows = len(color_grid)
+        cols = len(color_grid[0]) if rows else 0
+        used = [[False] * cols for _ in range(rows)]
+        rectangles = []
+        
+        for y in range(rows):
+            for x in range(cols):
+                color = color_grid[y][x]
+                if color is None or used[y][x]:
+                    continue
+                
+                # Grow right along the row, then down while the whole span matches
+                x_end = x + 1
+                while x_end < cols and not used[y][x_end] and color_grid[y][x_end] == color:
+                    x_end += 1
+                y_end = y + 1
+                while y_end < rows and all(
+                    not used[y_end][i] and color_grid[y_end][i] == color for i in range(x, x_end)
+                ):
+                    y_end += 1
+                
+                for row in range(y, y_end):
+                    for i in range(x, x_end):
+                        used[row][i] = True
+                rectangles.append((x, y, x_end, y_end, color))
+        
+        return rectangles
+    
+    def render(self):
+        """Render the 3D model"""
+        self.begin_render_stats("full")
+        self.clear()
+        self.draw_faces(self.get_sorted_faces())
+        self.end_render_stats()
+    
+    def begin_render_stats(self, kind):
+        """Start recording statistics for a render of the given kind ("full" or "delta")"""
+        self._current_stats = {
+            "kind": kind,
+            "geometry_cached": True,
+            "faces_considered": 0,
+            "faces_culled": 0,
+            "faces_drawn": 0,
+            "polygons": 0,
+            "projection_ms": 0.0,
+            "sort_ms": 0.0,
+            "color_ms": 0.0,
+            "draw_ms": 0.0,
+            "total_ms": 0.0,
+            "_start": time.perf_counter(),
+        }
+    
+    def add_render_stat(self, name, value):
+        """Add to a statistic of the render being recorded, if any"""
+        if self._current_stats is not None:
+            self._current_stats[name] += value
+    
+    def end_render_stats(self):
+        """Finish the render being recorded and add it to render_stats"""
+        stats = self._current_stats
+        if stats is None:
+            return
+        stats["total_ms"] = (time.perf_counter() - stats.pop("_start")) * 1000
+        self.render_stats.append(stats)
+        self._current_stats = None
+    
+    def get_render_stats(self):
+        """
+        Summarize the recent renders.
+        
+        Returns:
+            dict: "count" renders in the window, the "last" render's statistics,
+                  and the "mean" and "max" of each numeric statistic, or None if
+                  nothing has been rendered yet
+        """
+        if not self.render_stats:
+            return None
+        
+        numeric_keys = [key for key, value in self.render_stats[-1].items()
+                        if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        count = len(self.render_stats)
+        return {
+            "count": count,
+            "last": dict(self.render_stats[-1]),
+            "mean": {key: sum(stats[key] for stats in self.render_stats) / count for key in numeric_keys},
+            "max": {key: max(stats[key] for stats in self.render_stats) for key in numeric_keys},
+        }
+    
+    def format_render_stats(self):
+        """Describe the last render and the recent average in a few lines"""
+        summary = self.get_render_stats()
+        if summary is None:
+            return "No renders yet"
+        
+        last = summary["last"]
+        return (
+            f"{last['kind']} render: {last['total_ms']:.1f} ms (avg {summary['mean']['total_ms']:.1f}, "
+            f"max {summary['max']['total_ms']:.1f} over {summary['count']})\n"
+            f"faces {last['faces_drawn']}/{last['faces_considered']} drawn, {last['faces_culled']} culled, "
+            f"{last['polygons']} polygons\n"
+            f"project {last['projection_ms']:.1f} | sort {last['sort_ms']:.1f} | "
+            f"color {last['color_ms']:.1f} | draw {last['draw_ms']:.1f} ms"
+            f"{' (cached geometry)' if last['geometry_cached'] else ''}"
+        )
+    
+    def camera_key(self):
+        """Everything the projected geometry and draw order depend on"""
+        return (self.rotation_x, self.rotation_y, self.scale, self.offset_x, self.offset_y,
+                self.outer_layers_enabled())
+    
+    def get_sorted_faces(self):
+        """collect_faces() for the current camera, recomputed only when the camera changes"""
+        key = self.camera_key()
+        if key != self._geometry_key:
+            self._sorted_faces = self.collect_faces()
+            self._face_lattices = {}
+            self._geometry_key = key
+            if self._current_stats is not None:
+                self._current_stats["geometry_cached"] = False
+            self.add_render_stat("projection_ms", self._geometry_stats["projection_ms"])
+            self.add_render_stat("sort_ms", self._geometry_stats["sort_ms"])
+        
+        self.add_render_stat("faces_considered", self._geometry_stats["faces_considered"])
+        self.add_render_stat("faces_culled", self._geometry_stats["faces_culled"])
+        return self._sorted_faces
+    
+    def collect_faces(self):
+        """
+        Project, cull and depth-sort the model's faces for the current camera.
+        
+        The result depends only on the camera and the outer layer toggle, not on
+        the texture, so it can be reused to draw several textures from one view.
+        
+        Returns:
+            list: (camera_distance, vertices, face_indices, part_name, face_name,
+                  projected_face) tuples ordered far to near
+        """
+        projection_start = time.perf_counter()
+        
+        # List of model parts with their vertices and part names
+        # Inner layers first, then outer layers (if enabled)
+        model_parts = [
+            (self.head_vertices, "head"),
+            (self.body_vertices, "body"),
+            (self.left_arm_vertices, "left_arm"),
+            (self.right_arm_vertices, "right_arm"),
+            (self.left_leg_vertices, "left_leg"),
+            (self.right_leg_vertices, "right_leg")
+        ]
+        
+        # Add outer layers only if the toggle is enabled
+        if self.outer_layers_enabled():
+            model_parts.extend([
+                (self.head_outer_vertices, "head_outer"),
+                (self.body_outer_vertices, "body_outer")
+            ])
+        
+        face_names = ["front", "back", "top", "bottom", "left", "right"]
+        
+        # Collect all faces with their Z-depth for proper rendering order
+        faces_to_draw = []
+        
+        for vertices, part_name in model_parts:
+            for i, face_indices in enumerate(self.faces):
+                # Calculate actual distance from camera for proper depth sorting
+                face_center = [0, 0, 0]
+                projected_face = []
+                
+                # Calculate face center in 3D space
+                for vertex_idx in face_indices:
+                    vertex = vertices[vertex_idx]
+                    face_center[0] += vertex[0]
+                    face_center[1] += vertex[1] 
+                    face_center[2] += vertex[2]
+                    
+                    x, y, z = self.project_3d_to_2d(vertex)
+                    projected_face.append((x, y))
+                
+                # Get average position of face
+                face_center = [coord / len(face_indices) for coord in face_center]
+                
+                # Apply same transformations as in projection to get world space position
+                x, y, z = face_center
+                
+                # Rotation around Y axis
+                cos_y = math.cos(self.rotation_y)
+                sin_y = math.sin(self.rotation_y)
+                x_rot = x * cos_y - z * sin_y
+                z_rot = x * sin_y + z * cos_y
+                
+                # Rotation around X axis  
+                cos_x = math.cos(self.rotation_x)
+                sin_x = math.sin(self.rotation_x)
+                y_rot = y * cos_x - z_rot * sin_x
+                z_final = y * sin_x + z_rot * cos_x
+                
+                # Use Z-depth for sorting - farther negative values are farther from camera
+                camera_distance = z_final
+                
+                # Add small offset for outer layers to render in front of their inner counterparts
+                # This prevents z-fighting between inner and outer layers of the same body part
+                if part_name.endswith('_outer'):
+                    camera_distance += 0.01  # Small offset to put outer layers slightly closer to camera
+                
+                # Proper back-face culling using face normal
+                if len(face_indices) >= 3:
+                    # Calculate face normal for proper culling
+                    v1 = vertices[face_indices[0]]
+                    v2 = vertices[face_indices[1]]
+                    v3 = vertices[face_indices[2]]
+                    
+                    # Cross product to get normal (in original model space)
+                    edge1 = [v2[i] - v1[i] for i in range(3)]
+                    edge2 = [v3[i] - v1[i] for i in range(3)]
+                    normal = [
+                        edge1[1] * edge2[2] - edge1[2] * edge2[1],
+                        edge1[2] * edge2[0] - edge1[0] * edge2[2],
+                        edge1[0] * edge2[1] - edge1[1] * edge2[0]
+                    ]
+                    
+                    # Apply same rotations to normal as we do to vertices
+                    cos_y = math.cos(self.rotation_y)
+                    sin_y = math.sin(self.rotation_y)
+                    nx_rot = normal[0] * cos_y - normal[2] * sin_y
+                    nz_rot = normal[0] * sin_y + normal[2] * cos_y
+                    
+                    cos_x = math.cos(self.rotation_x)
+                    sin_x = math.sin(self.rotation_x)
+                    ny_rot = normal[1] * cos_x - nz_rot * sin_x
+                    nz_final = normal[1] * sin_x + nz_rot * cos_x
+                    
+                    # Only render faces facing towards camera
+                    # For outward-facing normals, we want nz_final < 0 (pointing away from camera)
+                    if nz_final < 0:
+                        faces_to_draw.append((camera_distance, vertices, face_indices, part_name, face_names[i], projected_face))
+        
+        sort_start = time.perf_counter()
+        
+        # Sort faces by camera distance (far to near for painter's algorithm)
+        # Higher Z values are farther from camera, lower Z values are closer
+        faces_to_draw.sort(key=lambda x: x[0], reverse=True)
+        
+        faces_considered = len(model_parts) * len(self.faces)
+        self._geometry_stats = {
+            "faces_considered": faces_considered,
+            "faces_culled": faces_considered - len(faces_to_draw),
+            "projection_ms": (sort_start - projection_start) * 1000,
+            "sort_ms": (time.perf_counter() - sort_start) * 1000,
+        }
+        return faces_to_draw
+    
+    def draw_faces(self, faces_to_draw):
+        """Draw depth-sorted faces from collect_faces() with the current texture"""
+        # Skip outer layers if they don't have visible content
+        faces_to_draw = [
+            face for face in faces_to_draw
+            if not (face[3].endswith("_outer") and not self.has_visible_texture(f"{face[3]}_{face[4]}"))
+        ]
+        
+        # Limit the polygon count while the user is interacting with the model
+        budget = self.interactive_polygon_budget if self.interacting else self.polygon_budget
+        cell_budgets = self.allocate_cell_budgets(faces_to_draw, budget)
+        
+        # Draw faces in correct order
+        self.drawn_faces = list(zip(faces_to_draw, cell_budgets))
+        self.add_render_stat("faces_drawn", len(self.drawn_faces))
+        for face, cell_budget in self.drawn_faces:
+            self.draw_face_entry(face, cell_budget)
+    
+    def draw_face_entry(self, face, cell_budget):
+        """Draw one (face, cell_budget) pair from drawn_faces"""
+        z_depth, vertices, face_indices, part_name, face_name, projected_face = face
+        self.begin_face(f"{part_name}_{face_name}")
+        self.draw_textured_face(vertices, face_indices, part_name, face_name, z_depth, cell_budget,
+                                projected_face)
+    
+    def clear(self):
+        """Start a new frame on the drawing surface"""
+        raise NotImplementedError
+    
+    def emit_polygon(self, points, color):
+        """draw_polygon(), counting the polygon and its drawing time in the render statistics"""
+        draw_start = time.perf_counter()
+        self.draw_polygon(points, color)
+        self.add_render_stat("draw_ms", (time.perf_counter() - draw_start) * 1000)
+        self.add_render_stat("polygons", 1)
+    
+    def begin_face(self, face_key):
+        """Called before the polygons of a face are drawn; backends may use it to group them"""
+        pass
+    
+    def draw_polygon(self, points, color):
+        """Fill a polygon given as a flat [x1, y1, x2, y2, ...] list with a '#rrggbb' color"""
+        raise NotImplementedError
+    
+    def outer_layers_enabled(self):
+        """Whether the hat and jacket layers should be drawn"""
+        return self.show_outer_layers
+    
+    def debug_depth_sorting(self):
+        """Debug function to print depth sorting information"""
+        if not hasattr(self, '_debug_enabled'):
+            return
+            
+        print(f"\n--- Debug Depth Sorting ---")
+        print(f"Camera rotation: X={self.rotation_x:.2f}, Y={self.rotation_y:.2f}")
+        
+        # Quick check of face positions
+        model_parts = [
+            (self.head_vertices, "head"),
+            (self.body_vertices, "body"), 
+            (self.left_leg_vertices, "left_leg"),
+            (self.right_leg_vertices, "right_leg")
+        ]
+        
+        for vertices, part_name in model_parts:
+            # Get first face (front face)
+            face_indices = [0, 1, 2, 3]  
+            face_center = [0, 0, 0]
+            
+            for vertex_idx in face_indices:
+                vertex = vertices[vertex_idx]
+                face_center[0] += vertex[0]
+                face_center[1] += vertex[1] 
+                face_center[2] += vertex[2]
+            
+            face_center = [coord / len(face_indices) for coord in face_center]
+            x, y, z = face_center
+            
+            # Apply same transformations as in render
+            cos_y = math.cos(self.rotation_y)
+            sin_y = math.sin(self.rotation_y)
+            x_rot = x * cos_y - z * sin_y
+            z_rot = x * sin_y + z * cos_y
+            
+            cos_x = math.cos(self.rotation_x)
+            sin_x = math.sin(self.rotation_x)
+            y_rot = y * cos_x - z_rot * sin_x
+            z_final = y * sin_x + z_rot * cos_x
+            
+            # Apply same logic as in render
+            camera_distance = z_final
+                
+            print(f"{part_name}: z_final={z_final:.2f}, distance={camera_distance:.2f}")
+    
+    def enable_debug(self):
+        """Enable debug output"""
+        self._debug_enabled = True
+        
+    def disable_debug(self):
+        """Disable debug output"""
+        self._debug_enabled = False
@@ -0,0 +1,145 @@
+"""
+Decoded skin textures shared by the animator and the 3D viewer.
+
+load_skin_texture() decodes a skin file once into a SkinTexture and keeps it
+in a small LRU cache keyed by the file's path, modification time and size, so
+loading the same unchanged file again (for example as both the Animation tab
+skin and the 3D input skin) is a cache hit. Resized copies are derived from
+the cached decode and kept on it.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+class SkinTexture:
+    """A decoded RGBA skin with lazily derived image, alpha plane, color grid, hash and resized copies"""
+
+    __slots__ = ("path", "pixels", "_image", "_alpha", "_color_grid", "_hash", "_resized")
+
+    def __init__(self, pixels, path=None):
+        """
+        Args:
+            pixels (np.ndarray): (H, W, 4) uint8 RGBA texels; made read-only
+                because textures are shared through the cache
+            path (str): File the texture was decoded from, if any
+        """
+        self.path = path
+        self.pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        self.pixels.setflags(write=False)
+        self._image = None
+        self._alpha = None
+        self._color_grid = None
+        self._hash = None
+        self._resized = {}
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    @property
+    def size(self):
+        """(width, height), like PIL's Image.size"""
+        return self.width, self.height
+
+    @property
+    def image(self):
+        """RGBA PIL image of the texture"""
+        if self._image is None:
+            self._image = Image.fromarray(self.pixels, 'RGBA')
+        return self._image
+
+    @property
+    def alpha(self):
+        """(H, W) uint8 alpha plane"""
+        if self._alpha is None:
+            self._alpha = self.pixels[:, :, 3]
+        return self._alpha
+
+    @property
+    def color_grid(self):
+        """Rows of "#rrggbb" strings per texel, None where the texel is mostly transparent"""
+        if self._color_grid is None:
+            self._color_grid = [
+                [f"#{r:02x}{g:02x}{b:02x}" if a >= 128 else None for r, g, b, a in row]
+                for row in self.pixels.tolist()
+            ]
+        return self._color_grid
+
+    @property
+    def content_hash(self):
+        """Hex digest of the texel data, equal for textures with identical pixels"""
+        if self._hash is None:
+            digest = hashlib.sha1(str(self.pixels.shape).encode())
+            digest.update(self.pixels.tobytes())
+            self._hash = digest.hexdigest()
+        return self._hash
+
+    def resized(self, size):
+        """This texture at (width, height), resized with nearest neighbor and kept for reuse"""
+        size = tuple(size)
+        if size == self.size:
+            return self
+        texture = self._resized.get(size)
+        if texture is None:
+            texture = SkinTexture.from_image(self.image, size, self.path)
+            self._resized[size] = texture
+        return texture
+
+    @classmethod
+    def from_image(cls, image, size=None, path=None):
+        """Convert a PIL image to RGBA, resizing it with nearest neighbor if size is given"""
+        image = image.convert('RGBA')
+        if size is not None and image.size != tuple(size):
+            image = image.resize(tuple(size), Image.NEAREST)
+        texture = cls(np.array(image), path)
+        texture._image = image
+        return texture
+
+# Decoded textures by (path, mtime, file size), most recently used last
+_texture_cache = OrderedDict()
+_texture_cache_lock = threading.Lock()
+TEXTURE_CACHE_SIZE = 32
+
+def load_skin_texture(path, size=None):
+    """
+    Decode a skin file, reusing the cached texture if the file hasn't changed.
+
+    Args:
+        path (str): Image file to load
+        size (tuple): (width, height) to resize to, or None to keep the file's size
+
+    Returns:
+        SkinTexture: The decoded texture (shared; do not modify its pixels)
+    """
+    path = os.path.abspath(str(path))
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _texture_cache_lock:
+        texture = _texture_cache.get(key)
+        if texture is not None:
+            _texture_cache.move_to_end(key)
+
+    if texture is None:
+        with Image.open(path) as image:
+            texture = SkinTexture.from_image(image, path=path)
+        with _texture_cache_lock:
+            _texture_cache[key] = texture
+            _texture_cache.move_to_end(key)
+            while len(_texture_cache) > TEXTURE_CACHE_SIZE:
+                _texture_cache.popitem(last=False)
+
+    return texture if size is None else texture.resized(size)
+
+def clear_texture_cache():
+    """Forget all cached textures"""
+    with _texture_cache_lock:
+        _texture_cache.clear()
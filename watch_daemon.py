@@ -0,0 +1,259 @@
+"""
+Watch-folder daemon that turns dropped skins into animation frames unattended.
+
+The daemon polls an input directory, queues every new or changed skin in a
+SQLite job queue on disk and generates the masks on a process pool. Each
+result is written to a temporary directory and renamed into place, so the
+output tree only ever contains complete animations. Jobs that were queued or
+running when the daemon stopped are picked up again on the next start, and
+finished ones are not redone. A skin only ever has one job running, and a
+newer version of a skin supersedes its older queued jobs, so an old version
+can never overwrite the output of a new one.
+
+    python watch_daemon.py incoming/ --output output --frames 36 --type "Head to Toe"
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from animation_output import ignore_interrupts, write_animation_output
+from mask_generator import ANIMATION_TYPES, generate_mask_stack
+from skin_texture import load_skin_texture
+
+def generate_animation_job(skin_path, output_root, frames, animation_type):
+    """Generate one skin's mask frames into <output_root>/<name>_animation/"""
+    texture = load_skin_texture(skin_path)
+    mask_stack = generate_mask_stack(texture.pixels, frames, animation_type)
+    return write_animation_output(mask_stack, output_root, Path(skin_path).stem)
+
+class JobQueue:
+    """Persistent queue of generation jobs stored in a SQLite database"""
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                skin_path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                frames INTEGER NOT NULL,
+                animation_type TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                output_dir TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (skin_path, mtime_ns, size, frames, animation_type)
+            )
+        """)
+        self.connection.commit()
+
+    def enqueue(self, skin_path, mtime_ns, size, frames, animation_type):
+        """Queue a job unless the same file version with the same settings is already known"""
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO jobs (skin_path, mtime_ns, size, frames, animation_type, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (skin_path, mtime_ns, size, frames, animation_type, time.time()))
+        queued = cursor.rowcount > 0
+        if queued:
+            self.supersede_stale()
+        self.connection.commit()
+        return queued
+
+    def supersede_stale(self):
+        """Retire pending jobs of skins that have a newer job queued since; the caller commits"""
+        self.connection.execute(
+            "UPDATE jobs SET status = 'superseded', updated = ? WHERE status = 'pending' AND EXISTS "
+            "(SELECT 1 FROM jobs AS newer WHERE newer.skin_path = jobs.skin_path AND newer.id > jobs.id)",
+            (time.time(),))
+
+    def recover(self):
+        """Return jobs left running by a previous process to the queue"""
+        self.connection.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+        self.connection.commit()
+
+    def claim(self, limit):
+        """
+        Mark up to limit pending jobs as running and return them, oldest first.
+
+        Skins that already have a job running are skipped until it finishes,
+        since both jobs would publish to the same output directory.
+        """
+        # Also catches old versions put back to pending by fail() or recover()
+        self.supersede_stale()
+        rows = self.connection.execute(
+            "SELECT id, skin_path, frames, animation_type FROM jobs "
+            "WHERE status = 'pending' AND skin_path NOT IN "
+            "(SELECT skin_path FROM jobs WHERE status = 'running') ORDER BY id LIMIT ?", (limit,)).fetchall()
+        for row in rows:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                (time.time(), row[0]))
+        self.connection.commit()
+        return rows
+
+    def finish(self, job_id, output_dir):
+        """Record a successfully published job"""
+        self.connection.execute(
+            "UPDATE jobs SET status = 'done', output_dir = ?, error = NULL, updated = ? WHERE id = ?",
+            (output_dir, time.time(), job_id))
+        self.connection.commit()
+
+    def fail(self, job_id, error, max_attempts):
+        """Record a failed attempt, requeueing the job until it has used max_attempts"""
+        self.connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, updated = ? WHERE id = ?",
+            (max_attempts, error, time.time(), job_id))
+        self.connection.commit()
+
+    def counts(self):
+        """Number of jobs per status"""
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self.connection.close()
+
+class WatchDaemon:
+    """Poll an input folder and generate animations for new or changed skins"""
+
+    def __init__(self, input_dir, output_root="output", frames=36, animation_type="Head to Toe",
+                 workers=None, poll_interval=2.0, queue_path=None, max_attempts=3):
+        """
+        Args:
+            input_dir (str): Folder to watch for PNG skins
+            output_root (str): Root of the output tree
+            frames (int): Frames per animation (plus the blank frame 0)
+            animation_type (str): One of mask_generator.ANIMATION_TYPES
+            workers (int): Worker processes (default: CPU count)
+            poll_interval (float): Seconds between folder scans
+            queue_path (str): Job database (default: <output_root>/.watch_queue.sqlite3)
+            max_attempts (int): Attempts per job before it is marked failed
+        """
+        if animation_type not in ANIMATION_TYPES:
+            raise ValueError(f"Unknown animation type: {animation_type}")
+
+        self.input_dir = Path(input_dir)
+        self.output_root = Path(output_root)
+        self.frames = frames
+        self.animation_type = animation_type
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        self.queue = JobQueue(queue_path or self.output_root / ".watch_queue.sqlite3")
+        self.queue.recover()
+
+        # Files are only queued once their size and mtime have stopped changing,
+        # so skins that are still being copied in aren't picked up half-written
+        self._last_seen = {}
+
+    def scan(self, settle=True):
+        """Queue skins whose size and mtime are unchanged since the previous scan (or all, without settle)"""
+        queued = 0
+        seen = {}
+        with os.scandir(self.input_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(".png"):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                seen[entry.path] = signature
+                if not settle or self._last_seen.get(entry.path) == signature:
+                    if self.queue.enqueue(os.path.abspath(entry.path), stat.st_mtime_ns, stat.st_size,
+                                          self.frames, self.animation_type):
+                        queued += 1
+        self._last_seen = seen
+        return queued
+
+    def record_result(self, future, job_id, skin_path):
+        """Mark a completed job done or failed in the queue"""
+        try:
+            output_dir = future.result()
+            self.queue.finish(job_id, output_dir)
+            print(f"Generated {skin_path} -> {output_dir}")
+        except Exception as e:
+            self.queue.fail(job_id, str(e), self.max_attempts)
+            print(f"Error generating {skin_path}: {e}")
+
+    def run(self, once=False):
+        """
+        Scan, queue and process jobs until interrupted.
+
+        Args:
+            once (bool): Queue the folder's current skins, process the queue and exit
+        """
+        if once:
+            self.scan(settle=False)
+
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts) as pool:
+            try:
+                next_scan = 0.0
+                while True:
+                    if not once and time.monotonic() >= next_scan:
+                        queued = self.scan()
+                        if queued:
+                            print(f"Queued {queued} skin(s)")
+                        next_scan = time.monotonic() + self.poll_interval
+
+                    # Keep every worker busy with one job and one waiting
+                    for job_id, skin_path, frames, animation_type in self.queue.claim(2 * self.workers - len(in_flight)):
+                        future = pool.submit(generate_animation_job, skin_path, str(self.output_root),
+                                             frames, animation_type)
+                        in_flight[future] = (job_id, skin_path)
+
+                    if not in_flight:
+                        if once:
+                            break
+                        time.sleep(max(0.0, next_scan - time.monotonic()))
+                        continue
+
+                    done, _ = wait(in_flight, timeout=max(0.05, next_scan - time.monotonic()),
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.record_result(future, *in_flight.pop(future))
+            except KeyboardInterrupt:
+                print("Stopping; unfinished jobs will resume on the next start")
+                for future in in_flight:
+                    future.cancel()
+                # Jobs already running publish their output; wait so they can be recorded below
+                pool.shutdown(wait=True)
+            finally:
+                for future, (job_id, skin_path) in in_flight.items():
+                    if future.done() and not future.cancelled():
+                        self.record_result(future, job_id, skin_path)
+                self.queue.recover()
+
+        print(f"Queue: {self.queue.counts()}")
+        self.queue.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder and generate mask animations for new skins")
+    parser.add_argument("input_dir", help="Folder to watch for PNG skins")
+    parser.add_argument("--output", default="output", help="Output root directory (default: output)")
+    parser.add_argument("--frames", type=int, default=36, help="Frames per animation (default: 36)")
+    parser.add_argument("--type", dest="animation_type", default="Head to Toe", choices=list(ANIMATION_TYPES),
+                        help="Animation type (default: Head to Toe)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between folder scans (default: 2)")
+    parser.add_argument("--queue", default=None, help="Job queue database (default: <output>/.watch_queue.sqlite3)")
+    parser.add_argument("--once", action="store_true", help="Process what is in the folder, then exit")
+
+    args = parser.parse_args(argv)
+    if args.frames <= 0:
+        parser.error("--frames must be positive")
+
+    daemon = WatchDaemon(args.input_dir, args.output, args.frames, args.animation_type,
+                         args.workers, args.interval, args.queue)
+    daemon.run(once=args.once)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())